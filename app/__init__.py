@@ -1,11 +1,29 @@
 from flask import Flask
 from config import config
 from .extensions import init_extensions
+from .templating import init_templating
+from .sql_instrumentation import init_sql_instrumentation
+from .index_advisor import init_index_advisor
+from .metrics import init_metrics
+from .profiling import init_profiling
+from .admission import init_admission
+from .replica import init_replica
+from .db_pool import configure_pool, init_db_pool
+from .startup import StartupTimer, detect_entry_point
 from datetime import datetime
 import os
 
-def create_app(config_name='default'):
-    """Application factory"""
+def create_app(config_name='default', entry_point=None):
+    """
+    Application factory
+    
+    ``entry_point`` (web, cli or worker; detected from the command line by
+    default) decides which extensions are loaded: the CLI and workers skip
+    the request metrics, profiler, admission control, rate limiter, JWT and
+    SocketIO, but keep the blueprints so url_for works everywhere.
+    """
+    entry_point = entry_point or detect_entry_point()
+    timer = StartupTimer(entry_point)
     app = Flask(__name__)
     
     # Load configuration
@@ -19,8 +37,39 @@ def create_app(config_name='default'):
         os.makedirs(os.path.join(upload_folder, 'resumes'))
         os.makedirs(os.path.join(upload_folder, 'course_materials'))
     
+    # Configure Jinja (bytecode cache) before the environment is created
+    with timer.phase('templating'):
+        init_templating(app)
+    
+    # Metrics before extensions so the engine gets the timed pool
+    if entry_point == 'web':
+        with timer.phase('metrics'):
+            init_metrics(app)
+    
+    # Pool size for this worker's concurrency model, before the engine exists
+    configure_pool(app)
+    
     # Initialize extensions
-    init_extensions(app)
+    with timer.phase('extensions'):
+        init_extensions(app, entry_point)
+    
+    # Per-request SQL counts and N+1 warnings (no-op unless SQL_INSTRUMENTATION)
+    init_sql_instrumentation(app)
+    init_index_advisor(app)
+    
+    # Sampling profiler for chosen endpoints (no-op unless PROFILING_ENABLED)
+    if entry_point == 'web':
+        init_profiling(app)
+    
+    # Read replica engine and request routing (no-op without SQLALCHEMY_REPLICA_URI)
+    init_replica(app)
+    
+    # Idle-time liveness pings and pool metrics (MySQL engines only)
+    init_db_pool(app)
+    
+    # Concurrency caps and load shedding for expensive endpoint classes
+    if entry_point == 'web':
+        init_admission(app)
     
      # Register template filters
     @app.template_filter('datetime_format')
@@ -35,19 +84,46 @@ def create_app(config_name='default'):
             return datetime.now()
         return dict(now=now)
 
-    # Register blueprints
-    register_blueprints(app)
+    # Register blueprints for every entry point: cheap, and commands and
+    # workers that render email templates need url_for
+    with timer.phase('blueprints'):
+        register_blueprints(app)
     
     # Register error handlers
     register_error_handlers(app)
     
     # Register CLI commands
-    from app.commands import init_db_command, create_admin, seed_db
+    with timer.phase('commands'):
+        register_commands(app)
+    
+    app.extensions['startup'] = timer.as_dict()
+    return app
+
+
+def register_commands(app):
+    """Register CLI commands"""
+    from app.commands import (
+        init_db_command, create_admin, seed_db, precompile_templates_command, cache_clear,
+        reconcile_stats, list_programs, list_roles, export_data, rollup_registrations,
+        backfill_enrollments, profile_token, profile_merge, startup_report, index_advice,
+        gen_data
+    )
     app.cli.add_command(init_db_command)
     app.cli.add_command(create_admin)
     app.cli.add_command(seed_db)
-    
-    return app
+    app.cli.add_command(precompile_templates_command)
+    app.cli.add_command(cache_clear)
+    app.cli.add_command(reconcile_stats)
+    app.cli.add_command(list_programs)
+    app.cli.add_command(list_roles)
+    app.cli.add_command(export_data)
+    app.cli.add_command(rollup_registrations)
+    app.cli.add_command(backfill_enrollments)
+    app.cli.add_command(profile_token)
+    app.cli.add_command(profile_merge)
+    app.cli.add_command(startup_report)
+    app.cli.add_command(index_advice)
+    app.cli.add_command(gen_data)
 
 
 def register_blueprints(app):
@@ -58,6 +134,7 @@ def register_blueprints(app):
     from .student.routes import student_bp
     from .marketing.routes import marketing_bp
     from .dashboard.routes import dashboard_bp
+    from .reports.routes import reports_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(admin_bp, url_prefix='/admin')
@@ -65,6 +142,7 @@ def register_blueprints(app):
     app.register_blueprint(student_bp, url_prefix='/student')
     app.register_blueprint(marketing_bp)
     app.register_blueprint(dashboard_bp, url_prefix='/dashboard')
+    app.register_blueprint(reports_bp, url_prefix='/reports')
 
 
 def register_error_handlers(app):
@@ -1,6 +1,15 @@
-from flask import Blueprint, render_template
+import os
+from flask import Blueprint, render_template, jsonify, request, abort, current_app
 from flask_login import login_required
 from app.decorators import admin_required
+from app.extensions import db
+from app.models.role import Role
+from app.models.cohort import Cohort
+from app.services.stats_service import StatsService
+from app.services.user_directory_service import UserDirectoryService
+from app.services.enrollment_service import EnrollmentService
+from app.services.cohort_service import CohortService
+from app.profiling import PROFILE_HEADER, make_profile_token
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -9,18 +18,134 @@ admin_bp = Blueprint('admin', __name__)
 @admin_required
 def dashboard():
     """Admin dashboard"""
-    return render_template('admin/dashboard.html')
+    stats = StatsService.dashboard_stats()
+    return render_template('admin/dashboard.html', stats=stats)
 
 @admin_bp.route('/users')
 @login_required
 @admin_required
 def users():
     """User management"""
-    return render_template('admin/users.html')
+    filters = _directory_filters()
+    try:
+        page = UserDirectoryService.list_users(**filters)
+    except ValueError:
+        abort(400)
+    
+    roles = Role.query.order_by(Role.name).all()
+    return render_template('admin/users.html', page=page, filters=filters, roles=roles)
+
+@admin_bp.route('/api/users')
+@login_required
+@admin_required
+def api_users():
+    """User directory (keyset paginated)"""
+    try:
+        page = UserDirectoryService.list_users(**_directory_filters())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(page)
+
+def _directory_filters():
+    """Read user directory filters from the query string"""
+    verified = request.args.get('verified')
+    return {
+        'role': request.args.get('role') or None,
+        'status': request.args.get('status') or None,
+        'state': request.args.get('state') or None,
+        'verified': {'true': True, 'false': False}.get(verified),
+        'after': request.args.get('after') or None,
+        'limit': request.args.get('limit', type=int),
+    }
 
 @admin_bp.route('/programs')
 @login_required
 @admin_required
 def programs():
     """Program management"""
-    return render_template('admin/programs.html')
\ No newline at end of file
+    return render_template('admin/programs.html')
+
+@admin_bp.route('/api/programs/enrollments')
+@login_required
+@admin_required
+def api_program_enrollments():
+    """Current enrollment count per program"""
+    counts = EnrollmentService.counts_by_program()
+    return jsonify({str(program_id): count for program_id, count in counts.items()})
+
+@admin_bp.route('/api/programs/<int:program_id>/roster')
+@login_required
+@admin_required
+def api_program_roster(program_id):
+    """Students enrolled in a program (paginated by user id)"""
+    roster = EnrollmentService.roster(
+        program_id,
+        cohort=request.args.get('cohort') or None,
+        after=request.args.get('after', type=int),
+        limit=request.args.get('limit', type=int),
+    )
+    roster['total'] = EnrollmentService.count(program_id, cohort=request.args.get('cohort') or None)
+    return jsonify(roster)
+
+@admin_bp.route('/api/cohorts/<int:cohort_id>')
+@login_required
+@admin_required
+def api_cohort(cohort_id):
+    """Seats taken and waitlist length for a cohort"""
+    cohort = db.get_or_404(Cohort, cohort_id)
+    return jsonify(CohortService.summary(cohort))
+
+@admin_bp.route('/api/cohorts/<int:cohort_id>/capacity', methods=['POST'])
+@login_required
+@admin_required
+def api_cohort_capacity(cohort_id):
+    """Change cohort capacity; new seats go to the waitlist first"""
+    cohort = db.get_or_404(Cohort, cohort_id)
+    capacity = (request.get_json(silent=True) or {}).get('capacity')
+    if not isinstance(capacity, int) or capacity < 0:
+        return jsonify({'error': 'capacity must be a non-negative integer'}), 400
+    try:
+        promoted = CohortService.set_capacity(cohort, capacity)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(dict(CohortService.summary(cohort), promoted=len(promoted)))
+
+@admin_bp.route('/api/profiling/token', methods=['POST'])
+@login_required
+@admin_required
+def api_profiling_token():
+    """Sign an X-Profile-Token header for the given endpoints"""
+    if not current_app.config.get('PROFILING_ENABLED'):
+        return jsonify({'error': 'Profiling is disabled'}), 400
+    endpoints = (request.get_json(silent=True) or {}).get('endpoints')
+    if not endpoints or not all(isinstance(e, str) for e in endpoints):
+        return jsonify({'error': 'endpoints must be a list of endpoint names'}), 400
+    return jsonify({
+        'header': PROFILE_HEADER,
+        'token': make_profile_token(endpoints),
+        'expires_in': current_app.config.get('PROFILING_TOKEN_MAX_AGE', 3600),
+    })
+
+@admin_bp.route('/api/admission')
+@login_required
+@admin_required
+def api_admission():
+    """Admission control counters for the worker that serves this request"""
+    controller = current_app.extensions.get('admission')
+    if controller is None:
+        return jsonify({'enabled': False, 'classes': {}})
+    return jsonify({'enabled': True, 'pid': os.getpid(), 'classes': controller.stats()})
+
+@admin_bp.route('/api/stats')
+@login_required
+@admin_required
+def api_stats():
+    """System statistics (served from stats counters)"""
+    roles = Role.query.order_by(Role.name).all()
+    role_counts = StatsService.role_user_counts(roles)
+    
+    stats = StatsService.dashboard_stats()
+    stats['roles'] = [
+        {'name': role.name, 'users': role_counts[role.id]} for role in roles
+    ]
+    return jsonify(stats)
@@ -0,0 +1,303 @@
+import math
+import os
+import threading
+import time
+from flask import Response, request
+from app.db_pool import GREEN_WORKER_CLASSES
+from app.metrics import admission_finished, admission_shed, admission_started
+
+try:
+    import fcntl
+except ImportError:  # Windows: caps fall back to per process
+    fcntl = None
+
+# Latency smoothing for the adaptive cap
+EWMA_ALPHA = 0.2
+# Back-off while queued, doubling from the first to the last
+POLL_INTERVALS = (0.002, 0.004, 0.008, 0.016, 0.032)
+
+
+def parse_routes(spec):
+    """``'auth.login=auth,reports=reports'`` -> {'auth.login': 'auth', 'reports': 'reports'}"""
+    routes = {}
+    for pair in spec.split(','):
+        if pair.strip():
+            target, _, name = pair.partition('=')
+            routes[target.strip()] = name.strip()
+    return routes
+
+
+def parse_classes(spec):
+    """
+    ``'auth=3:500:1500:POST'`` -> {'auth': {'max_concurrency': 3, 'queue_timeout_ms': 500,
+    'target_latency_ms': 1500, 'methods': ('POST',)}}
+
+    Methods are ``+``-separated (``GET+POST``) and default to POST.
+    """
+    classes = {}
+    for pair in spec.split(','):
+        if not pair.strip():
+            continue
+        name, _, values = pair.partition('=')
+        concurrency, queue_ms, target_ms, methods = (values.split(':') + ['', '', ''])[:4]
+        classes[name.strip()] = {
+            'max_concurrency': int(concurrency),
+            'queue_timeout_ms': float(queue_ms or 250),
+            'target_latency_ms': float(target_ms or 1000),
+            'methods': tuple(m.strip().upper() for m in (methods or 'POST').split('+') if m.strip()),
+        }
+    return classes
+
+
+def fit_to_workers(classes, environ=None):
+    """
+    Bound the class caps by the gunicorn workers so one is always left free
+
+    deploy/gunicorn.conf.py exports GUNICORN_WORKERS, GUNICORN_THREADS and
+    GUNICORN_WORKER_CLASS. With sync or gthread workers every admitted
+    request holds a worker (or thread), so each cap and their sum are
+    clamped to the capacity minus one, scaled down in proportion; a queued
+    request would hold one just the same while it sleeps, so the queue is
+    dropped and the overflow is shed at once. Green workers yield while
+    queued and run many requests each, so they are left alone, as is
+    anything not started by gunicorn.
+
+    Returns:
+        tuple: (classes with the adjusted settings, list of clamp messages)
+    """
+    environ = os.environ if environ is None else environ
+    worker_class = environ.get('GUNICORN_WORKER_CLASS') or 'sync'
+    if not environ.get('GUNICORN_WORKERS') or worker_class in GREEN_WORKER_CLASSES:
+        return classes, []
+
+    capacity = int(environ['GUNICORN_WORKERS']) * int(environ.get('GUNICORN_THREADS') or 1)
+    budget = max(1, capacity - 1)
+    total = sum(settings['max_concurrency'] for settings in classes.values())
+    fitted, clamped = {}, []
+    for name, settings in classes.items():
+        cap = settings['max_concurrency']
+        if total > budget:
+            cap = max(1, cap * budget // total)
+        if cap != settings['max_concurrency']:
+            clamped.append(f"{name} cap {settings['max_concurrency']} -> {cap}")
+        if settings['queue_timeout_ms']:
+            clamped.append(f"{name} queue {settings['queue_timeout_ms']:g}ms -> 0 ({worker_class} workers)")
+        fitted[name] = dict(settings, max_concurrency=cap, queue_timeout_ms=0)
+    if sum(settings['max_concurrency'] for settings in fitted.values()) > budget:
+        clamped.append(f"{len(fitted)} classes need more than the {budget} workers that can be spared")
+    return fitted, clamped
+
+
+class SlotPool:
+    """
+    Host-wide counting semaphore made of ``flock``ed slot files
+
+    Every worker process sees the same files, so a cap of 3 means three
+    requests on the whole host, not three per worker. A lock dies with its
+    process, so a killed worker never leaks a slot.
+    """
+
+    def __init__(self, directory, name, size):
+        os.makedirs(directory, exist_ok=True)
+        self.paths = [os.path.join(directory, f'{name}.{i}.slot') for i in range(size)]
+
+    def try_acquire(self, limit):
+        for path in self.paths[:limit]:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except OSError:
+                os.close(fd)
+        return None
+
+    def release(self, fd):
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+class LocalSlotPool:
+    """Per-process stand-in for SlotPool where flock is unavailable"""
+
+    def __init__(self, directory, name, size):
+        self._lock = threading.Lock()
+        self._taken = 0
+
+    def try_acquire(self, limit):
+        with self._lock:
+            if self._taken >= limit:
+                return None
+            self._taken += 1
+            return True
+
+    def release(self, token):
+        with self._lock:
+            self._taken -= 1
+
+
+class AdmissionClass:
+    """
+    Concurrency cap, brief queue and latency tracking for one endpoint class
+
+    Only requests with one of ``methods`` are held back: the GET that renders
+    a login form should not wait behind the POSTs that hash passwords. The cap adapts: while the smoothed latency is above the target it is cut
+    by a quarter (never below 1), and it grows back by 1/cap per request
+    once latency recovers, up to ``max_concurrency``.
+    """
+
+    def __init__(self, name, max_concurrency, queue_timeout_ms, target_latency_ms, directory,
+                 methods=('POST',)):
+        self.name = name
+        self.methods = frozenset(methods)
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout_ms / 1000.0
+        self.target_latency = target_latency_ms / 1000.0
+        pool_class = SlotPool if fcntl is not None else LocalSlotPool
+        self.pool = pool_class(directory, name, max_concurrency)
+        self.limit = float(max_concurrency)
+        self.latency = None
+        self.in_flight = 0
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """A slot token, or None when none freed up within the queue timeout"""
+        token = self.pool.try_acquire(int(self.limit))
+        if token is None:
+            deadline = time.monotonic() + self.queue_timeout
+            with self._lock:
+                self.queued += 1
+            attempt = 0
+            while token is None and time.monotonic() < deadline:
+                interval = POLL_INTERVALS[min(attempt, len(POLL_INTERVALS) - 1)]
+                time.sleep(max(0.0, min(interval, deadline - time.monotonic())))
+                attempt += 1
+                token = self.pool.try_acquire(int(self.limit))
+        with self._lock:
+            if token is None:
+                self.shed += 1
+            else:
+                self.admitted += 1
+                self.in_flight += 1
+        return token
+
+    def release(self, token, elapsed):
+        self.pool.release(token)
+        with self._lock:
+            self.in_flight -= 1
+            self.latency = elapsed if self.latency is None else (
+                EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * self.latency
+            )
+            if self.latency > self.target_latency:
+                self.limit = max(1.0, self.limit * 0.75)
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+
+    def retry_after(self):
+        """Seconds a shed client should wait: about one request's worth"""
+        return max(1, math.ceil(self.latency or self.target_latency))
+
+    def stats(self):
+        return {
+            'max_concurrency': self.max_concurrency,
+            'methods': sorted(self.methods),
+            'limit': int(self.limit),
+            'in_flight': self.in_flight,
+            'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+            'admitted': self.admitted,
+            'queued': self.queued,
+            'shed': self.shed,
+        }
+
+
+class AdmissionController:
+    """Maps endpoints to classes; unlisted endpoints are never queued or shed"""
+
+    def __init__(self, classes, routes, directory):
+        self.classes = {
+            name: AdmissionClass(name, directory=directory, **settings)
+            for name, settings in classes.items()
+        }
+        unknown = set(routes.values()) - set(self.classes)
+        if unknown:
+            raise ValueError(f"ADMISSION_ROUTES uses undefined classes: {', '.join(sorted(unknown))}")
+        self.routes = routes
+
+    def classify(self, endpoint, blueprint=None, method=None):
+        """
+        The AdmissionClass for an endpoint (its own entry beats its blueprint's)
+
+        None when the endpoint is unlisted or ``method`` is not one its class
+        admits (no ``method`` matches any).
+        """
+        name = self.routes.get(endpoint) or self.routes.get(blueprint)
+        admission_class = self.classes.get(name)
+        if admission_class is not None and method is not None and method not in admission_class.methods:
+            return None
+        return admission_class
+
+    def stats(self):
+        return {name: admission_class.stats() for name, admission_class in self.classes.items()}
+
+
+def _shed_response(admission_class):
+    response = Response('Service busy, please retry shortly', status=503, mimetype='text/plain')
+    response.headers['Retry-After'] = str(admission_class.retry_after())
+    return response
+
+
+def init_admission(app):
+    """
+    Cap concurrent requests per endpoint class and shed the overflow
+
+    ADMISSION_ROUTES puts endpoints or whole blueprints into classes;
+    ADMISSION_CLASSES gives each class a host-wide concurrency cap, how long
+    a request may queue for a slot, the latency the cap adapts to and the
+    HTTP methods it applies to (POST unless listed).
+    Anything unlisted (marketing pages, static files, /metrics) is never
+    held back, and under gunicorn the caps are fitted to the workers
+    (fit_to_workers) so it keeps a free worker while the expensive classes
+    are saturated. Shed requests get 503 with Retry-After and are counted in
+    app.extensions['admission'].stats() and the admission metrics.
+    """
+    if not app.config.get('ADMISSION_ENABLED', False):
+        return
+
+    classes = app.config.get('ADMISSION_CLASSES') or {}
+    routes = app.config.get('ADMISSION_ROUTES') or {}
+    classes, clamped = fit_to_workers(parse_classes(classes) if isinstance(classes, str) else classes)
+    if clamped:
+        app.logger.warning(f"Admission caps fitted to the gunicorn workers: {'; '.join(clamped)}")
+    controller = AdmissionController(
+        classes,
+        parse_routes(routes) if isinstance(routes, str) else routes,
+        app.config['ADMISSION_LOCK_DIR'],
+    )
+    app.extensions['admission'] = controller
+
+    @app.before_request
+    def _admit():
+        admission_class = controller.classify(request.endpoint, request.blueprint, request.method)
+        if admission_class is None:
+            return None
+        token = admission_class.acquire()
+        if token is None:
+            admission_shed(admission_class.name)
+            app.logger.warning(f"Shed {request.endpoint}: {admission_class.name} class is saturated")
+            return _shed_response(admission_class)
+        admission_started(admission_class.name)
+        request.environ['admission'] = (admission_class, token, time.perf_counter())
+        return None
+
+    @app.teardown_request
+    def _release(exc):
+        admitted = request.environ.pop('admission', None)
+        if admitted is None:
+            return
+        admission_class, token, started = admitted
+        admission_class.release(token, time.perf_counter() - started)
+        admission_finished(admission_class.name)
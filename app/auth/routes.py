@@ -266,7 +266,9 @@ def reset_password(token):
 @login_required
 def profile():
     """User profile page"""
-    form = ProfileUpdateForm(obj=current_user)
+    # load_user leaves the profile columns deferred; read them in one go
+    user = User.query.options(User.load_profile()).populate_existing().get(current_user.id)
+    form = ProfileUpdateForm(obj=user)
     
     if form.validate_on_submit():
         try:
@@ -0,0 +1,5 @@
+from .core import AppCache, CacheEntry, cache
+from .backends import LocalLRUCache, SQLiteBackend, RedisBackend, make_shared_backend
+
+__all__ = ['AppCache', 'CacheEntry', 'cache', 'LocalLRUCache', 'SQLiteBackend',
+           'RedisBackend', 'make_shared_backend']
@@ -0,0 +1,207 @@
+"""
+Storage tiers for the application cache
+
+``LocalLRUCache`` is the per-process first tier. The shared second tier is
+chosen from ``CACHE_SHARED_URL``:
+
+    sqlite:////var/cache/yca/cache.db   single host, no extra services
+    redis://localhost:6379/0            production (any Redis-compatible server)
+"""
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class LocalLRUCache:
+    """Bounded in-process LRU; entries carry their own local expiry"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the stored object or None; expired entries are dropped"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Store an object
+
+        Returns:
+            list: keys evicted to make room
+        """
+        expires_at = time.monotonic() + ttl if ttl else None
+        evicted = []
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                old_key, _ = self._data.popitem(last=False)
+                evicted.append(old_key)
+        return evicted
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteBackend:
+    """
+    Shared tier in a WAL-mode SQLite file
+
+    Every worker on the host opens the same file. Connections are kept per
+    thread and reopened after fork.
+    """
+
+    PURGE_PROBABILITY = 0.01
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB,"
+                " expires_at REAL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, ttl=None):
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+            (key, value, time.time() + ttl if ttl else None)
+        )
+        if random.random() < self.PURGE_PROBABILITY:
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+    def add(self, key, value, ttl=None):
+        """Store only if the key is absent or expired; True when stored"""
+        now = time.time()
+        cursor = self._connect().execute(
+            "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE cache.expires_at IS NOT NULL AND cache.expires_at <= ?",
+            (key, value, now + ttl if ttl else None, now)
+        )
+        return cursor.rowcount == 1
+
+    def incr(self, key):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                "INSERT INTO cache (key, value, expires_at) VALUES (?, 1, NULL) "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+                (key,)
+            )
+            value = conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()[0]
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return int(value)
+
+    def get_int(self, key):
+        value = self.get(key)
+        return int(value) if value is not None else 0
+
+    def delete(self, key):
+        self._connect().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        self._connect().execute("DELETE FROM cache")
+
+
+class RedisBackend:
+    """Shared tier on a Redis-compatible server; keys live under ``prefix``"""
+
+    def __init__(self, url, prefix='yca:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_SHARED_URL uses redis:// but the 'redis' package is not installed") from e
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, px=int(ttl * 1000) if ttl else None)
+
+    def add(self, key, value, ttl=None):
+        return bool(self.client.set(self.prefix + key, value, nx=True,
+                                    px=int(ttl * 1000) if ttl else None))
+
+    def incr(self, key):
+        return int(self.client.incr(self.prefix + key))
+
+    def get_int(self, key):
+        value = self.get(key)
+        return int(value) if value is not None else 0
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + '*', count=500):
+            self.client.delete(key)
+
+
+def make_shared_backend(url, prefix='yca:'):
+    """
+    Build the shared tier from a URL
+
+    Returns:
+        SQLiteBackend | RedisBackend | None: None when ``url`` is empty
+    """
+    if not url:
+        return None
+    if url.startswith('sqlite:///'):
+        return SQLiteBackend(url[len('sqlite:///'):])
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackend(url, prefix=prefix)
+    raise ValueError(f"Unsupported CACHE_SHARED_URL: {url}")
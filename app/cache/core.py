@@ -0,0 +1,306 @@
+import math
+import os
+import pickle
+import random
+import threading
+import time
+from collections import namedtuple
+from app.cache.backends import LocalLRUCache, make_shared_backend
+from app.metrics import cache_event
+
+# value, absolute expiry (wall clock, None = never), recompute time, tag versions
+CacheEntry = namedtuple('CacheEntry', ['value', 'expires_at', 'delta', 'tags'])
+
+STAT_FIELDS = ('hits', 'misses', 'local_hits', 'shared_hits', 'sets', 'loads',
+               'early_refreshes', 'evictions', 'invalidations')
+
+
+class _Flight:
+    """Per-key lock shared by the threads loading the same key"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+class AppCache:
+    """
+    Two-tier application cache
+
+    Tier 1 is a per-process LRU, tier 2 a shared store (SQLite file or
+    Redis) configured with ``CACHE_SHARED_URL``. Keys are ``namespace:name``;
+    hit/miss/eviction stats are kept per namespace.
+
+    ``get_or_set`` loads missing values once per key (single flight, across
+    threads and, through the shared tier, across workers) and refreshes hot
+    keys probabilistically shortly before they expire so they never all
+    expire at once.
+    """
+
+    TAG_PREFIX = '__tag__:'
+    LOCK_PREFIX = '__lock__:'
+
+    def __init__(self, app=None):
+        self.default_ttl = 300
+        self.local_ttl = 30
+        self.tag_version_ttl = 1.0
+        self.lock_timeout = 10
+        self.early_refresh_beta = 1.0
+        self.local = LocalLRUCache()
+        self.shared = None
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+        self._tag_versions = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.default_ttl = config.get('CACHE_DEFAULT_TTL', 300)
+        self.local_ttl = config.get('CACHE_LOCAL_TTL', 30)
+        self.tag_version_ttl = config.get('CACHE_TAG_VERSION_TTL', 1.0)
+        self.lock_timeout = config.get('CACHE_LOCK_TIMEOUT', 10)
+        self.early_refresh_beta = config.get('CACHE_EARLY_REFRESH_BETA', 1.0)
+        self.local = LocalLRUCache(config.get('CACHE_LOCAL_MAX_ENTRIES', 1024))
+        self.shared = make_shared_backend(
+            config.get('CACHE_SHARED_URL'),
+            prefix=config.get('CACHE_KEY_PREFIX', 'yca:')
+        )
+        self._tag_versions = {}
+        app.extensions['cache'] = self
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key, default=None):
+        """Return the cached value or ``default`` if missing/expired"""
+        entry = self._lookup(key)
+        if entry is None:
+            self._count(key, 'misses')
+            return default
+        self._count(key, 'hits')
+        return entry.value
+
+    def set(self, key, value, ttl=None, tags=(), delta=0.0):
+        """
+        Store a value in both tiers
+
+        Args:
+            key: ``namespace:name`` cache key
+            value: Any picklable value
+            ttl: Seconds to live; 0 means no expiry, None the default TTL
+            tags: Tags that can later invalidate this entry
+            delta: Seconds the value took to compute (drives early refresh)
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        entry = CacheEntry(
+            value=value,
+            expires_at=time.time() + ttl if ttl else None,
+            delta=delta,
+            tags=tuple((tag, self._tag_version(tag)) for tag in tags),
+        )
+        self._store_local(key, entry, ttl)
+        if self.shared is not None:
+            self.shared.set(key, pickle.dumps(entry, pickle.HIGHEST_PROTOCOL), ttl)
+        self._count(key, 'sets')
+
+    def delete(self, key):
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+        self._count(key, 'invalidations')
+
+    def clear(self):
+        self.local.clear()
+        self._tag_versions = {}
+        if self.shared is not None:
+            self.shared.clear()
+
+    def get_or_set(self, key, loader, ttl=None, tags=()):
+        """
+        Return the cached value, computing it with ``loader()`` when needed
+
+        Only one caller per key runs the loader; the others wait for its
+        result. When an entry is close to expiry one caller may refresh it
+        early while the rest keep getting the current value.
+        """
+        entry = self._lookup(key)
+        if entry is not None and not self._should_refresh_early(entry):
+            self._count(key, 'hits')
+            return entry.value
+
+        flight = self._join_flight(key)
+        try:
+            if entry is not None:
+                # Early refresh: whoever is already refreshing wins
+                if not flight.lock.acquire(blocking=False):
+                    self._count(key, 'hits')
+                    return entry.value
+                self._count(key, 'early_refreshes')
+            else:
+                flight.lock.acquire()
+                # Another thread may have loaded it while we waited
+                entry = self._lookup(key)
+                if entry is not None:
+                    flight.lock.release()
+                    self._count(key, 'hits')
+                    return entry.value
+                self._count(key, 'misses')
+
+            try:
+                return self._load(key, loader, ttl, tags, stale=entry)
+            finally:
+                flight.lock.release()
+        finally:
+            self._leave_flight(key)
+
+    def memoize(self, key, ttl=None, tags=()):
+        """Decorator caching a zero-argument function under ``key``"""
+        def decorator(f):
+            def wrapper():
+                return self.get_or_set(key, f, ttl=ttl, tags=tags)
+            wrapper.__name__ = f.__name__
+            wrapper.__doc__ = f.__doc__
+            return wrapper
+        return decorator
+
+    def invalidate_tag(self, tag):
+        """Invalidate every entry stored with ``tag``"""
+        if self.shared is not None:
+            version = self.shared.incr(self.TAG_PREFIX + tag)
+        else:
+            version = self._tag_versions.get(tag, (0, 0))[0] + 1
+        self._tag_versions[tag] = (version, time.monotonic())
+        self._count(tag + ':', 'invalidations')
+
+    def stats(self):
+        """Per-namespace counters plus the hit ratio"""
+        with self._stats_lock:
+            snapshot = {ns: dict(counts) for ns, counts in self._stats.items()}
+        for counts in snapshot.values():
+            lookups = counts['hits'] + counts['misses']
+            counts['hit_ratio'] = round(counts['hits'] / lookups, 4) if lookups else 0.0
+        return snapshot
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = {}
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _lookup(self, key):
+        entry = self.local.get(key)
+        tier = 'local_hits'
+        if entry is None and self.shared is not None:
+            raw = self.shared.get(key)
+            if raw is not None:
+                entry = pickle.loads(raw)
+                tier = 'shared_hits'
+                if entry.expires_at is None:
+                    self._store_local(key, entry, None)
+                else:
+                    self._store_local(key, entry, entry.expires_at - time.time())
+        if entry is None:
+            return None
+        if entry.expires_at is not None and entry.expires_at <= time.time():
+            self.local.delete(key)
+            return None
+        if any(self._tag_version(tag) != version for tag, version in entry.tags):
+            self.local.delete(key)
+            return None
+        self._count(key, tier)
+        return entry
+
+    def _store_local(self, key, entry, ttl):
+        local_ttl = min(ttl, self.local_ttl) if ttl else self.local_ttl
+        if local_ttl <= 0:
+            return
+        for evicted in self.local.set(key, entry, local_ttl):
+            self._count(evicted, 'evictions')
+
+    def _load(self, key, loader, ttl, tags, stale=None):
+        lock_key = self.LOCK_PREFIX + key
+        holds_lock = True
+        if self.shared is not None:
+            holds_lock = self.shared.add(lock_key, str(os.getpid()).encode(), self.lock_timeout)
+            if not holds_lock:
+                if stale is not None:
+                    return stale.value
+                entry = self._wait_for_shared(key)
+                if entry is not None:
+                    return entry.value
+        try:
+            started = time.perf_counter()
+            value = loader()
+            delta = time.perf_counter() - started
+            self.set(key, value, ttl=ttl, tags=tags, delta=delta)
+            self._count(key, 'loads')
+            return value
+        finally:
+            if self.shared is not None and holds_lock:
+                self.shared.delete(lock_key)
+
+    def _wait_for_shared(self, key):
+        """Poll the shared tier while another worker loads ``key``"""
+        deadline = time.monotonic() + self.lock_timeout
+        pause = 0.005
+        while time.monotonic() < deadline:
+            time.sleep(pause)
+            raw = self.shared.get(key)
+            if raw is not None:
+                entry = pickle.loads(raw)
+                self._store_local(key, entry, self.local_ttl)
+                return entry
+            if self.shared.get(self.LOCK_PREFIX + key) is None:
+                return None
+            pause = min(pause * 2, 0.1)
+        return None
+
+    def _should_refresh_early(self, entry):
+        """XFetch: refresh with rising probability as expiry approaches"""
+        if entry.expires_at is None or not entry.delta or not self.early_refresh_beta:
+            return False
+        jitter = -entry.delta * self.early_refresh_beta * math.log(1.0 - random.random())
+        return time.time() + jitter >= entry.expires_at
+
+    def _tag_version(self, tag):
+        cached = self._tag_versions.get(tag)
+        if self.shared is None:
+            return cached[0] if cached else 0
+        if cached and time.monotonic() - cached[1] < self.tag_version_ttl:
+            return cached[0]
+        version = self.shared.get_int(self.TAG_PREFIX + tag)
+        self._tag_versions[tag] = (version, time.monotonic())
+        return version
+
+    def _join_flight(self, key):
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+            flight.users += 1
+            return flight
+
+    def _leave_flight(self, key):
+        with self._flights_lock:
+            flight = self._flights[key]
+            flight.users -= 1
+            if flight.users == 0:
+                del self._flights[key]
+
+    def _count(self, key, field):
+        namespace = key.split(':', 1)[0] if ':' in key else 'default'
+        with self._stats_lock:
+            counts = self._stats.get(namespace)
+            if counts is None:
+                counts = self._stats[namespace] = dict.fromkeys(STAT_FIELDS, 0)
+            counts[field] += 1
+        cache_event(namespace, field)
+
+
+cache = AppCache()
@@ -1,3 +1,4 @@
+import os
 import click
 from flask.cli import with_appcontext
 from datetime import datetime
@@ -178,12 +179,15 @@ def test_username():
 @with_appcontext
 def list_programs():
     """List all programs in the database."""
+    from app.services.enrollment_service import EnrollmentService
+    
     programs = Program.query.order_by(Program.category, Program.name).all()
     
     if not programs:
         click.echo("❌ No programs found. Run 'flask seed-db' first.")
         return
     
+    enrolled = EnrollmentService.counts_by_program()
     current_category = None
     for program in programs:
         if program.category != current_category:
@@ -196,6 +200,7 @@ def list_programs():
         click.echo(f"    Duration: {program.display_duration}")
         click.echo(f"    Price: {price_display}")
         click.echo(f"    Status: {'Active' if program.is_active else 'Inactive'}")
+        click.echo(f"    Enrolled: {enrolled.get(program.id, 0)}")
     
     click.echo(f"\n📊 Total: {len(programs)} programs")
 
@@ -210,11 +215,14 @@ def list_roles():
         click.echo("❌ No roles found. Run 'flask seed-db' first.")
         return
     
+    from app.services.stats_service import StatsService
+    user_counts = StatsService.role_user_counts(roles)
+    
     click.echo("👥 System Roles:")
     click.echo("-" * 40)
     
     for role in roles:
-        user_count = len(role.users)
+        user_count = user_counts[role.id]
         status = "Active" if role.is_active else "Inactive"
         click.echo(f"  • {role.name}")
         click.echo(f"    Description: {role.description or 'No description'}")
@@ -222,4 +230,287 @@ def list_roles():
         click.echo(f"    Status: {status}")
         click.echo()
     
-    click.echo(f"📊 Total: {len(roles)} roles")
\ No newline at end of file
+    click.echo(f"📊 Total: {len(roles)} roles")
+
+@click.command("precompile-templates")
+@with_appcontext
+def precompile_templates_command():
+    """Compile all templates into the shared bytecode cache."""
+    from flask import current_app
+    from app.templating import precompile_templates
+    
+    compiled, elapsed_ms, failed = precompile_templates(current_app._get_current_object())
+    
+    cache_dir = current_app.config.get('JINJA_BYTECODE_CACHE_DIR') or 'Jinja default temp dir'
+    click.echo(f"✅ Compiled {compiled} templates in {elapsed_ms:.1f} ms")
+    if current_app.config.get('JINJA_BYTECODE_CACHE'):
+        click.echo(f"   📁 Bytecode cache: {cache_dir}")
+    for name in failed:
+        click.echo(f"   ❌ {name} failed to compile")
+
+
+@click.command("cache-clear")
+@with_appcontext
+def cache_clear():
+    """Clear both application cache tiers."""
+    from app.cache import cache
+    
+    cache.clear()
+    tier = type(cache.shared).__name__ if cache.shared is not None else 'none'
+    click.echo(f"✅ Cache cleared (shared tier: {tier})")
+
+
+@click.command("reconcile-stats")
+@with_appcontext
+@click.option('--dry-run', is_flag=True, help='Report drift without fixing it')
+def reconcile_stats(dry_run):
+    """Recount dashboard counters from source tables (run nightly from cron)."""
+    from app.services.stats_service import StatsService
+    
+    drift = StatsService.reconcile(dry_run=dry_run)
+    
+    if not drift:
+        click.echo("✅ All stats counters match")
+        return
+    
+    for name, (stored, actual) in sorted(drift.items()):
+        click.echo(f"  • {name}: stored {stored}, actual {actual}")
+    
+    if dry_run:
+        click.echo(f"⚠️  {len(drift)} counters drifted (dry run, nothing changed)")
+    else:
+        click.echo(f"✅ Corrected {len(drift)} counters")
+
+
+@click.command("export")
+@with_appcontext
+@click.argument('dataset', type=click.Choice(['users', 'registrations']))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'xlsx']), default='csv', help='Output format')
+@click.option('--output', '-o', default=None, help='Output file (default: <dataset>.<format>)')
+def export_data(dataset, fmt, output):
+    """Export users or registrations, streaming rows from the database."""
+    import time
+    from app.services.export_service import ExportService
+    
+    output = output or f"{dataset}.{fmt}"
+    started = time.perf_counter()
+    headers, rows = ExportService.dataset(dataset)
+    
+    exported = 0
+    def counted(rows):
+        nonlocal exported
+        for row in rows:
+            exported += 1
+            yield row
+    
+    if fmt == 'csv':
+        with open(output, 'wb') as f:
+            for chunk in ExportService.stream_csv(headers, counted(rows)):
+                f.write(chunk)
+    else:
+        ExportService.write_xlsx(headers, counted(rows), output, sheet_name=dataset.title())
+    
+    elapsed = time.perf_counter() - started
+    click.echo(f"✅ Exported {exported} {dataset} rows to {output} in {elapsed:.1f}s")
+
+
+@click.command("rollup-registrations")
+@with_appcontext
+@click.option('--rebuild', is_flag=True, help='Recompute every rollup from scratch')
+def rollup_registrations(rebuild):
+    """Fold new registrations into the daily analytics rollups (run from cron)."""
+    from app.services.analytics_service import AnalyticsService
+    
+    if rebuild:
+        count = AnalyticsService.rebuild_rollups()
+        click.echo(f"✅ Rebuilt rollups from {count} users")
+    else:
+        count = AnalyticsService.refresh_rollups()
+        click.echo(f"✅ Folded {count} new users into rollups")
+    
+    status = AnalyticsService.rollup_status()
+    click.echo(f"   Through: {status['through'] or 'no registrations yet'}")
+
+
+@click.command("backfill-enrollments")
+@with_appcontext
+@click.option('--chunk-size', default=1000, show_default=True, help='Users per transaction')
+def backfill_enrollments(chunk_size):
+    """Create enrollment rows from users' selected_programs (safe to re-run)."""
+    from app.services.enrollment_service import EnrollmentService
+    
+    stats = EnrollmentService.backfill(chunk_size=chunk_size)
+    
+    click.echo(f"✅ Scanned {stats['users']} users, created {stats['created']} enrollments")
+    if stats['skipped']:
+        click.echo(f"⚠️  Skipped {stats['skipped']} selections of programs that no longer exist")
+
+
+@click.command("gen-data")
+@with_appcontext
+@click.option('--users', 'count', default=10000, show_default=True, help='Users to generate')
+@click.option('--processes', default=None, type=int, help='Worker processes (default: CPU count)')
+@click.option('--chunk-size', default=10000, show_default=True, help='Users per worker transaction')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows per INSERT batch')
+@click.option('--years', default=3, show_default=True, help='Spread registrations over this many years')
+@click.option('--seed', default=0, show_default=True, help='Random seed (same seed, same data)')
+def gen_data(count, processes, chunk_size, batch_size, years, seed):
+    """Generate synthetic users and enrollments for load testing (never in production)."""
+    from app.services.stats_service import StatsService
+    from seeders.programs_seeder import seed_programs
+    from seeders.roles_seeder import seed_roles
+    from seeders.synthetic import PASSWORD_POOL_SIZE, generate, pool_password
+    
+    if os.environ.get('FLASK_ENV') == 'production':
+        if not click.confirm("⚠️  FLASK_ENV is production. Generate fake users anyway?"):
+            return
+    
+    seed_roles()
+    seed_programs()
+    
+    def progress(done, total):
+        click.echo(f"  {done:,}/{total:,} users")
+    
+    stats = generate(count, processes=processes, chunk_size=chunk_size, batch_size=batch_size,
+                     years=years, seed=seed, progress=progress)
+    click.echo(
+        f"✅ Generated {stats['users']:,} users, {stats['enrollments']:,} enrollments and "
+        f"{stats['sequences']} registration sequences in {stats['seconds']:.1f}s "
+        f"with {stats['processes']} processes"
+    )
+    click.echo(f"   {stats['users_per_second']:,.0f} users/s, {stats['rows_per_second']:,.0f} rows/s")
+    click.echo(f"   Passwords: {pool_password(0)} … {pool_password(PASSWORD_POOL_SIZE - 1)} (user id mod {PASSWORD_POOL_SIZE})")
+    
+    # Bulk inserts skip the ORM hooks that keep the dashboard counters current
+    StatsService.reconcile()
+    click.echo("✅ Stats counters reconciled")
+    click.echo("   Run `flask rollup-registrations --rebuild` to fold the backdated users into analytics")
+
+
+@click.command("profile-token")
+@with_appcontext
+@click.argument('endpoints', nargs=-1, required=True)
+def profile_token(endpoints):
+    """Sign an X-Profile-Token header that profiles the given endpoints ('*' for all)."""
+    from app.profiling import make_profile_token, PROFILE_HEADER
+    from flask import current_app
+    
+    if not current_app.config.get('PROFILING_ENABLED'):
+        click.echo("⚠️  PROFILING_ENABLED is off; the token is ignored until it is turned on")
+    max_age = current_app.config.get('PROFILING_TOKEN_MAX_AGE', 3600)
+    click.echo(f"{PROFILE_HEADER}: {make_profile_token(endpoints)}")
+    click.echo(f"   Valid for {max_age // 60} minutes")
+
+
+@click.command("profile-merge")
+@with_appcontext
+@click.argument('endpoints', nargs=-1)
+@click.option('--format', 'fmt', type=click.Choice(['collapsed', 'speedscope']), default='speedscope',
+              help='collapsed for flamegraph.pl, speedscope for speedscope.app')
+@click.option('--output-dir', '-o', default=None, help='Where to write merged files (default: PROFILING_DIR/merged)')
+def profile_merge(endpoints, fmt, output_dir):
+    """Merge every worker's samples into one flamegraph file per endpoint."""
+    import os
+    from flask import current_app
+    from app.profiling import profile_files, read_collapsed, write_speedscope
+    
+    directory = current_app.config['PROFILING_DIR']
+    grouped = profile_files(directory, endpoints)
+    if not grouped:
+        click.echo(f"⚠️  No samples found in {directory}")
+        return
+    
+    output_dir = output_dir or os.path.join(directory, 'merged')
+    os.makedirs(output_dir, exist_ok=True)
+    interval_ms = current_app.config.get('PROFILING_INTERVAL_MS', 5)
+    
+    for endpoint, paths in grouped.items():
+        stacks = read_collapsed(paths)
+        if fmt == 'collapsed':
+            output = os.path.join(output_dir, f"{endpoint}.collapsed")
+            with open(output, 'w', encoding='utf-8') as f:
+                for stack, count in sorted(stacks.items()):
+                    f.write(f"{stack} {count}\n")
+        else:
+            output = os.path.join(output_dir, f"{endpoint}.speedscope.json")
+            write_speedscope(stacks, endpoint, interval_ms, output)
+        click.echo(f"✅ {endpoint}: {sum(stacks.values())} samples from {len(paths)} files -> {output}")
+
+
+@click.command("startup-report")
+@click.option('--entry-point', type=click.Choice(['web', 'cli', 'worker']), default='web',
+              show_default=True, help='Which app profile to cold-start')
+@click.option('--config', 'config_name', default='default', show_default=True, help='Config name')
+@click.option('--top', default=15, show_default=True, help='Slowest imports to list')
+def startup_report(entry_point, config_name, top):
+    """Cold-start the app in a fresh interpreter and break down where the time goes."""
+    from collections import defaultdict
+    from app.startup import measure_startup
+    
+    report = measure_startup(config_name, entry_point)
+    startup = report['startup']
+    
+    click.echo(f"Cold start ({entry_point}, {config_name}): {report['total_ms']:.0f} ms")
+    click.echo(f"  import app         {report['import_ms']:>8.1f} ms")
+    click.echo(f"  create_app         {startup['create_app_ms']:>8.1f} ms")
+    for phase, ms in startup['phases_ms'].items():
+        click.echo(f"    {phase:<16} {ms:>8.1f} ms")
+    
+    imports = report['imports']
+    packages = defaultdict(int)
+    for name, self_us, _, _ in imports:
+        packages[name.split('.')[0]] += self_us
+    
+    click.echo(f"\nSlowest packages (self time, {len(imports)} modules imported):")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        click.echo(f"  {package:<32} {self_us / 1000:>8.1f} ms")
+    
+    click.echo("\nSlowest imports (cumulative):")
+    for name, _, cumulative_us, depth in sorted(imports, key=lambda row: -row[2])[:top]:
+        click.echo(f"  {name:<48} {cumulative_us / 1000:>8.1f} ms")
+
+
+@click.command("index-advice")
+@click.argument('paths', nargs=-1)
+@click.option('--config', 'config_name', default=lambda: os.environ.get('FLASK_ENV', 'development'),
+              show_default='FLASK_ENV or development', help='Config name (picks the database)')
+@click.option('--as-user', 'email', default=None, help='Request the pages logged in as this user')
+def index_advice(paths, config_name, email):
+    """EXPLAIN the queries behind some pages and propose indexes for full scans."""
+    from app import create_app
+    from app.index_advisor import IndexAdvisor, capture
+    from app.sql_instrumentation import pop_collector
+    
+    paths = paths or ('/', '/courses', '/auth/register', '/auth/api/check-email?email=someone@example.com')
+    web_app = create_app(config_name, entry_point='web')
+    advisor = IndexAdvisor()
+    
+    with web_app.app_context():
+        client = web_app.test_client()
+        if email:
+            user = User.query.filter_by(email=email).first()
+            if user is None:
+                click.echo(f"❌ No user with email {email}")
+                return
+            with client.session_transaction() as session:
+                session['_user_id'] = str(user.id)
+                session['_fresh'] = True
+        
+        for path in paths:
+            log, token = capture()
+            try:
+                status = client.get(path).status_code
+            finally:
+                pop_collector(token)
+            advisor.review(log, path)
+            click.echo(f"  {status} {path}: {len(log.samples)} query shapes")
+    
+    findings = advisor.report()
+    if not findings:
+        click.echo("✅ No full scans with an indexable filter or sort")
+        return
+    click.echo(f"\n⚠️  {len(findings)} proposed indexes:")
+    for finding in findings:
+        click.echo(f"\n  {finding['ddl']};")
+        click.echo(f"    {finding['reason']} on {finding['table']} for {', '.join(sorted(finding['endpoints']))}")
+        click.echo(f"    {finding['query'][:200]}")
@@ -1,6 +1,10 @@
-from flask import Blueprint, render_template
-from flask_login import login_required
+from flask import Blueprint, render_template, jsonify
+from flask_login import current_user, login_required
 from app.decorators import student_required
+from app.extensions import db
+from app.models.cohort import Cohort
+from app.services.enrollment_service import EnrollmentService
+from app.services.cohort_service import CohortService
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -15,7 +19,32 @@ def index():
 @student_required
 def courses():
     """Student courses page"""
-    return render_template('dashboard/courses.html')
+    enrollments = EnrollmentService.courses_for(current_user.id)
+    return render_template('dashboard/courses.html', enrollments=enrollments)
+
+@dashboard_bp.route('/cohorts/<int:cohort_id>/reserve', methods=['POST'])
+@login_required
+@student_required
+def reserve_seat(cohort_id):
+    """Reserve a seat in a cohort (or join its waitlist)"""
+    cohort = db.get_or_404(Cohort, cohort_id)
+    enrollment = CohortService.reserve_seat(current_user, cohort)
+    return jsonify({
+        'status': enrollment.status,
+        'waitlist_position': CohortService.waitlist_position(current_user, cohort),
+    })
+
+@dashboard_bp.route('/cohorts/<int:cohort_id>/cancel', methods=['POST'])
+@login_required
+@student_required
+def cancel_seat(cohort_id):
+    """Give up a seat or waitlist place"""
+    cohort = db.get_or_404(Cohort, cohort_id)
+    try:
+        CohortService.cancel(current_user, cohort)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'status': 'withdrawn'})
 
 @dashboard_bp.route('/assignments')
 @login_required
@@ -0,0 +1,139 @@
+import os
+import time
+from sqlalchemy import event, exc
+from app.metrics import db_pool_capacity, db_pool_invalidated, observe_db_pool
+
+# Connections per eventlet/gevent worker: green threads share one process,
+# so the pool (not the worker) is what bounds concurrent queries
+GREEN_POOL_SIZE = 10
+GREEN_WORKER_CLASSES = frozenset({'eventlet', 'gevent'})
+
+
+def pool_options(config, environ=None):
+    """
+    Pool size for one worker process, derived from the gunicorn worker model
+
+    deploy/gunicorn.conf.py exports the resolved GUNICORN_WORKER_CLASS,
+    GUNICORN_THREADS and GUNICORN_WORKERS. A sync worker serves one request
+    at a time, so it needs one connection plus overflow for background
+    threads (email, exports); gthread needs one per thread; green workers
+    get GREEN_POOL_SIZE. DB_MAX_CONNECTIONS, when set, is split across the
+    workers and caps the result; DB_POOL_SIZE / DB_MAX_OVERFLOW override.
+
+    Returns:
+        dict: pool_size, max_overflow and pool_timeout engine options
+    """
+    environ = os.environ if environ is None else environ
+    worker_class = environ.get('GUNICORN_WORKER_CLASS') or 'sync'
+    threads = int(environ.get('GUNICORN_THREADS') or 1)
+    workers = int(environ.get('GUNICORN_WORKERS') or 1)
+
+    if worker_class in GREEN_WORKER_CLASSES:
+        size, overflow = GREEN_POOL_SIZE, GREEN_POOL_SIZE // 2
+    elif worker_class == 'gthread' or threads > 1:
+        size, overflow = threads, max(2, threads // 4)
+    else:
+        size, overflow = 1, 2
+
+    budget = config.get('DB_MAX_CONNECTIONS')
+    if budget:
+        per_worker = max(1, int(budget) // workers)
+        size = min(size, per_worker)
+        overflow = max(0, min(overflow, per_worker - size))
+
+    if config.get('DB_POOL_SIZE') is not None:
+        size = int(config['DB_POOL_SIZE'])
+    if config.get('DB_MAX_OVERFLOW') is not None:
+        overflow = int(config['DB_MAX_OVERFLOW'])
+
+    return {
+        'pool_size': size,
+        'max_overflow': overflow,
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 10),
+    }
+
+
+def configure_pool(app):
+    """
+    Size the DB pool for this worker (before the engine is created)
+
+    Explicit SQLALCHEMY_ENGINE_OPTIONS win. pool_pre_ping is turned off:
+    instrument_engine pings only connections that sat idle for longer than
+    DB_POOL_PING_IDLE_SECONDS. SQLite keeps SQLAlchemy's own pool.
+    """
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        return
+
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    for name, value in pool_options(app.config).items():
+        options.setdefault(name, value)
+    options.setdefault('pool_pre_ping', False)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    app.extensions['db_pool'] = {
+        name: options[name] for name in ('pool_size', 'max_overflow', 'pool_timeout')
+    }
+
+
+def _ping(dbapi_connection):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('SELECT 1')
+    finally:
+        cursor.close()
+
+
+def instrument_engine(engine, ping_idle_seconds, bind='primary'):
+    """
+    Idle-time liveness checks and pool metrics for one engine
+
+    A connection is pinged on checkout only when it has been idle for more
+    than ``ping_idle_seconds``; a failed ping raises DisconnectionError, so
+    the pool discards it and hands out a fresh connection. Checked-out and
+    overflow counts and every invalidation are reported to app.metrics,
+    labelled with ``bind``.
+    """
+    pool = engine.pool
+
+    @event.listens_for(engine, 'checkout')
+    def _checkout(dbapi_connection, record, proxy):
+        idle_since = record.info.get('idle_since')
+        if idle_since is not None and time.monotonic() - idle_since > ping_idle_seconds:
+            try:
+                _ping(dbapi_connection)
+            except engine.dialect.dbapi.Error as e:
+                raise exc.DisconnectionError(f"Idle connection failed liveness check: {e}") from e
+        observe_db_pool(bind, pool)
+
+    @event.listens_for(engine, 'checkin')
+    def _checkin(dbapi_connection, record):
+        record.info['idle_since'] = time.monotonic()
+        observe_db_pool(bind, pool)
+
+    @event.listens_for(engine, 'invalidate')
+    def _invalidate(dbapi_connection, record, exception):
+        if isinstance(exception, exc.DisconnectionError):
+            db_pool_invalidated(bind, 'ping')
+        else:
+            db_pool_invalidated(bind, 'error' if exception is not None else 'explicit')
+
+    @event.listens_for(engine, 'soft_invalidate')
+    def _soft_invalidate(dbapi_connection, record, exception):
+        db_pool_invalidated(bind, 'soft')
+
+    if hasattr(pool, 'size'):
+        db_pool_capacity(bind, pool.size() + max(0, getattr(pool, '_max_overflow', 0)))
+    return engine
+
+
+def init_db_pool(app):
+    """Instrument every non-SQLite engine of the app (primary binds and replica)"""
+    from app.extensions import db
+
+    ping_idle_seconds = float(app.config.get('DB_POOL_PING_IDLE_SECONDS', 30))
+    with app.app_context():
+        engines = {key or 'primary': engine for key, engine in db.engines.items()}
+    if 'replica' in app.extensions:
+        engines['replica'] = app.extensions['replica'].engine
+    for bind, engine in engines.items():
+        if engine.dialect.name != 'sqlite':
+            instrument_engine(engine, ping_idle_seconds, bind)
@@ -1,34 +1,102 @@
+import threading
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_bcrypt import Bcrypt
-from flask_mail import Mail
-from flask_migrate import Migrate
-from flask_jwt_extended import JWTManager
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
-from flask_socketio import SocketIO
+from app.cache import cache
+from app.replica import RoutingSession
 
-# Database
-db = SQLAlchemy()
+
+class LazyExtension:
+    """
+    Module-level handle for an extension whose package is imported on first use
+
+    ``from app.extensions import mail`` stays cheap; the Flask-Mail import
+    (and object construction) happens the first time an attribute is read,
+    e.g. ``mail.send`` or ``limiter.limit`` at blueprint import.
+    """
+
+    def __init__(self, name, factory):
+        self._name = name
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    @property
+    def loaded(self):
+        return self._instance is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._get(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f'<LazyExtension {self._name} ({state})>'
+
+
+def _make_mail():
+    from flask_mail import Mail
+    return Mail()
+
+
+def _make_migrate():
+    from flask_migrate import Migrate
+    return Migrate()
+
+
+def _make_jwt():
+    from flask_jwt_extended import JWTManager
+    return JWTManager()
+
+
+def _make_limiter():
+    from flask_limiter import Limiter
+    from flask_limiter.util import get_remote_address
+    from app import ratelimit  # noqa: F401 - registers the sqlite:// storage scheme
+    return Limiter(key_func=get_remote_address)
+
+
+def _make_socketio():
+    from flask_socketio import SocketIO
+    return SocketIO(cors_allowed_origins="*")
+
+
+# Database (reads can be routed to a replica, see app/replica.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Authentication
 login_manager = LoginManager()
 bcrypt = Bcrypt()
 
 # Migrations
-migrate = Migrate()
+migrate = LazyExtension('migrate', _make_migrate)
 
 # Email
-mail = Mail()
+mail = LazyExtension('mail', _make_mail)
 
 # JWT for API
-jwt = JWTManager()
+jwt = LazyExtension('jwt', _make_jwt)
 
 # Rate Limiting
-limiter = Limiter(key_func=get_remote_address)
+limiter = LazyExtension('limiter', _make_limiter)
 
 # WebSockets
-socketio = SocketIO(cors_allowed_origins="*")
+socketio = LazyExtension('socketio', _make_socketio)
+
+# Extensions each entry point initializes on top of db, login, bcrypt and cache.
+# The web app serves requests; the CLI only needs migrations and mail; a
+# background worker only sends mail.
+ENTRY_POINT_EXTENSIONS = {
+    'web': ('mail', 'jwt', 'limiter', 'socketio'),
+    'cli': ('mail', 'migrate'),
+    'worker': ('mail',),
+}
 
 # User loader callback for Flask-Login
 @login_manager.user_loader
@@ -37,19 +105,27 @@ def load_user(user_id):
     return User.query.get(int(user_id))
 
 # Initialize all extensions
-def init_extensions(app):
+def init_extensions(app, entry_point='web'):
     db.init_app(app)
     login_manager.init_app(app)
     bcrypt.init_app(app)
-    migrate.init_app(app, db)
-    mail.init_app(app)
-    jwt.init_app(app)
-    limiter.init_app(app)
-    socketio.init_app(app)
-    
+    cache.init_app(app)
+
+    enabled = ENTRY_POINT_EXTENSIONS[entry_point]
+    if 'mail' in enabled:
+        mail.init_app(app)
+    if 'migrate' in enabled:
+        migrate.init_app(app, db)
+    if 'jwt' in enabled:
+        jwt.init_app(app)
+    if 'limiter' in enabled:
+        limiter.init_app(app)
+    if 'socketio' in enabled and app.config.get('SOCKETIO_ENABLED'):
+        socketio.init_app(app)
+
     # Login manager configuration
     login_manager.login_view = 'auth.login'
     login_manager.login_message_category = 'info'
     login_manager.refresh_view = 'auth.login'
-    
-    return app
\ No newline at end of file
+
+    return app
@@ -0,0 +1,272 @@
+import re
+from flask import current_app, request
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.sql_instrumentation import install_listeners, pop_collector, push_collector, statement_shape
+
+_PARAM = r'(?:\?|%s|%\(\w+\)s|:\w+)'
+_ALIAS = re.compile(r'\b(?:FROM|JOIN)\s+`?(\w+)`?(?:\s+AS\s+`?(\w+)`?)?', re.IGNORECASE)
+_ORDER_BY = re.compile(r'\bORDER BY\s+(.*?)(?:\bLIMIT\b|\bOFFSET\b|\bFOR UPDATE\b|$)', re.IGNORECASE | re.DOTALL)
+_SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)', re.IGNORECASE)
+# One plain ORDER BY term: [alias.]column [ASC|DESC] [NULLS FIRST|LAST]; expressions are skipped
+_ORDER_TERM = re.compile(
+    r'^\s*(?:`?(\w+)`?\.)?`?(\w+)`?(?:\s+(?:ASC|DESC))?(?:\s+NULLS\s+(?:FIRST|LAST))?\s*$', re.IGNORECASE
+)
+# Words an unqualified pattern can pick up that are never columns
+_KEYWORDS = {'AND', 'OR', 'NOT', 'NULL', 'TRUE', 'FALSE', 'SELECT', 'WHERE', 'ON', 'CASE', 'WHEN', 'THEN', 'ELSE'}
+
+# MySQL index names are limited to 64 characters
+MAX_INDEX_NAME = 64
+MAX_INDEX_COLUMNS = 4
+
+
+def table_aliases(statement):
+    """{alias or table name: table name} for every FROM/JOIN in a statement"""
+    aliases = {}
+    for table, alias in _ALIAS.findall(statement):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+
+def _columns(pattern, text):
+    seen = []
+    for column in re.findall(pattern, text, re.IGNORECASE):
+        if isinstance(column, tuple):  # qualified or bare alternative, whichever matched
+            column = next(filter(None, column))
+        if column not in seen and column.upper() not in _KEYWORDS:
+            seen.append(column)
+    return seen
+
+
+def order_by_columns(statement):
+    """(alias or None, column) for each plain ORDER BY term, in order"""
+    order_by = _ORDER_BY.search(statement)
+    if not order_by:
+        return []
+    terms = [_ORDER_TERM.match(term) for term in order_by.group(1).split(',')]
+    return [(term.group(1), term.group(2)) for term in terms if term]
+
+
+def sort_alias(statement, aliases):
+    """
+    The alias whose columns the ORDER BY sorts on
+
+    The first qualified term decides; unqualified terms can only belong to
+    the table when the statement reads a single one. None when neither
+    applies (e.g. ORDER BY a computed expression).
+    """
+    for alias, _ in order_by_columns(statement):
+        if alias in aliases:
+            return alias
+    if order_by_columns(statement) and len(set(aliases.values())) == 1:
+        return next(iter(aliases))
+    return None
+
+
+def propose_index(statement, alias, unqualified=False):
+    """
+    Columns for an index on ``alias`` that serves this statement
+
+    Equality filters (``=``, ``IN``, ``IS NULL`` and join keys) come first,
+    then the ORDER BY columns, then the first range filter, which is the
+    order a B-tree can use them in. With ``unqualified`` (only safe when
+    the statement reads one table) bare column names count too.
+
+    Returns:
+        list: column names (empty when the statement does not filter or
+        sort on the table)
+    """
+    prefix = rf'\b`?{re.escape(alias)}`?\.`?(\w+)`?'
+    if unqualified:
+        prefix = rf'(?:{prefix}|(?<![\w.`:@%])`?([A-Za-z_]\w*)`?)'
+    where = _ORDER_BY.split(statement)[0]
+    equality = _columns(
+        prefix + rf'\s*(?:=\s*(?:{_PARAM}|`?\w+`?\.`?\w+`?|\d+|\'[^\']*\')|IS NULL|IN\s*\()', where
+    )
+    equality += _columns(rf'(?:=|\bIN)\s*{prefix}', where)
+    ranges = _columns(prefix + r'\s*(?:<|>|<=|>=|!=|<>|BETWEEN|LIKE|IS NOT NULL)', where)
+    ordering = [
+        column for qualifier, column in order_by_columns(statement)
+        if qualifier == alias or (unqualified and qualifier is None)
+    ]
+
+    columns = []
+    for column in equality + ordering + ranges[:1]:
+        if column not in columns:
+            columns.append(column)
+    return columns[:MAX_INDEX_COLUMNS]
+
+
+def index_name(table, columns):
+    return f"ix_{table}_{'_'.join(columns)}"[:MAX_INDEX_NAME]
+
+
+def explain(connection, statement, parameters):
+    """
+    Tables the planner reads in full for a SELECT
+
+    Returns:
+        list: (table or alias, reason) pairs; empty for dialects without a
+        supported EXPLAIN
+    """
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters or ()).fetchall()
+        scans = []
+        for row in rows:
+            detail = row[-1]
+            match = _SQLITE_SCAN.match(detail)
+            if match and 'INDEX' not in detail.upper():
+                scans.append((match.group(1), 'full scan'))
+            elif detail.startswith('USE TEMP B-TREE FOR ORDER BY'):
+                scans.append((None, 'sort without index'))
+        return scans
+    if dialect == 'mysql':
+        result = connection.exec_driver_sql('EXPLAIN ' + statement, parameters or ())
+        keys = list(result.keys())
+        scans = []
+        for row in result.fetchall():
+            row = dict(zip(keys, row))
+            if row.get('type') == 'ALL':
+                scans.append((row.get('table'), 'full scan'))
+            elif 'Using filesort' in (row.get('Extra') or ''):
+                scans.append((row.get('table'), 'sort without index'))
+        return scans
+    return []
+
+
+class ShapeLog:
+    """Collector keeping the first statement and parameters of each SELECT shape"""
+
+    stack_depth = 0
+
+    def __init__(self):
+        self.samples = {}
+
+    def record(self, statement, elapsed_ms, site, parameters=None):
+        if not statement.lstrip()[:6].upper() == 'SELECT':
+            return
+        self.samples.setdefault(statement_shape(statement), (statement, parameters))
+
+
+class IndexAdvisor:
+    """
+    EXPLAINs each SELECT shape once and collects full scans with index proposals
+
+    ``findings`` is keyed by proposed index name; each finding lists the
+    endpoints whose queries would use it.
+    """
+
+    def __init__(self):
+        self.explained = {}  # shape -> [finding names]
+        self.findings = {}
+
+    def review(self, log, endpoint, connection_factory=None):
+        """
+        EXPLAIN the shapes in ``log`` not seen before
+
+        Returns:
+            list: findings that are new in this review
+        """
+        new = []
+        pending = {shape: sample for shape, sample in log.samples.items() if shape not in self.explained}
+        for shape in log.samples:
+            for name in self.explained.get(shape, ()):
+                self.findings[name]['endpoints'].add(endpoint)
+        if not pending:
+            return new
+
+        connect = connection_factory or db.engine.connect
+        with connect() as connection:
+            for shape, (statement, parameters) in pending.items():
+                names = []
+                try:
+                    scans = explain(connection, statement, parameters)
+                except SQLAlchemyError:  # e.g. a dialect-specific statement EXPLAIN rejects
+                    scans = []
+                aliases = table_aliases(statement)
+                single_table = len(set(aliases.values())) == 1
+                for alias, reason in scans:
+                    if alias is None:  # SQLite sort: the table the ORDER BY columns belong to
+                        alias = sort_alias(statement, aliases)
+                    table = aliases.get(alias, alias)
+                    columns = propose_index(statement, alias, unqualified=single_table) if alias else []
+                    if not table or not columns:
+                        current_app.logger.info(
+                            f"Index advisor: {reason} on {table or 'an unknown table'}, no proposal\n"
+                            f"    for {shape[:300]}"
+                        )
+                        continue
+                    name = index_name(table, columns)
+                    finding = self.findings.get(name)
+                    if finding is None:
+                        finding = self.findings[name] = {
+                            'index': name,
+                            'table': table,
+                            'columns': columns,
+                            'reason': reason,
+                            'ddl': f"CREATE INDEX {name} ON {table} ({', '.join(columns)})",
+                            'query': shape,
+                            'endpoints': set(),
+                        }
+                        new.append(finding)
+                    finding['endpoints'].add(endpoint)
+                    names.append(name)
+                self.explained[shape] = names
+        return new
+
+    def report(self):
+        """Findings, most widely used first"""
+        return sorted(self.findings.values(), key=lambda f: (-len(f['endpoints']), f['index']))
+
+
+def capture():
+    """Start collecting SELECT shapes in this context; returns (log, token)"""
+    for engine in db.engines.values():
+        install_listeners(engine)
+    log = ShapeLog()
+    return log, push_collector(log)
+
+
+def init_index_advisor(app):
+    """
+    Development aid: EXPLAIN every new query shape and log missing indexes
+
+    With SQL_INDEX_ADVISOR on, each request's SELECT shapes are explained
+    once per process after the response; full scans and unindexed sorts are
+    logged with a proposed composite index and kept in
+    app.extensions['index_advisor']. `flask index-advice` does the same for
+    a list of pages without a running server. Never enable in production:
+    every new shape costs an extra EXPLAIN round trip.
+    """
+    if not app.config.get('SQL_INDEX_ADVISOR', False):
+        return
+
+    advisor = IndexAdvisor()
+    app.extensions['index_advisor'] = advisor
+
+    @app.before_request
+    def _capture_shapes():
+        log, token = capture()
+        request.environ['index_advisor.capture'] = (log, token)
+
+    @app.teardown_request
+    def _review_shapes(exc):
+        captured = request.environ.pop('index_advisor.capture', None)
+        if captured is None:
+            return
+        log, token = captured
+        pop_collector(token)
+        endpoint = request.endpoint or request.path
+        try:
+            findings = advisor.review(log, endpoint)
+        except Exception as e:
+            app.logger.warning(f"Index advisor could not review {endpoint}: {e}")
+            return
+        for finding in findings:
+            app.logger.warning(
+                f"Index advisor: {finding['reason']} on {finding['table']} in {endpoint}; "
+                f"consider {finding['ddl']}\n    for {finding['query'][:300]}"
+            )
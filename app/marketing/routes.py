@@ -5,12 +5,18 @@ from app.models.program import Program
 
 marketing_bp = Blueprint('marketing', __name__)
 
+def _featured_programs():
+    return Program.query.filter_by(is_featured=True).limit(6).all()
+
 @marketing_bp.route('/')
 def index():
     """Home page"""
-    # Get featured programs from database
-    featured_programs = Program.query.filter_by(is_featured=True).limit(6).all()
-    return render_template('marketing/index.html', featured_programs=featured_programs)
+    # Featured programs are queried only when the cached fragment is stale
+    return render_template(
+        'marketing/index.html',
+        featured_programs=_featured_programs,
+        catalog_version=Program.catalog_version()
+    )
 
 @marketing_bp.route('/about')
 def about():
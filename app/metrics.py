@@ -0,0 +1,250 @@
+import os
+import time
+from contextlib import contextmanager
+from flask import Response, abort, current_app, request
+from sqlalchemy.pool import QueuePool
+
+# Built once per process by init_metrics; every helper below is a no-op
+# while this is None (metrics disabled or prometheus_client missing)
+_metrics = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CHECKOUT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+BCRYPT_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0, 5.0)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            observe_db_checkout(time.perf_counter() - started)
+
+
+class _Metrics:
+    """The process-wide metric objects"""
+
+    def __init__(self, prometheus_client, namespace):
+        Histogram, Gauge, Counter = (
+            prometheus_client.Histogram, prometheus_client.Gauge, prometheus_client.Counter
+        )
+        self.client = prometheus_client
+        self.request_latency = Histogram(
+            'http_request_duration_seconds', 'Request latency by endpoint',
+            ['endpoint', 'method', 'status'], namespace=namespace, buckets=LATENCY_BUCKETS,
+        )
+        self.in_progress = Gauge(
+            'http_requests_in_progress', 'Requests being handled',
+            namespace=namespace, multiprocess_mode='livesum',
+        )
+        self.db_checkout_wait = Histogram(
+            'db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled DB connection',
+            namespace=namespace, buckets=CHECKOUT_BUCKETS,
+        )
+        self.db_pool_capacity = Gauge(
+            'db_pool_capacity_connections', 'Pool size plus max overflow (sum = worst case connections)',
+            ['bind'], namespace=namespace, multiprocess_mode='livesum',
+        )
+        self.db_pool_checked_out = Gauge(
+            'db_pool_checked_out_connections', 'Connections currently checked out of the pool',
+            ['bind'], namespace=namespace, multiprocess_mode='livesum',
+        )
+        self.db_pool_overflow = Gauge(
+            'db_pool_overflow_connections', 'Connections open beyond pool_size',
+            ['bind'], namespace=namespace, multiprocess_mode='livesum',
+        )
+        self.db_pool_invalidations = Counter(
+            'db_pool_invalidations_total', 'Pooled connections discarded (failed ping, error, soft)',
+            ['bind', 'reason'], namespace=namespace,
+        )
+        self.email_queue_depth = Gauge(
+            'email_queue_depth', 'Emails queued or being sent',
+            namespace=namespace, multiprocess_mode='livesum',
+        )
+        self.bcrypt_in_progress = Gauge(
+            'bcrypt_in_progress', 'Password hashes being computed (saturation)',
+            namespace=namespace, multiprocess_mode='livesum',
+        )
+        self.bcrypt_duration = Histogram(
+            'bcrypt_duration_seconds', 'Time to hash or check a password',
+            ['operation'], namespace=namespace, buckets=BCRYPT_BUCKETS,
+        )
+        self.admission_in_flight = Gauge(
+            'admission_in_flight', 'Admitted requests being handled, by endpoint class',
+            ['endpoint_class'], namespace=namespace, multiprocess_mode='livesum',
+        )
+        self.admission_shed = Counter(
+            'admission_shed_total', 'Requests shed with 503 by admission control',
+            ['endpoint_class'], namespace=namespace,
+        )
+        self.cache_events = Counter(
+            'cache_events_total', 'Application cache hits, misses and other events',
+            ['namespace', 'event'], namespace=namespace,
+        )
+
+
+# ---- Recording helpers -----------------------------------------------------
+
+def observe_db_checkout(seconds):
+    if _metrics is not None:
+        _metrics.db_checkout_wait.observe(seconds)
+
+
+def db_pool_capacity(bind, connections):
+    if _metrics is not None:
+        _metrics.db_pool_capacity.labels(bind).inc(connections)
+
+
+def observe_db_pool(bind, pool):
+    """Record checked-out and overflow counts (QueuePool only)"""
+    if _metrics is not None and hasattr(pool, 'checkedout'):
+        _metrics.db_pool_checked_out.labels(bind).set(pool.checkedout())
+        _metrics.db_pool_overflow.labels(bind).set(max(0, pool.overflow()))
+
+
+def db_pool_invalidated(bind, reason):
+    if _metrics is not None:
+        _metrics.db_pool_invalidations.labels(bind, reason).inc()
+
+
+def email_enqueued():
+    if _metrics is not None:
+        _metrics.email_queue_depth.inc()
+
+
+def email_finished():
+    if _metrics is not None:
+        _metrics.email_queue_depth.dec()
+
+
+@contextmanager
+def track_bcrypt(operation):
+    """Time a bcrypt hash/check and count it as in progress while it runs"""
+    if _metrics is None:
+        yield
+        return
+    _metrics.bcrypt_in_progress.inc()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _metrics.bcrypt_duration.labels(operation).observe(time.perf_counter() - started)
+        _metrics.bcrypt_in_progress.dec()
+
+
+def cache_event(namespace, event):
+    if _metrics is not None:
+        _metrics.cache_events.labels(namespace, event).inc()
+
+
+def admission_started(endpoint_class):
+    if _metrics is not None:
+        _metrics.admission_in_flight.labels(endpoint_class).inc()
+
+
+def admission_finished(endpoint_class):
+    if _metrics is not None:
+        _metrics.admission_in_flight.labels(endpoint_class).dec()
+
+
+def admission_shed(endpoint_class):
+    if _metrics is not None:
+        _metrics.admission_shed.labels(endpoint_class).inc()
+
+
+# ---- Flask integration -------------------------------------------------------
+
+def _start_timer():
+    request.environ['metrics.started'] = time.perf_counter()
+    _metrics.in_progress.inc()
+
+
+def _observe(response):
+    started = request.environ.get('metrics.started')
+    if started is not None:
+        endpoint = request.url_rule.endpoint if request.url_rule else 'unmatched'
+        _metrics.request_latency.labels(
+            endpoint, request.method, f"{response.status_code // 100}xx"
+        ).observe(time.perf_counter() - started)
+    return response
+
+
+def _finish(exc):
+    if request.environ.pop('metrics.started', None) is not None:
+        _metrics.in_progress.dec()
+
+
+def metrics_view():
+    """Prometheus text exposition, merged across workers in multiprocess mode"""
+    token = current_app.config.get('METRICS_AUTH_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        abort(401)
+
+    client = _metrics.client
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        registry = client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = client.REGISTRY
+    return Response(client.generate_latest(registry), mimetype=client.CONTENT_TYPE_LATEST)
+
+
+def _build_metrics(app):
+    global _metrics
+    if _metrics is not None:
+        return _metrics
+
+    # prometheus_client picks its storage when first imported
+    multiproc_dir = app.config.get('METRICS_MULTIPROC_DIR')
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', multiproc_dir)
+    try:
+        import prometheus_client
+    except ImportError:
+        app.logger.warning("METRICS_ENABLED is set but prometheus_client is not installed")
+        return None
+
+    _metrics = _Metrics(prometheus_client, app.config.get('METRICS_NAMESPACE', 'yca'))
+    return _metrics
+
+
+def init_metrics(app):
+    """
+    Request, DB pool, email, bcrypt and cache metrics served at /metrics
+
+    Called before the extensions so the DB engine is created with the
+    timed pool. With METRICS_MULTIPROC_DIR set (see deploy/gunicorn.conf.py)
+    every worker writes to the shared directory and /metrics on any worker
+    reports the sum.
+
+    Outside debug and testing the endpoint is only registered when
+    METRICS_AUTH_TOKEN is set: route names, latencies and error rates are
+    not for the public. Without a token the samples are still collected
+    (a sidecar can read METRICS_MULTIPROC_DIR) but nothing is served.
+    """
+    if not app.config.get('METRICS_ENABLED', False) or _build_metrics(app) is None:
+        return
+
+    if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        options.setdefault('poolclass', TimedQueuePool)
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    app.before_request(_start_timer)
+    app.after_request(_observe)
+    app.teardown_request(_finish)
+    app.extensions['metrics'] = _metrics
+
+    if not (app.debug or app.testing or app.config.get('METRICS_AUTH_TOKEN')):
+        app.logger.warning("METRICS_AUTH_TOKEN is not set; /metrics is not served")
+        return
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+
+    # Scrapes every few seconds must not eat into the default rate limits
+    from app.extensions import limiter
+    limiter.exempt(metrics_view)
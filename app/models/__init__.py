@@ -1,3 +1,8 @@
 from .user import User
 from .role import Role
-from .user_roles import user_roles
\ No newline at end of file
+from .user_roles import user_roles
+from .stats_counter import StatsCounter
+from .registration_rollup import RegistrationRollup, RollupWatermark
+from .enrollment import Enrollment
+from .cohort import Cohort, CohortWaitlist
+from .replica_heartbeat import ReplicaHeartbeat
@@ -0,0 +1,73 @@
+from app.extensions import db
+from datetime import datetime
+
+class Cohort(db.Model):
+    """An intake of a program with a fixed number of seats"""
+    __tablename__ = 'cohorts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    program_id = db.Column(db.Integer, db.ForeignKey('programs.id', ondelete='CASCADE'), nullable=False)
+    code = db.Column(db.String(10), nullable=False, default='A')  # Same identifier as RegistrationSequence.cohort
+    name = db.Column(db.String(100))
+    starts_on = db.Column(db.Date)
+    ends_on = db.Column(db.Date)
+
+    # Seats are only ever changed with conditional UPDATEs (see CohortService)
+    capacity = db.Column(db.Integer, nullable=False)
+    seats_available = db.Column(db.Integer, nullable=False)
+    is_open = db.Column(db.Boolean, nullable=False, default=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    program = db.relationship('Program', back_populates='cohorts')
+
+    __table_args__ = (
+        db.UniqueConstraint('program_id', 'code', name='uq_cohorts_program_code'),
+        db.CheckConstraint('seats_available >= 0', name='ck_cohorts_seats_nonnegative'),
+        db.CheckConstraint('seats_available <= capacity', name='ck_cohorts_seats_within_capacity'),
+    )
+
+    def __repr__(self):
+        return f'<Cohort {self.program_id}/{self.code}: {self.seats_available}/{self.capacity} free>'
+
+    @property
+    def seats_taken(self):
+        return self.capacity - self.seats_available
+
+    @property
+    def is_full(self):
+        return self.seats_available <= 0
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'program_id': self.program_id,
+            'code': self.code,
+            'name': self.name,
+            'capacity': self.capacity,
+            'seats_available': self.seats_available,
+            'is_open': self.is_open,
+            'starts_on': self.starts_on.isoformat() if self.starts_on else None,
+        }
+
+
+class CohortWaitlist(db.Model):
+    """Students queued for a full cohort; the id gives FIFO order"""
+    __tablename__ = 'cohort_waitlist'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cohort_id = db.Column(db.Integer, db.ForeignKey('cohorts.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    user = db.relationship('User')
+
+    __table_args__ = (
+        db.UniqueConstraint('cohort_id', 'user_id', name='uq_cohort_waitlist_user'),
+        db.Index('ix_cohort_waitlist_cohort_id_id', 'cohort_id', 'id'),
+    )
+
+    def __repr__(self):
+        return f'<CohortWaitlist cohort={self.cohort_id} user={self.user_id}>'
@@ -0,0 +1,51 @@
+from app.extensions import db
+from datetime import datetime
+
+class Enrollment(db.Model):
+    """A user's enrollment in a program"""
+    __tablename__ = 'enrollments'
+
+    STATUS_PENDING = 'pending'      # registered, not yet started
+    STATUS_ACTIVE = 'active'
+    STATUS_COMPLETED = 'completed'
+    STATUS_WITHDRAWN = 'withdrawn'
+    STATUS_WAITLISTED = 'waitlisted'  # queued for a full cohort
+    STATUSES = (STATUS_PENDING, STATUS_ACTIVE, STATUS_COMPLETED, STATUS_WITHDRAWN, STATUS_WAITLISTED)
+    CURRENT_STATUSES = (STATUS_PENDING, STATUS_ACTIVE)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    program_id = db.Column(db.Integer, db.ForeignKey('programs.id', ondelete='CASCADE'), nullable=False)
+    cohort = db.Column(db.String(20))
+    cohort_id = db.Column(db.Integer, db.ForeignKey('cohorts.id', ondelete='SET NULL', name='fk_enrollments_cohort_id'))  # seat-limited cohorts
+    status = db.Column(db.String(20), nullable=False, default=STATUS_PENDING)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    user = db.relationship('User', back_populates='enrollments')
+    program = db.relationship('Program', back_populates='enrollments')
+
+    # (user_id, program_id) serves "my courses"; the program-led indexes serve
+    # rosters and counts without touching the users table
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'program_id', name='uq_enrollments_user_program'),
+        db.Index('ix_enrollments_program_status_user', 'program_id', 'status', 'user_id'),
+        db.Index('ix_enrollments_program_cohort_status', 'program_id', 'cohort', 'status'),
+        db.Index('ix_enrollments_cohort_id_user', 'cohort_id', 'user_id'),
+    )
+
+    def __repr__(self):
+        return f'<Enrollment user={self.user_id} program={self.program_id} {self.status}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'program_id': self.program_id,
+            'cohort': self.cohort,
+            'cohort_id': self.cohort_id,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
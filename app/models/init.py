@@ -3,5 +3,10 @@ from .user import User
 from .role import Role
 from .registration_sequence import RegistrationSequence
 from .program import Program
+from .enrollment import Enrollment
+from .cohort import Cohort, CohortWaitlist
+from .stats_counter import StatsCounter
+from .registration_rollup import RegistrationRollup, RollupWatermark
 
-__all__ = ['User', 'Role', 'RegistrationSequence', 'Program']
\ No newline at end of file
+__all__ = ['User', 'Role', 'RegistrationSequence', 'Program', 'Enrollment', 'Cohort',
+           'CohortWaitlist', 'StatsCounter', 'RegistrationRollup', 'RollupWatermark']
\ No newline at end of file
@@ -1,5 +1,8 @@
 from app.extensions import db
+from app.cache import cache
 from datetime import datetime
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, object_session
 
 class Program(db.Model):
     """Program/Course model"""
@@ -36,9 +39,17 @@ class Program(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Marketing and registration pages list active programs and the featured ones
+    __table_args__ = (
+        db.Index('ix_programs_active_category', 'is_active', 'category'),
+        db.Index('ix_programs_featured_active', 'is_featured', 'is_active'),
+    )
+    
     # Relationships
-    # enrollments = db.relationship('Enrollment', back_populates='program', cascade='all, delete-orphan')
-    # cohorts = db.relationship('Cohort', back_populates='program', cascade='all, delete-orphan')
+    enrollments = db.relationship('Enrollment', back_populates='program', cascade='all, delete-orphan',
+                                  passive_deletes=True, lazy='dynamic')
+    cohorts = db.relationship('Cohort', back_populates='program', cascade='all, delete-orphan',
+                              passive_deletes=True)
     
     def __repr__(self):
         return f'<Program {self.code}: {self.name}>'
@@ -61,6 +72,22 @@ class Program(db.Model):
             return f"₦{self.discount_price:,.2f} (₦{self.price_ngn:,.2f})"
         return f"₦{self.price_ngn:,.2f}"
     
+    CATALOG_VERSION_KEY = 'catalog:version'
+    CATALOG_TAG = 'catalog'
+    
+    @classmethod
+    def catalog_version(cls):
+        """Token that changes whenever any program is added, edited or removed"""
+        version = cache.get(cls.CATALOG_VERSION_KEY)
+        if version is None:
+            count, last_updated = db.session.query(
+                func.count(cls.id), func.max(cls.updated_at)
+            ).one()
+            stamp = last_updated.strftime('%Y%m%d%H%M%S%f') if last_updated else '0'
+            version = f"{count}-{stamp}"
+            cache.set(cls.CATALOG_VERSION_KEY, version, 60, tags=[cls.CATALOG_TAG])
+        return version
+    
     def to_dict(self):
         """Convert to dictionary for API responses"""
         return {
@@ -76,4 +103,25 @@ class Program(db.Model):
             'learning_outcomes': self.learning_outcomes,
             'is_active': self.is_active,
             'is_featured': self.is_featured
-        }
\ No newline at end of file
+        }
+
+
+@event.listens_for(Program, 'after_insert')
+@event.listens_for(Program, 'after_update')
+@event.listens_for(Program, 'after_delete')
+def _mark_catalog_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info['catalog_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_catalog(session):
+    # Invalidate only once the change is visible to other connections
+    if session.info.pop('catalog_changed', False):
+        cache.invalidate_tag(Program.CATALOG_TAG)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_catalog_change(session):
+    session.info.pop('catalog_changed', None)
@@ -0,0 +1,80 @@
+from app.extensions import db
+from app.models.upsert import increment_upsert
+from datetime import datetime
+
+class RegistrationRollup(db.Model):
+    """Daily signup counts per program, state and gender"""
+    __tablename__ = 'registration_daily_rollups'
+
+    # program_id ALL_PROGRAMS counts each signup once, whatever they selected;
+    # the other rows count one signup per selected program.
+    ALL_PROGRAMS = 0
+    UNKNOWN = ''  # state not given
+
+    day = db.Column(db.Date, primary_key=True)
+    program_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    state = db.Column(db.String(100), primary_key=True)
+    gender = db.Column(db.String(10), primary_key=True)
+    signups = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_registration_rollups_program_day', 'program_id', 'day'),
+    )
+
+    def __repr__(self):
+        return f'<RegistrationRollup {self.day} program={self.program_id} {self.state}/{self.gender}: {self.signups}>'
+
+    @classmethod
+    def apply_counts(cls, connection, counts):
+        """
+        Add signup counts on ``connection`` (inside the caller's transaction)
+
+        All keys go in one multi-row upsert, sorted so concurrent rollups
+        lock rows in the same order; dialects without one fall back to an
+        UPDATE then INSERT per key.
+
+        Args:
+            connection: SQLAlchemy connection
+            counts: dict of (day, program_id, state, gender) -> signups to add
+        """
+        now = datetime.utcnow()
+        rows = [
+            {'day': day, 'program_id': program_id, 'state': state, 'gender': gender,
+             'signups': signups, 'updated_at': now}
+            for (day, program_id, state, gender), signups in sorted(counts.items())
+        ]
+        if not rows:
+            return
+        table = cls.__table__
+        stmt = increment_upsert(table, rows, ['day', 'program_id', 'state', 'gender'], 'signups',
+                                connection.dialect.name)
+        if stmt is not None:
+            connection.execute(stmt)
+            return
+        for row in rows:
+            key = (
+                (table.c.day == row['day']) & (table.c.program_id == row['program_id'])
+                & (table.c.state == row['state']) & (table.c.gender == row['gender'])
+            )
+            result = connection.execute(
+                table.update().where(key).values(signups=table.c.signups + row['signups'], updated_at=now)
+            )
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(row))
+
+
+class RollupWatermark(db.Model):
+    """How far an incremental rollup has read its source table"""
+    __tablename__ = 'rollup_watermarks'
+
+    name = db.Column(db.String(50), primary_key=True)
+    # Keyset position of the last source row folded in
+    last_created_at = db.Column(db.DateTime)
+    last_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    REGISTRATIONS = 'registrations.daily'
+
+    def __repr__(self):
+        return f'<RollupWatermark {self.name} @ {self.last_created_at}/{self.last_id}>'
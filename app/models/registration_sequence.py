@@ -1,6 +1,8 @@
 from app.extensions import db
 from datetime import datetime
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import UniqueConstraint, insert, select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from app.models.upsert import increment_upsert
 
 class RegistrationSequence(db.Model):
     """Track registration sequences for username generation"""
@@ -61,32 +63,61 @@ class RegistrationSequence(db.Model):
     def __repr__(self):
         return f'<RegistrationSequence {self.year}/{self.role_code}/{self.program_code}/{self.cohort}: {self.current_sequence}>'
     
+    # MySQL error for a transaction InnoDB rolled back to break a deadlock
+    MYSQL_DEADLOCK = 1213
+    DEADLOCK_RETRIES = 3
+
     @classmethod
     def get_next_sequence(cls, year, role_code, program_code, cohort='A'):
-        """Get next sequence number with row locking for concurrency safety"""
-        from sqlalchemy import func
-        
-        # Start transaction with row locking
-        sequence = cls.query.filter_by(
-            year=year,
-            role_code=role_code,
-            program_code=program_code,
-            cohort=cohort
-        ).with_for_update().first()
-        
-        if not sequence:
-            # Create new sequence if doesn't exist
-            sequence = cls(
-                year=year,
-                role_code=role_code,
-                program_code=program_code,
-                cohort=cohort,
-                current_sequence=0
-            )
-            db.session.add(sequence)
-        
-        # Increment and return
-        sequence.current_sequence += 1
+        """
+        Allocate the next number for a sequence key and commit it
+
+        The allocation is one INSERT ... ON DUPLICATE KEY UPDATE (ON CONFLICT
+        DO UPDATE on SQLite and PostgreSQL) that creates the row at 1 or adds
+        1 under its row lock, and the value is read back in the same
+        transaction, so concurrent callers never see the same number. Unlike
+        a zero-row UPDATE followed by an INSERT, two first callers for a new
+        key do not take gap locks that deadlock each other on MySQL; should
+        InnoDB still pick a deadlock victim, the allocation is retried up to
+        DEADLOCK_RETRIES times. Other dialects UPDATE, then INSERT, retrying
+        the UPDATE if another process inserted the row first.
+
+        Returns:
+            int: The allocated sequence number (1 for a new key)
+        """
+        attempt = 0
+        while True:
+            try:
+                return cls._allocate(year, role_code, program_code, cohort)
+            except OperationalError as e:
+                db.session.rollback()
+                attempt += 1
+                if getattr(e.orig, 'args', (None,))[0] != cls.MYSQL_DEADLOCK or attempt > cls.DEADLOCK_RETRIES:
+                    raise
+
+    @classmethod
+    def _allocate(cls, year, role_code, program_code, cohort):
+        key = (
+            (cls.year == year) & (cls.role_code == role_code)
+            & (cls.program_code == program_code) & (cls.cohort == cohort)
+        )
+        row = {
+            'year': year, 'role_code': role_code, 'program_code': program_code, 'cohort': cohort,
+            'current_sequence': 1, 'updated_at': datetime.utcnow(),
+        }
+        upsert = increment_upsert(cls.__table__, [row], ['year', 'role_code', 'program_code', 'cohort'],
+                                  'current_sequence', db.session.get_bind().dialect.name)
+        if upsert is not None:
+            db.session.execute(upsert)
+        else:
+            increment = update(cls).where(key).values(current_sequence=cls.current_sequence + 1)
+            if db.session.execute(increment, execution_options={'synchronize_session': False}).rowcount == 0:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(insert(cls).values(row))
+                except IntegrityError:
+                    db.session.execute(increment, execution_options={'synchronize_session': False})
+
+        sequence = db.session.execute(select(cls.current_sequence).where(key)).scalar_one()
         db.session.commit()
-        
-        return sequence.current_sequence
\ No newline at end of file
+        return sequence
@@ -0,0 +1,18 @@
+from app.extensions import db
+
+class ReplicaHeartbeat(db.Model):
+    """
+    Single row the primary stamps and the replica receives through replication
+
+    The gap between the stamp on the primary and the one visible on the
+    replica is the replica's lag (see app.replica.ReplicaLagGuard).
+    """
+    __tablename__ = 'replica_heartbeat'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    beat_ms = db.Column(db.BigInteger, nullable=False)  # epoch milliseconds
+
+    ROW_ID = 1
+
+    def __repr__(self):
+        return f'<ReplicaHeartbeat {self.beat_ms}>'
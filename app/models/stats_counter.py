@@ -0,0 +1,151 @@
+from app.extensions import db
+from app.models.user import User
+from app.models.program import Program
+from app.models.upsert import increment_upsert
+from datetime import datetime
+from collections import Counter
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+class StatsCounter(db.Model):
+    """Pre-computed counts for dashboards, kept in step with every flush"""
+    __tablename__ = 'stats_counters'
+
+    name = db.Column(db.String(100), primary_key=True)  # e.g. users.total, roles.4.users
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    USERS_TOTAL = 'users.total'
+    USERS_ACTIVE = 'users.active'
+    PROGRAMS_TOTAL = 'programs.total'
+    PROGRAMS_ACTIVE = 'programs.active'
+
+    def __repr__(self):
+        return f'<StatsCounter {self.name}={self.value}>'
+
+    @staticmethod
+    def role_users_key(role_id):
+        return f'roles.{role_id}.users'
+
+    @classmethod
+    def get_values(cls, names):
+        """Read several counters in one primary-key lookup; missing ones are 0"""
+        rows = db.session.query(cls.name, cls.value).filter(cls.name.in_(list(names))).all()
+        values = dict.fromkeys(names, 0)
+        values.update({name: value for name, value in rows})
+        return values
+
+    @classmethod
+    def apply_deltas(cls, connection, deltas):
+        """
+        Add deltas to counters on ``connection`` (inside the caller's transaction)
+
+        A single upsert creates missing counters and increments existing
+        ones, so two first writers cannot both try to INSERT the same name,
+        and MySQL takes no gap locks on a 0-row UPDATE. Rows are sorted by
+        name so concurrent flushes lock counters in the same order.
+        """
+        now = datetime.utcnow()
+        rows = [
+            {'name': name, 'value': delta, 'updated_at': now}
+            for name, delta in sorted(deltas.items()) if delta
+        ]
+        if not rows:
+            return
+        stmt = increment_upsert(cls.__table__, rows, ['name'], 'value', connection.dialect.name)
+        if stmt is not None:
+            connection.execute(stmt)
+            return
+        table = cls.__table__
+        for row in rows:
+            result = connection.execute(
+                table.update()
+                .where(table.c.name == row['name'])
+                .values(value=table.c.value + row['value'], updated_at=now)
+            )
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(row))
+
+
+def _is_active(obj):
+    # Column defaults are only applied at INSERT, so None means the default (True)
+    return bool(obj.is_active) if obj.is_active is not None else True
+
+
+def _collect_deltas(session):
+    """
+    Work out counter changes from the pending units of work
+
+    Role membership deltas are keyed by ``('role', role)`` because roles
+    created in the same flush have no id yet.
+    """
+    deltas = Counter()
+
+    for obj in session.new:
+        if isinstance(obj, User):
+            deltas[StatsCounter.USERS_TOTAL] += 1
+            if _is_active(obj):
+                deltas[StatsCounter.USERS_ACTIVE] += 1
+            for role in inspect(obj).attrs.roles.history.added or ():
+                deltas[('role', role)] += 1
+        elif isinstance(obj, Program):
+            deltas[StatsCounter.PROGRAMS_TOTAL] += 1
+            if _is_active(obj):
+                deltas[StatsCounter.PROGRAMS_ACTIVE] += 1
+
+    for obj in session.dirty:
+        if not isinstance(obj, (User, Program)) or not session.is_modified(obj):
+            continue
+        active_key = StatsCounter.USERS_ACTIVE if isinstance(obj, User) else StatsCounter.PROGRAMS_ACTIVE
+        history = inspect(obj).attrs.is_active.history
+        if history.has_changes():
+            was_active = bool(history.deleted[0]) if history.deleted else True
+            if _is_active(obj) != was_active:
+                deltas[active_key] += 1 if _is_active(obj) else -1
+        if isinstance(obj, User):
+            roles = inspect(obj).attrs.roles.history
+            for role in roles.added or ():
+                deltas[('role', role)] += 1
+            for role in roles.deleted or ():
+                deltas[('role', role)] -= 1
+
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            deltas[StatsCounter.USERS_TOTAL] -= 1
+            if _is_active(obj):
+                deltas[StatsCounter.USERS_ACTIVE] -= 1
+            for role in obj.roles:
+                deltas[('role', role)] -= 1
+        elif isinstance(obj, Program):
+            deltas[StatsCounter.PROGRAMS_TOTAL] -= 1
+            if _is_active(obj):
+                deltas[StatsCounter.PROGRAMS_ACTIVE] -= 1
+
+    return deltas
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_counter_changes(session, flush_context, instances):
+    deltas = _collect_deltas(session)
+    if deltas:
+        pending = session.info.setdefault('stats_counter_deltas', Counter())
+        pending.update(deltas)
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _write_counter_changes(session, flush_context):
+    # Roles created in this flush only have ids now, so resolve the deltas here
+    pending = session.info.pop('stats_counter_deltas', None)
+    if not pending:
+        return
+    deltas = Counter()
+    for key, delta in pending.items():
+        if isinstance(key, tuple):
+            key = StatsCounter.role_users_key(key[1].id)
+        deltas[key] += delta
+    StatsCounter.apply_deltas(session.connection(), deltas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_counter_changes(session):
+    session.info.pop('stats_counter_deltas', None)
@@ -0,0 +1,24 @@
+def increment_upsert(table, rows, key_columns, counter, dialect):
+    """
+    One multi-row INSERT that adds each row's ``counter`` to an existing row
+
+    MySQL gets ON DUPLICATE KEY UPDATE, SQLite and PostgreSQL ON CONFLICT
+    (``key_columns``) DO UPDATE; the other non-key columns in the rows are
+    overwritten with the new values. Returns None for other dialects, where
+    callers fall back to UPDATE then INSERT.
+    """
+    others = [name for name in rows[0] if name != counter and name not in key_columns]
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(rows)
+        values = {counter: table.c[counter] + stmt.inserted[counter]}
+        values.update({name: stmt.inserted[name] for name in others})
+        return stmt.on_duplicate_key_update(**values)
+    if dialect in ('sqlite', 'postgresql'):
+        from sqlalchemy.dialects import postgresql, sqlite
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = insert(table).values(rows)
+        values = {counter: table.c[counter] + stmt.excluded[counter]}
+        values.update({name: stmt.excluded[name] for name in others})
+        return stmt.on_conflict_do_update(index_elements=[table.c[name] for name in key_columns], set_=values)
+    return None
@@ -1,11 +1,22 @@
 from app.extensions import db, bcrypt
+from app.metrics import track_bcrypt
 from datetime import datetime
 import re
 from sqlalchemy.dialects.mysql import JSON
+from sqlalchemy.orm import undefer_group
 import json
 
 class User(db.Model):
-    """User model for all roles"""
+    """
+    User model for all roles
+
+    The wide profile columns (address, social handles, bio, JSON
+    qualifications) and the 2FA secrets are deferred in two groups, so
+    load_user and login read only what auth and the dashboard chrome need.
+    Touching one column of a group loads the whole group in one query;
+    routes that render the full profile ask for it up front with
+    load_profile().
+    """
     __tablename__ = 'users'
     
     id = db.Column(db.Integer, primary_key=True)
@@ -22,26 +33,26 @@ class User(db.Model):
     gender = db.Column(db.Enum('Male', 'Female', 'Other'), nullable=False)
     
     # Contact Information
-    address = db.Column(db.Text)
+    address = db.deferred(db.Column(db.Text), group='profile')
     state = db.Column(db.String(100))
     country = db.Column(db.String(100), default='Nigeria')
     
     # Social Media
-    facebook_handle = db.Column(db.String(100))
-    twitter_handle = db.Column(db.String(100))
-    github_handle = db.Column(db.String(100))
-    linkedin_handle = db.Column(db.String(100))
+    facebook_handle = db.deferred(db.Column(db.String(100)), group='profile')
+    twitter_handle = db.deferred(db.Column(db.String(100)), group='profile')
+    github_handle = db.deferred(db.Column(db.String(100)), group='profile')
+    linkedin_handle = db.deferred(db.Column(db.String(100)), group='profile')
     
     # Profile
     photo_path = db.Column(db.String(255))  # Path to uploaded photo
-    resume_path = db.Column(db.String(255))  # Path to uploaded CV/Resume
-    bio = db.Column(db.Text)  # Short bio (max 1000 chars)
+    resume_path = db.deferred(db.Column(db.String(255)), group='profile')  # Path to uploaded CV/Resume
+    bio = db.deferred(db.Column(db.Text), group='profile')  # Short bio (max 1000 chars)
     
     # Educational Background (stored as JSON)
-    qualifications = db.Column(db.JSON, default=list)
+    qualifications = db.deferred(db.Column(db.JSON, default=list), group='profile')
     
     # Selected Programs/Courses (stored as JSON of program IDs)
-    selected_programs = db.Column(db.JSON, default=list)
+    selected_programs = db.deferred(db.Column(db.JSON, default=list), group='profile')
     
     # Authentication
     password_hash = db.Column(db.String(128), nullable=False)
@@ -53,8 +64,8 @@ class User(db.Model):
     
     # 2FA
     two_factor_enabled = db.Column(db.Boolean, default=False)
-    two_factor_secret = db.Column(db.String(32))
-    two_factor_backup_codes = db.Column(db.JSON, default=list)
+    two_factor_secret = db.deferred(db.Column(db.String(32)), group='two_factor')
+    two_factor_backup_codes = db.deferred(db.Column(db.JSON, default=list), group='two_factor')
     
     # Login tracking
     last_login = db.Column(db.DateTime)
@@ -73,6 +84,31 @@ class User(db.Model):
     
     # Relationships
     roles = db.relationship('Role', secondary='user_roles', back_populates='users')
+    enrollments = db.relationship('Enrollment', back_populates='user', cascade='all, delete-orphan')
+    
+    # Indexes for the admin user directory: keyset order is (created_at, id),
+    # each filter column leads an index that keeps that order
+    __table_args__ = (
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+        db.Index('ix_users_state_created_at', 'state', 'created_at', 'id'),
+        db.Index('ix_users_active_created_at', 'is_active', 'created_at', 'id'),
+        db.Index('ix_users_verified_created_at', 'email_verified', 'created_at', 'id'),
+        # Every directory status filter and the exports start with deleted_at IS NULL
+        db.Index('ix_users_deleted_created_at', 'deleted_at', 'created_at', 'id'),
+        # Email verification link lookup
+        db.Index('ix_users_email_verification_token', 'email_verification_token'),
+    )
+    
+    # Deferred column groups (see the class docstring)
+    @classmethod
+    def load_profile(cls):
+        """Loader option that reads the deferred profile columns with the row"""
+        return undefer_group('profile')
+    
+    @classmethod
+    def load_two_factor(cls):
+        """Loader option that reads the deferred 2FA columns with the row"""
+        return undefer_group('two_factor')
     
     # Methods
     def __repr__(self):
@@ -101,11 +137,13 @@ class User(db.Model):
         if not any(char in '!@#$%^&*()_+-=[]{}|;:,.<>?' for char in password):
             raise ValueError('Password must contain at least one special character')
         
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        with track_bcrypt('hash'):
+            self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
     
     def verify_password(self, password):
         """Verify password against hash"""
-        return bcrypt.check_password_hash(self.password_hash, password)
+        with track_bcrypt('check'):
+            return bcrypt.check_password_hash(self.password_hash, password)
     
     def get_id(self):
         """Required by Flask-Login"""
@@ -6,5 +6,7 @@ user_roles = db.Table(
     'user_roles',
     db.Column('user_id', db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
     db.Column('role_id', db.Integer, db.ForeignKey('roles.id', ondelete='CASCADE'), primary_key=True),
-    db.Column('assigned_at', db.DateTime, default=datetime.utcnow)
+    db.Column('assigned_at', db.DateTime, default=datetime.utcnow),
+    # The primary key covers lookups by user; this covers "users with role X"
+    db.Index('ix_user_roles_role_id_user_id', 'role_id', 'user_id')
 )
\ No newline at end of file
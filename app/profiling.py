@@ -0,0 +1,245 @@
+import os
+import sys
+import json
+import random
+import threading
+import time
+from collections import Counter
+from flask import current_app, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+PROFILE_HEADER = 'X-Profile-Token'
+_TOKEN_SALT = 'request-profiler'
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_write_lock = threading.Lock()
+
+
+def frame_label(code):
+    """``function (path:line)``, with paths relative to the project where possible"""
+    filename = code.co_filename
+    if filename.startswith(_PROJECT_ROOT):
+        filename = os.path.relpath(filename, _PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    # ';' separates frames in collapsed stacks
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(';', ',')
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack every ``interval`` seconds
+
+    A daemon thread reads ``sys._current_frames()``, so the profiled code
+    runs untouched (no tracing hooks); the cost is one stack walk per
+    sample. CPU-bound code only yields the GIL every
+    ``sys.getswitchinterval()`` (5 ms), which bounds the real interval.
+    Works with sync and threaded workers, not with greenlets.
+    """
+
+    def __init__(self, thread_id, interval=0.005, max_depth=128):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def sample(self):
+        """Record the thread's current stack once; False once the thread has exited"""
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return False
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            stack.append(frame_label(frame.f_code))
+            frame = frame.f_back
+        del frame
+        self.stacks[';'.join(reversed(stack))] += 1
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.sample():
+                return
+
+
+# ---- Collapsed stack files -------------------------------------------------
+
+def profile_path(directory, endpoint, pid=None):
+    """One file per endpoint and process, so workers never interleave writes"""
+    return os.path.join(directory, f"{endpoint}.{pid or os.getpid()}.collapsed")
+
+
+def write_collapsed(directory, endpoint, stacks):
+    """Append ``stack count`` lines (Brendan Gregg's collapsed format)"""
+    if not stacks:
+        return
+    os.makedirs(directory, exist_ok=True)
+    lines = ''.join(f"{stack} {count}\n" for stack, count in stacks.items())
+    with _write_lock, open(profile_path(directory, endpoint), 'a', encoding='utf-8') as f:
+        f.write(lines)
+
+
+def read_collapsed(paths):
+    """Merge collapsed stack files into one Counter"""
+    stacks = Counter()
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                if stack and count.isdigit():
+                    stacks[stack] += int(count)
+    return stacks
+
+
+def profile_files(directory, endpoints=None):
+    """Collapsed files in ``directory``, grouped by endpoint"""
+    grouped = {}
+    if not os.path.isdir(directory):
+        return grouped
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.collapsed'):
+            continue
+        endpoint = name[:-len('.collapsed')].rsplit('.', 1)[0]
+        if endpoints and endpoint not in endpoints:
+            continue
+        grouped.setdefault(endpoint, []).append(os.path.join(directory, name))
+    return grouped
+
+
+def to_speedscope(stacks, name, interval_ms):
+    """A speedscope 'sampled' profile (open at https://www.speedscope.app)"""
+    frames, index = [], {}
+    samples, weights = [], []
+    for stack, count in stacks.most_common():
+        sample = []
+        for label in stack.split(';'):
+            if label not in index:
+                index[label] = len(frames)
+                frames.append({'name': label})
+            sample.append(index[label])
+        samples.append(sample)
+        weights.append(count * interval_ms)
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': name,
+        'exporter': 'yca-profiler',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'milliseconds',
+            'startValue': 0,
+            'endValue': sum(weights),
+            'samples': samples,
+            'weights': weights,
+        }],
+    }
+
+
+def write_speedscope(stacks, name, interval_ms, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(to_speedscope(stacks, name, interval_ms), f)
+
+
+# ---- Signed header ---------------------------------------------------------
+
+def _serializer(app):
+    return URLSafeTimedSerializer(app.config['SECRET_KEY'], salt=_TOKEN_SALT)
+
+
+def make_profile_token(endpoints, app=None):
+    """
+    Sign a token that profiles every matching request while it is valid
+
+    Args:
+        endpoints: Endpoint names (e.g. ``auth.register``) or ``['*']``
+        app: Flask app (default: current app)
+
+    Returns:
+        str: Value for the X-Profile-Token header
+    """
+    app = app or current_app._get_current_object()
+    return _serializer(app).dumps(sorted(endpoints))
+
+
+def _token_allows(app, token, endpoint):
+    try:
+        endpoints = _serializer(app).loads(token, max_age=app.config.get('PROFILING_TOKEN_MAX_AGE', 3600))
+    except BadSignature:
+        return False
+    return '*' in endpoints or endpoint in endpoints
+
+
+# ---- Flask integration -------------------------------------------------------
+
+def init_profiling(app):
+    """
+    Sample stacks of chosen endpoints into PROFILING_DIR
+
+    A request is profiled when its endpoint is in PROFILING_ENDPOINTS and it
+    wins the PROFILING_SAMPLE_RATE draw, or when it carries a valid signed
+    X-Profile-Token (``flask profile-token`` or the admin API). With
+    PROFILING_ENABLED off nothing is registered. Merge the samples with
+    ``flask profile-merge``.
+    """
+    if not app.config.get('PROFILING_ENABLED', False):
+        return
+
+    settings = {
+        'endpoints': frozenset(app.config.get('PROFILING_ENDPOINTS') or ()),
+        'rate': float(app.config.get('PROFILING_SAMPLE_RATE', 0.01)),
+        'interval': app.config.get('PROFILING_INTERVAL_MS', 5) / 1000.0,
+        'directory': app.config['PROFILING_DIR'],
+    }
+    app.extensions['profiling'] = settings
+
+    @app.before_request
+    def _start_profiler():
+        endpoint = request.endpoint
+        if endpoint is None:
+            return
+        token = request.headers.get(PROFILE_HEADER)
+        if token:
+            if not _token_allows(app, token, endpoint):
+                return
+        elif endpoint not in settings['endpoints'] or random.random() >= settings['rate']:
+            return
+        request.environ['profiling.sampler'] = SamplingProfiler(
+            threading.get_ident(), settings['interval']
+        ).start()
+        request.environ['profiling.started'] = time.perf_counter()
+
+    @app.after_request
+    def _mark_profiled(response):
+        if 'profiling.sampler' in request.environ:
+            response.headers['X-Profiled'] = request.endpoint
+        return response
+
+    @app.teardown_request
+    def _save_profile(exc):
+        sampler = request.environ.pop('profiling.sampler', None)
+        if sampler is None:
+            return
+        stacks = sampler.stop()
+        elapsed_ms = (time.perf_counter() - request.environ.pop('profiling.started')) * 1000
+        try:
+            write_collapsed(settings['directory'], request.endpoint, stacks)
+        except OSError as e:
+            app.logger.warning(f"Could not write profile for {request.endpoint}: {e}")
+            return
+        app.logger.info(
+            f"Profiled {request.endpoint}: {sum(stacks.values())} samples in {elapsed_ms:.0f} ms"
+        )
@@ -0,0 +1,188 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from math import floor
+from limits.storage import SlidingWindowCounterSupport, Storage
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS counters (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL,
+        expires_at REAL NOT NULL
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS windows (
+        key TEXT PRIMARY KEY,
+        window INTEGER NOT NULL,
+        current INTEGER NOT NULL,
+        previous INTEGER NOT NULL,
+        expires_at REAL NOT NULL
+    ) WITHOUT ROWID""",
+)
+
+
+class SQLiteRateLimitStorage(Storage, SlidingWindowCounterSupport):
+    """
+    Flask-Limiter storage shared by every worker on one host
+
+    ``RATELIMIT_STORAGE_URI = 'sqlite:////dev/shm/yca-ratelimit.db'``
+
+    All workers open the same SQLite file in WAL mode. Each check is a
+    single ``BEGIN IMMEDIATE`` transaction, so the read-decide-write of the
+    sliding window is atomic across processes without the retry/decrement
+    dance other backends need. Durability is switched off (synchronous=OFF):
+    losing the last few counters in a power cut is harmless. Connections
+    are per thread and re-opened after fork.
+
+    Supports the ``fixed-window`` and ``sliding-window-counter`` strategies.
+    """
+
+    STORAGE_SCHEME = ['sqlite']
+    PURGE_PROBABILITY = 0.001
+
+    def __init__(self, uri, wrap_exceptions=False, **options):
+        path = uri[len('sqlite:///'):] if uri.startswith('sqlite:///') else ''
+        self.path = path or os.path.join(tempfile.gettempdir(), 'yca-ratelimit.db')
+        self.timeout = float(options.get('timeout', 5.0))
+        self._local = threading.local()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    # ---- Connection ------------------------------------------------------
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly below
+        connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                                     check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=OFF')
+        connection.execute('PRAGMA temp_store=MEMORY')
+        for statement in _SCHEMA:
+            connection.execute(statement)
+        return connection
+
+    @property
+    def _db(self):
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.connection = self._connect()
+            local.pid = os.getpid()
+        return local.connection
+
+    def _transaction(self, fn):
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            result = fn(db)
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+        return result
+
+    def _maybe_purge(self, db, now):
+        if random.random() < self.PURGE_PROBABILITY:
+            db.execute('DELETE FROM counters WHERE expires_at <= ?', (now,))
+            db.execute('DELETE FROM windows WHERE expires_at <= ?', (now,))
+
+    # ---- Fixed window ----------------------------------------------------
+
+    def incr(self, key, expiry, amount=1):
+        now = time.time()
+
+        def increment(db):
+            self._maybe_purge(db, now)
+            return db.execute(
+                """INSERT INTO counters (key, value, expires_at) VALUES (?, ?, ?)
+                   ON CONFLICT (key) DO UPDATE SET
+                       value = CASE WHEN expires_at <= ? THEN excluded.value ELSE value + excluded.value END,
+                       expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END
+                   RETURNING value""",
+                (key, amount, now + expiry, now, now),
+            ).fetchone()[0]
+        return self._transaction(increment)
+
+    def get(self, key):
+        row = self._db.execute(
+            'SELECT value FROM counters WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        row = self._db.execute('SELECT expires_at FROM counters WHERE key = ?', (key,)).fetchone()
+        return row[0] if row and row[0] > time.time() else time.time()
+
+    def clear(self, key):
+        self._db.execute('DELETE FROM counters WHERE key = ?', (key,))
+
+    # ---- Sliding window counter ------------------------------------------
+
+    @staticmethod
+    def _window_state(row, expiry, now):
+        """(window number, previous count, current count) as of ``now``"""
+        window = int(now // expiry)
+        if row is None:
+            return window, 0, 0
+        stored_window, current, previous = row
+        if stored_window == window:
+            return window, previous, current
+        if stored_window == window - 1:
+            return window, current, 0
+        return window, 0, 0
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+
+        def acquire(db):
+            row = db.execute(
+                'SELECT window, current, previous FROM windows WHERE key = ?', (key,)
+            ).fetchone()
+            window, previous, current = self._window_state(row, expiry, now)
+            weight = 1 - (now / expiry) % 1
+            if floor(previous * weight + current) + amount > limit:
+                return False
+            self._maybe_purge(db, now)
+            db.execute(
+                """INSERT OR REPLACE INTO windows (key, window, current, previous, expires_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (key, window, current + amount, previous, (window + 2) * expiry),
+            )
+            return True
+        return self._transaction(acquire)
+
+    def get_sliding_window(self, key, expiry):
+        now = time.time()
+        row = self._db.execute(
+            'SELECT window, current, previous FROM windows WHERE key = ?', (key,)
+        ).fetchone()
+        _, previous, current = self._window_state(row, expiry, now)
+        remaining = (1 - (now / expiry) % 1) * expiry
+        return previous, (remaining if previous else 0.0), current, remaining + expiry
+
+    def clear_sliding_window(self, key, expiry):
+        self._db.execute('DELETE FROM windows WHERE key = ?', (key,))
+
+    # ---- Housekeeping ----------------------------------------------------
+
+    def check(self):
+        try:
+            self._db.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        def delete_all(db):
+            return (db.execute('DELETE FROM counters').rowcount
+                    + db.execute('DELETE FROM windows').rowcount)
+        return self._transaction(delete_all)
@@ -0,0 +1,181 @@
+import time
+from contextlib import contextmanager
+from flask import current_app, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.exc import SQLAlchemyError
+
+READ_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+class RoutingSession(Session):
+    """
+    db.session that sends reads to the replica when asked to
+
+    SELECTs go to the replica engine only while the session is marked for
+    replica reads (a REPLICA_ROUTES request or a use_replica() block), the
+    lag guard says the replica is fresh and the session has not written
+    anything yet. The first flush or DML statement pins the session to the
+    primary, so a request reads its own writes. Everything else (writes,
+    session.connection(), models on other binds) goes where it always did.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.bind is not None:
+            # Bound to one connection, e.g. a test joining an outer transaction
+            return self.bind
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if clause is not None and getattr(clause, 'is_dml', False):
+            self.info['replica_wrote'] = True
+            return engine
+        if (
+            self.info.get('replica')
+            and not self.info.get('replica_wrote')
+            and bind is None
+            and getattr(clause, 'is_select', False)
+            and engine is self._db.engines.get(None)
+        ):
+            replica = current_app.extensions.get('replica')
+            if replica is not None and replica.healthy():
+                return replica.engine
+        return engine
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _pin_to_primary(session, flush_context, instances):
+    session.info['replica_wrote'] = True
+
+
+class ReplicaLagGuard:
+    """
+    The replica engine, and whether it is fresh enough to read from
+
+    Every ``interval`` seconds (per process) it stamps the heartbeat row on
+    the primary if the stamp is older than the interval, and reads the row
+    back from the replica. The replica is used while the difference is at
+    most ``max_lag`` seconds; an unreachable replica or a missing row counts
+    as lagging, so reads fall back to the primary.
+    """
+
+    def __init__(self, db, engine, max_lag, interval):
+        self.db = db
+        self.engine = engine
+        self.max_lag = max_lag
+        self.interval = interval
+        self.lag = None
+        self._healthy = False
+        self._checked_at = None
+
+    def healthy(self):
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.interval:
+            self._checked_at = now
+            self._healthy = self.check()
+        return self._healthy
+
+    def check(self):
+        """Measure the lag now; True when the replica may serve reads"""
+        from app.models.replica_heartbeat import ReplicaHeartbeat
+        table = ReplicaHeartbeat.__table__
+        row = table.c.id == ReplicaHeartbeat.ROW_ID
+        try:
+            with self.db.engines[None].begin() as connection:
+                primary_ms = connection.execute(select(table.c.beat_ms).where(row)).scalar()
+                now_ms = int(time.time() * 1000)
+                if primary_ms is None or now_ms - primary_ms >= self.interval * 1000:
+                    if primary_ms is None:
+                        connection.execute(table.insert().values(id=ReplicaHeartbeat.ROW_ID, beat_ms=now_ms))
+                    else:
+                        connection.execute(table.update().where(row).values(beat_ms=now_ms))
+                    primary_ms = now_ms
+            with self.engine.connect() as connection:
+                replica_ms = connection.execute(select(table.c.beat_ms).where(row)).scalar()
+        except SQLAlchemyError as e:
+            current_app.logger.warning(f"Replica lag check failed, reading from the primary: {e}")
+            self.lag = None
+            return False
+
+        self.lag = (primary_ms - replica_ms) / 1000.0 if replica_ms is not None else None
+        return self.lag is not None and self.lag <= self.max_lag
+
+
+def _set_routing(value):
+    from app.extensions import db
+    info = db.session.info
+    previous = info.get('replica')
+    info['replica'] = value
+    return info, previous
+
+
+@contextmanager
+def use_replica():
+    """
+    Send this block's SELECTs to the replica (when one is configured and fresh)
+
+    Works as a decorator too. Only for reads that tolerate a few seconds of
+    staleness: catalog listings, dashboards, reports.
+    """
+    info, previous = _set_routing(True)
+    try:
+        yield
+    finally:
+        info['replica'] = previous
+
+
+@contextmanager
+def use_primary():
+    """Keep this block's reads on the primary inside a replica-routed request"""
+    info, previous = _set_routing(False)
+    try:
+        yield
+    finally:
+        info['replica'] = previous
+
+
+def app_engines(app):
+    """Every engine the app holds: Flask-SQLAlchemy's binds plus the replica"""
+    from app.extensions import db
+    with app.app_context():
+        engines = list(db.engines.values())
+    if 'replica' in app.extensions:
+        engines.append(app.extensions['replica'].engine)
+    return engines
+
+
+def parse_replica_routes(spec):
+    return frozenset(route.strip() for route in spec.split(',') if route.strip())
+
+
+def init_replica(app):
+    """
+    Route read-only requests to SQLALCHEMY_REPLICA_URI
+
+    The replica engine lives beside Flask-SQLAlchemy's engines rather than
+    in SQLALCHEMY_BINDS, so create_all()/drop_all() never touch it. GET/HEAD
+    requests whose endpoint or blueprint is in REPLICA_ROUTES read
+    from the replica; code elsewhere can opt in with use_replica(). With no
+    replica URI nothing is registered and every query uses the primary.
+    """
+    uri = app.config.get('SQLALCHEMY_REPLICA_URI')
+    if not uri:
+        return
+
+    from app.extensions import db
+    routes = app.config.get('REPLICA_ROUTES') or ()
+    routes = parse_replica_routes(routes) if isinstance(routes, str) else frozenset(routes)
+    app.extensions['replica'] = ReplicaLagGuard(
+        db,
+        create_engine(uri, **(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})),
+        max_lag=float(app.config.get('REPLICA_MAX_LAG_SECONDS', 5)),
+        interval=float(app.config.get('REPLICA_LAG_CHECK_INTERVAL', 1)),
+    )
+
+    @app.before_request
+    def _route_reads():
+        if request.method in READ_METHODS and (request.endpoint in routes or request.blueprint in routes):
+            db.session.info['replica'] = True
+
+    @app.teardown_request
+    def _reset_routing(exc):
+        db.session.info.pop('replica', None)
+        db.session.info.pop('replica_wrote', None)
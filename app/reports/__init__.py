@@ -0,0 +1 @@
+# Package
\ No newline at end of file
@@ -0,0 +1,100 @@
+from datetime import datetime
+from flask import Blueprint, Response, abort, jsonify, request, stream_with_context
+from flask_login import login_required
+from app.decorators import permission_required
+from app.services.export_service import ExportService
+from app.services.analytics_service import AnalyticsService
+
+reports_bp = Blueprint('reports', __name__)
+
+MIMETYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+@reports_bp.route('/export/users.<fmt>')
+@login_required
+@permission_required('reports', 'export')
+def export_users(fmt):
+    """Download all users as CSV or XLSX"""
+    return _export_response('users', fmt)
+
+@reports_bp.route('/export/registrations.<fmt>')
+@login_required
+@permission_required('financials', 'export')
+def export_registrations(fmt):
+    """Download registrations with selected programs and fees"""
+    return _export_response('registrations', fmt)
+
+def _export_response(dataset, fmt):
+    """Stream an export as a chunked response (no Content-Length; see ExportService.stream_xlsx for XLSX)"""
+    if fmt not in ExportService.FORMATS:
+        abort(404)
+    
+    def generate():
+        headers, rows = ExportService.dataset(dataset)
+        if fmt == 'csv':
+            yield from ExportService.stream_csv(headers, rows)
+        else:
+            yield from ExportService.stream_xlsx(headers, rows, sheet_name=dataset.title())
+    
+    filename = f"{dataset}-{datetime.utcnow():%Y%m%d-%H%M}.{fmt}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=MIMETYPES[fmt],
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'X-Accel-Buffering': 'no',  # let nginx pass chunks straight through
+        }
+    )
+
+@reports_bp.route('/api/analytics/trend')
+@login_required
+@permission_required('analytics', 'view')
+def analytics_trend():
+    """Daily signups over a date range (rollups only)"""
+    try:
+        data = AnalyticsService.trend(
+            start=request.args.get('start'),
+            end=request.args.get('end'),
+            program_id=request.args.get('program', type=int),
+            state=request.args.get('state'),
+            gender=request.args.get('gender'),
+            window=request.args.get('window', 7, type=int),
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    data['rollups'] = AnalyticsService.rollup_status()
+    return jsonify(data)
+
+@reports_bp.route('/api/analytics/breakdown')
+@login_required
+@permission_required('analytics', 'view')
+def analytics_breakdown():
+    """Signups by state, gender or program"""
+    try:
+        data = AnalyticsService.breakdown(
+            start=request.args.get('start'),
+            end=request.args.get('end'),
+            by=request.args.get('by', 'state'),
+            program_id=request.args.get('program', type=int),
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(data)
+
+@reports_bp.route('/api/analytics/compare')
+@login_required
+@permission_required('analytics', 'view')
+def analytics_compare():
+    """Compare two registration cohorts (date windows)"""
+    args = request.args
+    try:
+        data = AnalyticsService.compare_cohorts(
+            (args.get('a_start'), args.get('a_end')),
+            (args.get('b_start'), args.get('b_end')),
+            by=args.get('by', 'program'),
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(data)
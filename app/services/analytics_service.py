@@ -0,0 +1,325 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, or_
+from app.extensions import db
+from app.models.user import User
+from app.models.program import Program
+from app.models.enrollment import Enrollment
+from app.models.registration_rollup import RegistrationRollup, RollupWatermark
+
+class AnalyticsService:
+    """Registration analytics served from daily rollups"""
+
+    DIMENSIONS = ('state', 'gender', 'program')
+    DEFAULT_DAYS = 30
+    MAX_DAYS = 3 * 366
+
+    # ---- Rollup maintenance -------------------------------------------------
+
+    @classmethod
+    def refresh_rollups(cls, now=None):
+        """
+        Fold users registered since the watermark into the daily rollups
+
+        Users are read in keyset order on (created_at, id), one batch per
+        transaction, so the rollups and the watermark always move together.
+        Registrations younger than ANALYTICS_ROLLUP_SETTLE_SECONDS are left
+        for the next run in case an older transaction has yet to commit.
+        Per-program counts come from the user's current (pending or active)
+        enrollments when the batch is folded; `rollup-registrations
+        --rebuild` re-reads them after cohort moves and cancellations.
+
+        Returns:
+            int: Number of users folded in
+        """
+        settle = current_app.config.get('ANALYTICS_ROLLUP_SETTLE_SECONDS', 120)
+        batch_size = current_app.config.get('ANALYTICS_ROLLUP_BATCH_SIZE', 5000)
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=settle)
+
+        processed = 0
+        while True:
+            watermark = db.session.get(
+                RollupWatermark, RollupWatermark.REGISTRATIONS, with_for_update=True
+            )
+            if watermark is None:
+                watermark = RollupWatermark(name=RollupWatermark.REGISTRATIONS, last_id=0)
+                db.session.add(watermark)
+
+            query = db.session.query(
+                User.id, User.created_at, User.state, User.gender
+            ).filter(User.created_at < cutoff)
+            if watermark.last_created_at is not None:
+                query = query.filter(or_(
+                    User.created_at > watermark.last_created_at,
+                    and_(User.created_at == watermark.last_created_at, User.id > watermark.last_id),
+                ))
+            rows = query.order_by(User.created_at, User.id).limit(batch_size).all()
+            if not rows:
+                db.session.commit()
+                return processed
+
+            RegistrationRollup.apply_counts(
+                db.session.connection(), cls._count(rows, cls._enrolled_programs([row.id for row in rows]))
+            )
+            watermark.last_created_at, watermark.last_id = rows[-1].created_at, rows[-1].id
+            db.session.commit()
+            processed += len(rows)
+
+    @staticmethod
+    def _enrolled_programs(user_ids):
+        """user_id -> set of program ids with a current enrollment, in one query"""
+        programs = {}
+        for user_id, program_id in db.session.query(Enrollment.user_id, Enrollment.program_id).filter(
+            Enrollment.user_id.in_(user_ids), Enrollment.status.in_(Enrollment.CURRENT_STATUSES)
+        ):
+            programs.setdefault(user_id, set()).add(program_id)
+        return programs
+
+    @staticmethod
+    def _count(rows, enrolled):
+        counts = Counter()
+        for row in rows:
+            day = row.created_at.date()
+            state = row.state or RegistrationRollup.UNKNOWN
+            counts[(day, RegistrationRollup.ALL_PROGRAMS, state, row.gender)] += 1
+            for program_id in enrolled.get(row.id, ()):
+                counts[(day, program_id, state, row.gender)] += 1
+        return counts
+
+    @classmethod
+    def rebuild_rollups(cls):
+        """Drop the rollups and watermark and fold in every user again"""
+        db.session.query(RegistrationRollup).delete(synchronize_session=False)
+        db.session.query(RollupWatermark).filter_by(name=RollupWatermark.REGISTRATIONS).delete()
+        db.session.commit()
+        return cls.refresh_rollups()
+
+    @classmethod
+    def rollup_status(cls):
+        watermark = db.session.get(RollupWatermark, RollupWatermark.REGISTRATIONS)
+        return {
+            'through': watermark.last_created_at.isoformat() if watermark and watermark.last_created_at else None,
+            'refreshed_at': watermark.updated_at.isoformat() if watermark and watermark.updated_at else None,
+        }
+
+    # ---- Queries (rollups only) ---------------------------------------------
+
+    @classmethod
+    def date_range(cls, start=None, end=None):
+        """
+        Resolve an inclusive date range, defaulting to the last DEFAULT_DAYS days
+
+        Raises:
+            ValueError: If a date is malformed or the range is empty or too long
+        """
+        end = date.fromisoformat(end) if isinstance(end, str) else (end or datetime.utcnow().date())
+        start = (date.fromisoformat(start) if isinstance(start, str)
+                 else (start or end - timedelta(days=cls.DEFAULT_DAYS - 1)))
+        if start > end:
+            raise ValueError("start must not be after end")
+        if (end - start).days + 1 > cls.MAX_DAYS:
+            raise ValueError(f"Range is limited to {cls.MAX_DAYS} days")
+        return start, end
+
+    @classmethod
+    def _load(cls, start, end, program_id=None, per_program=False, state=None, gender=None):
+        """
+        Read rollup rows into column arrays
+
+        Args:
+            program_id: Restrict to one program (default: every signup once)
+            per_program: Return one row per selected program instead
+
+        Returns:
+            dict: day (offset from start), program_id, state, gender, signups
+        """
+        import numpy as np
+
+        R = RegistrationRollup
+        query = db.session.query(R.day, R.program_id, R.state, R.gender, R.signups).filter(
+            R.day >= start, R.day <= end
+        )
+        if per_program:
+            query = query.filter(R.program_id != R.ALL_PROGRAMS)
+        else:
+            query = query.filter(R.program_id == (program_id or R.ALL_PROGRAMS))
+        if state is not None:
+            query = query.filter(R.state == state)
+        if gender is not None:
+            query = query.filter(R.gender == gender)
+
+        rows = query.all()
+        days = np.array([row.day for row in rows], dtype='datetime64[D]')
+        return {
+            'day': (days - np.datetime64(start, 'D')).astype(np.int64),
+            'program_id': np.array([row.program_id for row in rows], dtype=np.int64),
+            'state': np.array([row.state for row in rows], dtype=object),
+            'gender': np.array([row.gender for row in rows], dtype=object),
+            'signups': np.array([row.signups for row in rows], dtype=np.int64),
+        }
+
+    @classmethod
+    def trend(cls, start=None, end=None, program_id=None, state=None, gender=None, window=7):
+        """
+        Daily signups with a trailing moving average and linear slope
+
+        Args:
+            start, end: Inclusive date range (date or ISO string)
+            program_id: Only signups that selected this program
+            state, gender: Optional filters
+            window: Moving-average window in days
+
+        Returns:
+            dict: days, signups, moving_average, total, slope_per_day,
+            window_change_pct (last window against the one before it)
+        """
+        import numpy as np
+
+        start, end = cls.date_range(start, end)
+        window = max(1, int(window))
+        data = cls._load(start, end, program_id=program_id, state=state, gender=gender)
+
+        n = (end - start).days + 1
+        series = np.bincount(data['day'], weights=data['signups'], minlength=n).astype(np.int64)
+
+        cumulative = np.concatenate(([0], np.cumsum(series)))
+        upper = np.arange(1, n + 1)
+        lower = np.maximum(upper - window, 0)
+        moving_average = (cumulative[upper] - cumulative[lower]) / (upper - lower)
+
+        slope = float(np.polyfit(np.arange(n), series, 1)[0]) if n > 1 else 0.0
+
+        last = series[-window:].sum()
+        previous = series[-2 * window:-window].sum() if n >= 2 * window else 0
+        change = float((last - previous) / previous * 100) if previous else None
+
+        return {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'days': [(start + timedelta(days=i)).isoformat() for i in range(n)],
+            'signups': series.tolist(),
+            'moving_average': np.round(moving_average, 2).tolist(),
+            'total': int(series.sum()),
+            'slope_per_day': round(slope, 4),
+            'window_change_pct': round(change, 2) if change is not None else None,
+        }
+
+    @classmethod
+    def _totals(cls, start, end, by, program_id=None):
+        """Signups per value of ``by`` as (keys, totals) arrays"""
+        import numpy as np
+
+        if by not in cls.DIMENSIONS:
+            raise ValueError(f"Cannot break down by {by}")
+        if by == 'program':
+            data = cls._load(start, end, per_program=True)
+            column = data['program_id']
+        else:
+            data = cls._load(start, end, program_id=program_id)
+            column = data[by]
+
+        if not len(column):
+            return np.array([], dtype=column.dtype), np.array([], dtype=np.int64)
+        keys, inverse = np.unique(column, return_inverse=True)
+        totals = np.bincount(inverse, weights=data['signups'], minlength=len(keys)).astype(np.int64)
+        return keys, totals
+
+    @classmethod
+    def _labels(cls, by, keys):
+        if by != 'program':
+            return {key: key or 'Unknown' for key in keys}
+        names = dict(db.session.query(Program.id, Program.name).filter(Program.id.in_(keys)))
+        return {key: names.get(key, f'Program {key}') for key in keys}
+
+    @classmethod
+    def breakdown(cls, start=None, end=None, by='state', program_id=None):
+        """
+        Signups in a date range grouped by state, gender or program
+
+        Returns:
+            dict: total, items (key, label, signups, share) largest first
+        """
+        import numpy as np
+
+        start, end = cls.date_range(start, end)
+        keys, totals = cls._totals(start, end, by, program_id=program_id)
+        total = int(totals.sum())
+        keys = keys.tolist()
+        labels = cls._labels(by, keys)
+
+        order = np.argsort(-totals, kind='stable')
+        return {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'by': by,
+            'total': total,
+            'items': [
+                {
+                    'key': keys[i],
+                    'label': labels[keys[i]],
+                    'signups': int(totals[i]),
+                    'share': round(float(totals[i]) / total * 100, 2) if total else 0.0,
+                }
+                for i in order
+            ],
+        }
+
+    @classmethod
+    def compare_cohorts(cls, first, second, by='program'):
+        """
+        Compare two registration windows side by side
+
+        Windows can differ in length, so each key also carries signups per
+        day for a like-for-like comparison.
+
+        Args:
+            first, second: (start, end) tuples of dates or ISO strings
+            by: 'state', 'gender' or 'program'
+
+        Returns:
+            dict: cohorts (range, total, per_day) and items per key
+        """
+        import numpy as np
+
+        windows = [cls.date_range(*first), cls.date_range(*second)]
+        lengths = np.array([(end - start).days + 1 for start, end in windows], dtype=np.float64)
+        results = [cls._totals(start, end, by) for start, end in windows]
+
+        keys = np.union1d(results[0][0], results[1][0])
+        matrix = np.zeros((2, len(keys)), dtype=np.int64)
+        for row, (cohort_keys, totals) in enumerate(results):
+            matrix[row, np.searchsorted(keys, cohort_keys)] = totals
+
+        totals = matrix.sum(axis=1)
+        shares = np.divide(matrix * 100.0, totals[:, None], out=np.zeros(matrix.shape),
+                           where=totals[:, None] > 0)
+        per_day = matrix / lengths[:, None]
+        change = np.divide((per_day[1] - per_day[0]) * 100.0, per_day[0],
+                           out=np.full(len(keys), np.nan), where=per_day[0] > 0)
+
+        order = np.argsort(-matrix.sum(axis=0), kind='stable')
+        keys = keys.tolist()
+        labels = cls._labels(by, keys)
+        return {
+            'by': by,
+            'cohorts': [
+                {
+                    'start': start.isoformat(),
+                    'end': end.isoformat(),
+                    'total': int(totals[i]),
+                    'per_day': round(float(totals[i] / lengths[i]), 2),
+                }
+                for i, (start, end) in enumerate(windows)
+            ],
+            'items': [
+                {
+                    'key': keys[i],
+                    'label': labels[keys[i]],
+                    'signups': matrix[:, i].tolist(),
+                    'share': np.round(shares[:, i], 2).tolist(),
+                    'per_day_change_pct': None if np.isnan(change[i]) else round(float(change[i]), 2),
+                }
+                for i in order
+            ],
+        }
@@ -0,0 +1,272 @@
+from sqlalchemy import func, select
+from app.extensions import db
+from app.models.cohort import Cohort, CohortWaitlist
+from app.models.enrollment import Enrollment
+
+class CohortService:
+    """Seat reservation for capacity-limited cohorts, with a FIFO waitlist"""
+
+    SEATED_STATUSES = Enrollment.CURRENT_STATUSES
+    PROMOTE_RETRIES = 3  # lost races tolerated per _promote call
+
+    @classmethod
+    def create_cohort(cls, program, code, capacity, **fields):
+        """Create a cohort with every seat free (caller commits)"""
+        if capacity < 0:
+            raise ValueError("Capacity cannot be negative")
+        cohort = Cohort(program=program, code=code, capacity=capacity,
+                        seats_available=capacity, **fields)
+        db.session.add(cohort)
+        return cohort
+
+    # ---- Seat primitives (run inside the caller's transaction) --------------
+
+    @staticmethod
+    def _take_seat(cohort_id):
+        """
+        Claim one seat with a single conditional UPDATE
+
+        The row lock is taken by the UPDATE itself, so there is no
+        read-then-write window and no table lock: of N concurrent callers
+        for the last seat exactly one sees rowcount 1.
+        """
+        table = Cohort.__table__
+        result = db.session.execute(
+            table.update()
+            .where(table.c.id == cohort_id, table.c.seats_available > 0, table.c.is_open.is_(True))
+            .values(seats_available=table.c.seats_available - 1)
+        )
+        return result.rowcount == 1
+
+    @staticmethod
+    def _release_seat(cohort_id):
+        table = Cohort.__table__
+        db.session.execute(
+            table.update()
+            .where(table.c.id == cohort_id, table.c.seats_available < table.c.capacity)
+            .values(seats_available=table.c.seats_available + 1)
+        )
+
+    @staticmethod
+    def _is_open(cohort_id):
+        table = Cohort.__table__
+        return db.session.execute(select(table.c.is_open).where(table.c.id == cohort_id)).scalar()
+
+    @classmethod
+    def place(cls, user, cohort, enrollment):
+        """
+        Seat ``enrollment`` in ``cohort`` or queue it (caller commits)
+
+        After joining the queue the head is promoted once more: a seat freed
+        between the failed UPDATE and the queue insert would otherwise sit
+        empty until the next cancellation.
+
+        Returns:
+            bool: True if seated
+
+        Raises:
+            ValueError: If the cohort is closed (the caller rolls back)
+        """
+        enrollment.cohort_id = cohort.id
+        enrollment.cohort = cohort.code
+        if cls._take_seat(cohort.id):
+            enrollment.status = Enrollment.STATUS_PENDING
+            return True
+        if not cls._is_open(cohort.id):
+            raise ValueError(f"Cohort {cohort.code} is closed")
+        enrollment.status = Enrollment.STATUS_WAITLISTED
+        db.session.add(CohortWaitlist(cohort_id=cohort.id, user=user))
+        db.session.flush()  # the queue is read with Core statements, which do not autoflush
+        cls._promote(cohort.id)
+        return enrollment.status == Enrollment.STATUS_PENDING
+
+    @staticmethod
+    def _waitlist_head(cohort_id):
+        """
+        Lock and return the oldest queue entry nobody else holds
+
+        FOR UPDATE makes this a current read on MySQL, so an entry a
+        concurrent cancel() already deleted is not returned from a stale
+        REPEATABLE READ snapshot; SKIP LOCKED lets two promoters take
+        different students instead of queueing behind each other. SQLite
+        ignores both and serializes writers instead.
+        """
+        waitlist = CohortWaitlist.__table__
+        return db.session.execute(
+            select(waitlist.c.id, waitlist.c.user_id)
+            .where(waitlist.c.cohort_id == cohort_id)
+            .order_by(waitlist.c.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).first()
+
+    @classmethod
+    def _promote(cls, cohort_id):
+        """
+        Move waitlisted students into free seats, oldest first
+
+        A seat is claimed before the locked queue head is removed. If the
+        DELETE still finds nothing (the head went away under us) the seat is
+        given back and the head read again, at most PROMOTE_RETRIES times,
+        so a misbehaving isolation level can never spin while holding the
+        cohort row.
+
+        Returns:
+            list: Enrollments that were promoted
+        """
+        waitlist = CohortWaitlist.__table__
+        promoted = []
+        retries = 0
+        while True:
+            head = cls._waitlist_head(cohort_id)
+            if head is None or not cls._take_seat(cohort_id):
+                break
+
+            removed = db.session.execute(waitlist.delete().where(waitlist.c.id == head.id)).rowcount
+            if not removed:
+                # Someone else promoted or cancelled this student first
+                cls._release_seat(cohort_id)
+                retries += 1
+                if retries > cls.PROMOTE_RETRIES:
+                    break
+                continue
+
+            enrollment = Enrollment.query.filter_by(user_id=head.user_id, cohort_id=cohort_id).first()
+            if enrollment is not None:
+                enrollment.status = Enrollment.STATUS_PENDING
+                promoted.append(enrollment)
+        return promoted
+
+    @staticmethod
+    def _refresh(cohort):
+        # Seat counts were changed behind the ORM's back
+        db.session.expire(cohort, ['seats_available', 'capacity'])
+
+    # ---- Public API ----------------------------------------------------------
+
+    @classmethod
+    def reserve_seat(cls, user, cohort):
+        """
+        Reserve a seat for a user, or put them on the waitlist
+
+        Reserving again is a no-op. Moving from another cohort of the same
+        program releases the old seat.
+
+        Args:
+            user: Persistent User
+            cohort: Cohort
+
+        Returns:
+            Enrollment: status 'pending' if seated, 'waitlisted' otherwise
+
+        Raises:
+            ValueError: If the cohort is closed
+        """
+        enrollment = Enrollment.query.filter_by(user_id=user.id, program_id=cohort.program_id).first()
+        if enrollment is not None and enrollment.cohort_id == cohort.id and enrollment.status in (
+            cls.SEATED_STATUSES + (Enrollment.STATUS_WAITLISTED,)
+        ):
+            return enrollment
+
+        previous_cohort_id = None
+        if enrollment is None:
+            enrollment = Enrollment(user_id=user.id, program_id=cohort.program_id)
+            db.session.add(enrollment)
+        elif enrollment.cohort_id is not None:
+            previous_cohort_id = cls._leave(user.id, enrollment)
+
+        try:
+            cls.place(user, cohort, enrollment)
+        except ValueError:
+            db.session.rollback()
+            raise
+        if previous_cohort_id is not None:
+            cls._promote(previous_cohort_id)
+        db.session.commit()
+
+        cls._refresh(cohort)
+        return enrollment
+
+    @classmethod
+    def _leave(cls, user_id, enrollment):
+        """Give up a seat or queue place; returns the cohort id that was left"""
+        cohort_id = enrollment.cohort_id
+        if enrollment.status in cls.SEATED_STATUSES:
+            cls._release_seat(cohort_id)
+        elif enrollment.status == Enrollment.STATUS_WAITLISTED:
+            CohortWaitlist.query.filter_by(cohort_id=cohort_id, user_id=user_id).delete(
+                synchronize_session=False
+            )
+        return cohort_id
+
+    @classmethod
+    def cancel(cls, user, cohort):
+        """
+        Cancel a reservation or waitlist place
+
+        A freed seat goes to the head of the waitlist in the same
+        transaction, so it is never visible to new registrants first.
+
+        Returns:
+            list: Enrollments promoted off the waitlist (empty if none)
+
+        Raises:
+            ValueError: If the user holds no seat or queue place in the cohort
+        """
+        enrollment = Enrollment.query.filter_by(user_id=user.id, cohort_id=cohort.id).first()
+        if enrollment is None or enrollment.status not in (
+            cls.SEATED_STATUSES + (Enrollment.STATUS_WAITLISTED,)
+        ):
+            raise ValueError("No reservation to cancel")
+
+        cls._leave(user.id, enrollment)
+        enrollment.status = Enrollment.STATUS_WITHDRAWN
+        promoted = cls._promote(cohort.id)
+        db.session.commit()
+
+        cls._refresh(cohort)
+        return promoted
+
+    @classmethod
+    def set_capacity(cls, cohort, capacity):
+        """
+        Change capacity, keeping taken seats; extra seats go to the waitlist
+
+        Raises:
+            ValueError: If capacity would drop below the seats already taken
+        """
+        table = Cohort.__table__
+        delta = capacity - table.c.capacity
+        # MySQL applies SET clauses left to right, so seats must use the old capacity
+        result = db.session.execute(
+            table.update()
+            .where(table.c.id == cohort.id, table.c.seats_available + delta >= 0)
+            .ordered_values(
+                (table.c.seats_available, table.c.seats_available + delta),
+                (table.c.capacity, capacity),
+            )
+        )
+        if result.rowcount != 1:
+            db.session.rollback()
+            raise ValueError("Capacity is below the number of seats already taken")
+
+        promoted = cls._promote(cohort.id)
+        db.session.commit()
+        cls._refresh(cohort)
+        return promoted
+
+    @classmethod
+    def waitlist_position(cls, user, cohort):
+        """1-based place in the queue, or None if not waitlisted"""
+        entry = CohortWaitlist.query.filter_by(cohort_id=cohort.id, user_id=user.id).first()
+        if entry is None:
+            return None
+        return db.session.query(func.count(CohortWaitlist.id)).filter(
+            CohortWaitlist.cohort_id == cohort.id, CohortWaitlist.id <= entry.id
+        ).scalar()
+
+    @classmethod
+    def summary(cls, cohort):
+        """Seat and queue numbers for a cohort"""
+        waitlisted = db.session.query(func.count(CohortWaitlist.id)).filter_by(cohort_id=cohort.id).scalar()
+        return dict(cohort.to_dict(), seats_taken=cohort.seats_taken, waitlisted=waitlisted)
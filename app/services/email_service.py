@@ -1,5 +1,6 @@
 from flask_mail import Message
 from app.extensions import mail
+from app.metrics import email_enqueued, email_finished
 from flask import current_app, url_for, render_template
 from threading import Thread
 import time
@@ -16,6 +17,8 @@ class EmailService:
                 current_app.logger.info(f"Email sent successfully to {msg.recipients}")
             except Exception as e:
                 current_app.logger.error(f"Failed to send email: {str(e)}")
+            finally:
+                email_finished()
     
     @classmethod
     def send_email(cls, subject, recipients, text_body, html_body=None):
@@ -37,6 +40,7 @@ class EmailService:
         )
         
         # Send email in background thread
+        email_enqueued()
         Thread(target=cls.send_async_email, args=(current_app._get_current_object(), msg)).start()
     
     @classmethod
@@ -0,0 +1,242 @@
+import json
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager
+from app.extensions import db
+from app.models.user import User
+from app.models.program import Program
+from app.models.enrollment import Enrollment
+from app.models.cohort import Cohort
+from app.services.cohort_service import CohortService
+
+class EnrollmentService:
+    """Program enrollments and the roster, count and course queries built on them"""
+
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+    BACKFILL_CHUNK_SIZE = 1000
+
+    @staticmethod
+    def parse_program_ids(value):
+        """
+        Normalise a selected_programs value to a list of unique int ids
+
+        Accepts the stored JSON list (ids as strings or ints) or a JSON string.
+        """
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                return []
+        if not isinstance(value, (list, tuple)):
+            value = [value] if value is not None else []
+
+        ids = []
+        for item in value:
+            try:
+                program_id = int(item)
+            except (TypeError, ValueError):
+                continue
+            if program_id not in ids:
+                ids.append(program_id)
+        return ids
+
+    @classmethod
+    def enroll(cls, user, program_ids, cohort=None, status=Enrollment.STATUS_PENDING):
+        """
+        Enroll a user in programs they are not already in
+
+        The caller commits, so enrollments are written in the same
+        transaction as the user. Programs with a capacity-limited cohort
+        matching ``cohort`` get a seat or a waitlist place.
+
+        Args:
+            user: User (new or persistent)
+            program_ids: Iterable of program ids
+            cohort: Cohort label
+            status: Initial status
+
+        Returns:
+            list: The new Enrollment objects
+
+        Raises:
+            ValueError: If a program does not exist or is not active, or its
+            cohort is closed (the caller rolls back)
+        """
+        program_ids = cls.parse_program_ids(list(program_ids))
+        if not program_ids:
+            return []
+
+        active = {
+            program_id for program_id, in db.session.query(Program.id).filter(
+                Program.id.in_(program_ids), Program.is_active.isnot(False)
+            )
+        }
+        missing = [program_id for program_id in program_ids if program_id not in active]
+        if missing:
+            raise ValueError(f"Invalid program selection: {', '.join(map(str, missing))}")
+
+        cohorts = {}
+        if cohort:
+            cohorts = {
+                limited.program_id: limited for limited in Cohort.query.filter(
+                    Cohort.program_id.in_(program_ids), Cohort.code == cohort
+                )
+            }
+
+        existing = {enrollment.program_id for enrollment in user.enrollments}
+        created = []
+        for program_id in program_ids:
+            if program_id in existing:
+                continue
+            enrollment = Enrollment(program_id=program_id, cohort=cohort, status=status)
+            user.enrollments.append(enrollment)
+            if program_id in cohorts:
+                CohortService.place(user, cohorts[program_id], enrollment)
+            created.append(enrollment)
+        return created
+
+    @classmethod
+    def roster(cls, program_id, cohort=None, statuses=Enrollment.CURRENT_STATUSES,
+               after=None, limit=None):
+        """
+        Students enrolled in a program, ordered by user id
+
+        Reads ix_enrollments_program_status_user and joins users by primary
+        key for the page only.
+
+        Args:
+            program_id: Program to list
+            cohort: Optional cohort label
+            statuses: Enrollment statuses to include
+            after: ``next_cursor`` from the previous page (a user id)
+            limit: Page size (capped at MAX_PAGE_SIZE)
+
+        Returns:
+            dict: students (list of dicts), next_cursor (int or None)
+        """
+        limit = min(int(limit or cls.DEFAULT_PAGE_SIZE), cls.MAX_PAGE_SIZE)
+        query = db.session.query(
+            Enrollment.user_id, Enrollment.cohort, Enrollment.status, Enrollment.created_at,
+            User.username, User.email, User.surname, User.first_name, User.phone
+        ).join(User, User.id == Enrollment.user_id).filter(
+            Enrollment.program_id == program_id,
+            Enrollment.status.in_(statuses),
+        )
+        if cohort:
+            query = query.filter(Enrollment.cohort == cohort)
+        if after:
+            query = query.filter(Enrollment.user_id > int(after))
+
+        rows = query.order_by(Enrollment.user_id).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        students = [
+            {
+                'user_id': row.user_id,
+                'username': row.username,
+                'email': row.email,
+                'full_name': f"{row.surname} {row.first_name}",
+                'phone': row.phone,
+                'cohort': row.cohort,
+                'status': row.status,
+                'enrolled_at': row.created_at.isoformat() if row.created_at else None,
+            }
+            for row in rows
+        ]
+        return {'students': students, 'next_cursor': rows[-1].user_id if has_more else None}
+
+    @classmethod
+    def count(cls, program_id, cohort=None, statuses=Enrollment.CURRENT_STATUSES):
+        """Number of enrollments in a program (index-only)"""
+        query = db.session.query(func.count(Enrollment.id)).filter(
+            Enrollment.program_id == program_id,
+            Enrollment.status.in_(statuses),
+        )
+        if cohort:
+            query = query.filter(Enrollment.cohort == cohort)
+        return query.scalar()
+
+    @classmethod
+    def counts_by_program(cls, statuses=Enrollment.CURRENT_STATUSES):
+        """
+        Enrollment counts for every program in one grouped query
+
+        Returns:
+            dict: program_id -> count (programs without enrollments are absent)
+        """
+        rows = db.session.query(Enrollment.program_id, func.count(Enrollment.id)).filter(
+            Enrollment.status.in_(statuses)
+        ).group_by(Enrollment.program_id)
+        return dict(rows.all())
+
+    @classmethod
+    def courses_for(cls, user_id, statuses=None):
+        """
+        A user's enrollments with their programs loaded ("my courses")
+
+        Args:
+            user_id: User id
+            statuses: Optional statuses to include (default: all)
+
+        Returns:
+            list: Enrollment objects, oldest first, with ``program`` loaded
+        """
+        query = Enrollment.query.join(Enrollment.program).options(
+            contains_eager(Enrollment.program)
+        ).filter(Enrollment.user_id == user_id)
+        if statuses:
+            query = query.filter(Enrollment.status.in_(statuses))
+        return query.order_by(Enrollment.created_at, Enrollment.id).all()
+
+    @classmethod
+    def backfill(cls, chunk_size=None):
+        """
+        Create enrollments from User.selected_programs
+
+        Users are read in primary-key chunks; each chunk checks existing
+        enrollments in one query and inserts the missing rows in one
+        statement, then commits. Safe to re-run.
+
+        Returns:
+            dict: users (scanned), created, skipped (ids with no such program)
+        """
+        chunk_size = chunk_size or cls.BACKFILL_CHUNK_SIZE
+        program_ids = {program_id for program_id, in db.session.query(Program.id)}
+        table = Enrollment.__table__
+        stats = {'users': 0, 'created': 0, 'skipped': 0}
+
+        last_id = 0
+        while True:
+            rows = db.session.query(User.id, User.selected_programs, User.created_at).filter(
+                User.id > last_id
+            ).order_by(User.id).limit(chunk_size).all()
+            if not rows:
+                return stats
+            last_id = rows[-1].id
+
+            existing = set(db.session.query(Enrollment.user_id, Enrollment.program_id).filter(
+                Enrollment.user_id.in_([row.id for row in rows])
+            ))
+            now = datetime.utcnow()
+            new_rows = []
+            for row in rows:
+                for program_id in cls.parse_program_ids(row.selected_programs):
+                    if program_id not in program_ids:
+                        stats['skipped'] += 1
+                    elif (row.id, program_id) not in existing:
+                        existing.add((row.id, program_id))
+                        new_rows.append({
+                            'user_id': row.id,
+                            'program_id': program_id,
+                            'status': Enrollment.STATUS_PENDING,
+                            'created_at': row.created_at or now,
+                            'updated_at': now,
+                        })
+
+            if new_rows:
+                db.session.execute(table.insert(), new_rows)
+            db.session.commit()
+            stats['users'] += len(rows)
+            stats['created'] += len(new_rows)
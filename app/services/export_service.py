@@ -0,0 +1,214 @@
+import csv
+import io
+import re
+import tempfile
+from sqlalchemy import and_
+from app.extensions import db
+from app.models.user import User
+from app.models.role import Role
+from app.models.program import Program
+from app.models.enrollment import Enrollment
+from app.models.user_roles import user_roles
+
+# Spreadsheet apps run cells starting with these as formulas (CSV injection)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+_NUMBER = re.compile(r'[+-]?[\d ]+(?:\.\d+)?')
+
+
+def safe_cell(value):
+    """Prefix user text that a spreadsheet would evaluate with ``'``; numbers and phones pass"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) and not _NUMBER.fullmatch(value):
+        return "'" + value
+    return value
+
+
+class ExportService:
+    """Streaming exports of users and registrations in CSV or XLSX"""
+
+    FORMATS = ('csv', 'xlsx')
+    FETCH_SIZE = 1000       # rows per server-side cursor fetch
+    CSV_FLUSH_ROWS = 500    # rows per CSV chunk sent to the client
+    XLSX_SPOOL_BYTES = 8 * 1024 * 1024  # assembled workbook kept in memory up to this size
+    XLSX_CHUNK_BYTES = 64 * 1024
+
+    USER_HEADERS = [
+        'ID', 'Username', 'Email', 'Surname', 'First Name', 'Middle Name', 'Gender',
+        'Phone', 'State', 'Country', 'Roles', 'Active', 'Suspended', 'Email Verified',
+        'Last Login', 'Registered At',
+    ]
+
+    REGISTRATION_HEADERS = [
+        'Username', 'Full Name', 'Email', 'Phone', 'Gender', 'State',
+        'Programs', 'Amount Due (NGN)', 'Email Verified', 'Registered At',
+    ]
+
+    @classmethod
+    def iter_users(cls):
+        """
+        Yield one list per user, streamed from a server-side cursor
+
+        Users are joined to their role ids and read in primary-key order, so
+        several roles arrive as consecutive rows and are folded here rather
+        than with GROUP BY or a second query per batch.
+        """
+        role_names = dict(db.session.query(Role.id, Role.name).all())
+        query = db.session.query(
+            User.id, User.username, User.email, User.surname, User.first_name,
+            User.middle_name, User.gender, User.phone, User.state, User.country,
+            User.is_active, User.is_suspended, User.email_verified,
+            User.last_login, User.created_at, user_roles.c.role_id
+        ).outerjoin(user_roles, user_roles.c.user_id == User.id).order_by(
+            User.id, user_roles.c.role_id
+        ).execution_options(stream_results=True).yield_per(cls.FETCH_SIZE)
+
+        current, roles = None, []
+        for row in query:
+            if current is not None and row.id != current.id:
+                yield cls._user_values(current, roles)
+                roles = []
+            current = row
+            if row.role_id is not None:
+                roles.append(role_names.get(row.role_id, str(row.role_id)))
+        if current is not None:
+            yield cls._user_values(current, roles)
+
+    @staticmethod
+    def _user_values(row, roles):
+        return [
+            row.id, row.username, row.email, row.surname, row.first_name,
+            row.middle_name or '', row.gender, row.phone or '', row.state or '',
+            row.country or '', ', '.join(roles),
+            'Yes' if row.is_active is not False else 'No',
+            'Yes' if row.is_suspended else 'No',
+            'Yes' if row.email_verified else 'No',
+            row.last_login.isoformat(sep=' ', timespec='seconds') if row.last_login else '',
+            row.created_at.isoformat(sep=' ', timespec='seconds') if row.created_at else '',
+        ]
+
+    @classmethod
+    def iter_registrations(cls):
+        """
+        Yield one list per user with the programs they are enrolled in and fees
+
+        Programs come from current (pending or active) enrollments, the same
+        rows the cohort rosters use, joined in and folded like roles in
+        iter_users.
+        """
+        programs = {
+            program_id: (name, float(price or 0))
+            for program_id, name, price in db.session.query(
+                Program.id, Program.name, Program.price_ngn
+            )
+        }
+        query = db.session.query(
+            User.id, User.username, User.surname, User.first_name, User.middle_name,
+            User.email, User.phone, User.gender, User.state,
+            User.email_verified, User.created_at, Enrollment.program_id
+        ).outerjoin(Enrollment, and_(
+            Enrollment.user_id == User.id, Enrollment.status.in_(Enrollment.CURRENT_STATUSES)
+        )).filter(User.deleted_at.is_(None)).order_by(
+            User.id, Enrollment.program_id
+        ).execution_options(stream_results=True).yield_per(cls.FETCH_SIZE)
+
+        current, selected = None, []
+        for row in query:
+            if current is not None and row.id != current.id:
+                yield cls._registration_values(current, selected)
+                selected = []
+            current = row
+            if row.program_id in programs:
+                selected.append(programs[row.program_id])
+        if current is not None:
+            yield cls._registration_values(current, selected)
+
+    @staticmethod
+    def _registration_values(row, selected):
+        full_name = ' '.join(part for part in (row.surname, row.first_name, row.middle_name) if part)
+        return [
+            row.username, full_name, row.email, row.phone or '', row.gender,
+            row.state or '',
+            ', '.join(name for name, _ in selected),
+            f"{sum(price for _, price in selected):.2f}",
+            'Yes' if row.email_verified else 'No',
+            row.created_at.isoformat(sep=' ', timespec='seconds') if row.created_at else '',
+        ]
+
+    @classmethod
+    def dataset(cls, name):
+        """
+        Return (headers, row_iterator) for an export
+
+        Raises:
+            ValueError: If the dataset is unknown
+        """
+        if name == 'users':
+            return cls.USER_HEADERS, cls.iter_users()
+        if name == 'registrations':
+            return cls.REGISTRATION_HEADERS, cls.iter_registrations()
+        raise ValueError(f"Unknown export: {name}")
+
+    @classmethod
+    def stream_csv(cls, headers, rows):
+        """Yield UTF-8 CSV in chunks of CSV_FLUSH_ROWS rows"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # BOM so Excel opens the file as UTF-8 (names with diacritics)
+        buffer.write('\ufeff')
+        writer.writerow(headers)
+
+        for count, row in enumerate(rows, start=1):
+            writer.writerow([safe_cell(value) for value in row])
+            if count % cls.CSV_FLUSH_ROWS == 0:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate(0)
+
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+    @staticmethod
+    def _open_workbook(output, headers, rows, sheet_name):
+        """Create a constant-memory workbook and write every row into it"""
+        try:
+            import xlsxwriter
+        except ImportError as e:
+            raise RuntimeError("XLSX export requires the 'XlsxWriter' package") from e
+
+        # constant_memory flushes each row to a temp file as soon as the next
+        # one starts; strings_to_formulas=False stores '=...' as text
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'strings_to_formulas': False})
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.write_row(0, 0, headers, workbook.add_format({'bold': True}))
+        for index, row in enumerate(rows, start=1):
+            worksheet.write_row(index, 0, row)
+        return workbook
+
+    @classmethod
+    def write_xlsx(cls, headers, rows, output, sheet_name='Export'):
+        """
+        Write an XLSX workbook to a path or file-like object
+
+        Memory stays flat however many rows there are.
+        """
+        cls._open_workbook(output, headers, rows, sheet_name).close()
+
+    @classmethod
+    def stream_xlsx(cls, headers, rows, sheet_name='Export'):
+        """
+        Yield an XLSX file in chunks
+
+        An XLSX is a zip that is only complete once every row is written, so
+        the workbook is assembled first: rows go to XlsxWriter's temp files
+        (constant_memory), and the finished zip to a spooled temporary file,
+        kept in memory up to XLSX_SPOOL_BYTES, which is then sent in
+        XLSX_CHUNK_BYTES pieces. Nothing runs in another thread, and the
+        spool is closed even if the client disconnects mid-download.
+        """
+        with tempfile.SpooledTemporaryFile(max_size=cls.XLSX_SPOOL_BYTES) as spool:
+            cls.write_xlsx(headers, rows, spool, sheet_name)
+            spool.seek(0)
+            while True:
+                chunk = spool.read(cls.XLSX_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
@@ -1,9 +1,7 @@
 import os
 import uuid
-from PIL import Image
 from werkzeug.utils import secure_filename
 from flask import current_app
-import magic
 from pathlib import Path
 
 class FileUploadService:
@@ -49,7 +47,8 @@ class FileUploadService:
             return False, f'File size exceeds {max_size // (1024*1024)}MB limit', None
         file.seek(0)  # Reset file pointer
         
-        # Check MIME type
+        # Check MIME type (libmagic is loaded on first upload, not at import)
+        import magic
         mime = magic.Magic(mime=True)
         mime_type = mime.from_buffer(file.read(1024))
         file.seek(0)
@@ -109,6 +108,8 @@ class FileUploadService:
     @classmethod
     def _process_image(cls, image_path):
         """Process uploaded image (resize, optimize)"""
+        from PIL import Image
+
         try:
             with Image.open(image_path) as img:
                 # Convert to RGB if necessary
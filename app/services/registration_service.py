@@ -5,6 +5,7 @@ from app.models.role import Role
 from app.models.registration_sequence import RegistrationSequence
 from app.services.username_generator import UsernameGenerator
 from app.services.file_upload_service import FileUploadService
+from app.services.enrollment_service import EnrollmentService
 import json
 
 class RegistrationService:
@@ -30,6 +31,13 @@ class RegistrationService:
             if validation_error:
                 return None, validation_error
             
+            # Assign role (default to Student if not specified); checked before
+            # anything is allocated or enrolled
+            role_name = form_data.get('role', 'Student')
+            role = Role.query.filter_by(name=role_name).first()
+            if not role:
+                return None, f"Invalid role: {role_name}"
+            
             # Generate username
             username, username_error = cls._generate_username(form_data)
             if username_error:
@@ -81,15 +89,16 @@ class RegistrationService:
             if 'qualifications' in form_data:
                 user.qualifications = cls._parse_qualifications(form_data['qualifications'])
             
-            # Parse selected programs
+            # Parse selected programs and enroll the user in them
             if 'selected_programs' in form_data:
                 user.selected_programs = cls._parse_selected_programs(form_data['selected_programs'])
-            
-            # Assign role (default to Student if not specified)
-            role_name = form_data.get('role', 'Student')
-            role = Role.query.filter_by(name=role_name).first()
-            if not role:
-                return None, f"Invalid role: {role_name}"
+                try:
+                    EnrollmentService.enroll(user, user.selected_programs,
+                                             cohort=form_data.get('cohort', 'A'))
+                except ValueError as e:
+                    # Seats already taken for earlier programs must not reach a later commit
+                    db.session.rollback()
+                    return None, str(e)
             
             user.roles.append(role)
             
@@ -217,7 +226,7 @@ class RegistrationService:
             tuple: (user_object, error_message)
         """
         try:
-            user = User.query.get(user_id)
+            user = User.query.options(User.load_profile()).get(user_id)
             if not user:
                 return None, "User not found"
             
@@ -0,0 +1,121 @@
+from sqlalchemy import case, func
+from app.extensions import db
+from app.models.user import User
+from app.models.role import Role
+from app.models.program import Program
+from app.models.user_roles import user_roles
+from app.models.stats_counter import StatsCounter
+
+class StatsService:
+    """Dashboard statistics read from incrementally maintained counters"""
+
+    @classmethod
+    def dashboard_stats(cls):
+        """
+        Headline numbers for the admin dashboard and /admin/api/stats
+
+        Returns:
+            dict: total_users, active_users, total_programs, active_programs
+        """
+        values = StatsCounter.get_values([
+            StatsCounter.USERS_TOTAL,
+            StatsCounter.USERS_ACTIVE,
+            StatsCounter.PROGRAMS_TOTAL,
+            StatsCounter.PROGRAMS_ACTIVE,
+        ])
+        return {
+            'total_users': values[StatsCounter.USERS_TOTAL],
+            'active_users': values[StatsCounter.USERS_ACTIVE],
+            'total_programs': values[StatsCounter.PROGRAMS_TOTAL],
+            'active_programs': values[StatsCounter.PROGRAMS_ACTIVE],
+        }
+
+    @classmethod
+    def role_user_counts(cls, roles):
+        """
+        Number of users holding each role
+
+        Args:
+            roles: Iterable of Role objects
+
+        Returns:
+            dict: role_id -> user count
+        """
+        roles = list(roles)
+        keys = {role.id: StatsCounter.role_users_key(role.id) for role in roles}
+        values = StatsCounter.get_values(keys.values())
+        return {role_id: values[key] for role_id, key in keys.items()}
+
+    @classmethod
+    def compute_actual(cls):
+        """Recount everything from the source tables (aggregate queries only)"""
+        total_users, active_users = db.session.query(
+            func.count(User.id),
+            func.coalesce(func.sum(case((User.is_active.is_(False), 0), else_=1)), 0)
+        ).one()
+        total_programs, active_programs = db.session.query(
+            func.count(Program.id),
+            func.coalesce(func.sum(case((Program.is_active.is_(False), 0), else_=1)), 0)
+        ).one()
+
+        actual = {
+            StatsCounter.USERS_TOTAL: total_users,
+            StatsCounter.USERS_ACTIVE: int(active_users),
+            StatsCounter.PROGRAMS_TOTAL: total_programs,
+            StatsCounter.PROGRAMS_ACTIVE: int(active_programs),
+        }
+
+        role_ids = [role_id for role_id, in db.session.query(Role.id)]
+        actual.update({StatsCounter.role_users_key(role_id): 0 for role_id in role_ids})
+        membership = db.session.query(
+            user_roles.c.role_id, func.count()
+        ).group_by(user_roles.c.role_id)
+        for role_id, count in membership:
+            actual[StatsCounter.role_users_key(role_id)] = count
+
+        return actual
+
+    @classmethod
+    def reconcile(cls, dry_run=False):
+        """
+        Compare counters with real counts and correct any drift
+
+        Counters can drift when rows are changed outside the ORM unit of
+        work (bulk updates, manual SQL, ON DELETE CASCADE). Run nightly.
+
+        Args:
+            dry_run: Report drift without writing
+
+        Returns:
+            dict: counter name -> (stored_value, actual_value) for drifted counters
+        """
+        # Lock the counters first so concurrent writers queue behind the recount
+        stored = {row.name: row.value for row in StatsCounter.query.with_for_update()}
+        actual = cls.compute_actual()
+
+        drift = {}
+        for name, value in actual.items():
+            if stored.get(name) != value:
+                drift[name] = (stored.get(name), value)
+
+        # Counters for roles that no longer exist
+        for name, value in stored.items():
+            if name not in actual:
+                drift[name] = (value, None)
+
+        if not dry_run and drift:
+            for name, (_, value) in drift.items():
+                counter = db.session.get(StatsCounter, name)
+                if value is None:
+                    db.session.delete(counter)
+                elif counter is None:
+                    db.session.add(StatsCounter(name=name, value=value))
+                else:
+                    counter.value = value
+
+        if dry_run:
+            db.session.rollback()
+        else:
+            db.session.commit()
+
+        return drift
@@ -0,0 +1,156 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+from app.extensions import db
+from app.models.user import User
+from app.models.role import Role
+from app.models.user_roles import user_roles
+
+class UserDirectoryService:
+    """Keyset-paginated, filterable listing of user accounts for admins"""
+
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
+    # Only the columns the directory grid shows
+    GRID_COLUMNS = (
+        User.id, User.username, User.email, User.surname, User.first_name,
+        User.state, User.is_active, User.is_suspended, User.email_verified,
+        User.deleted_at, User.created_at,
+    )
+
+    STATUSES = ('active', 'inactive', 'suspended', 'deleted')
+
+    @classmethod
+    def list_users(cls, role=None, status=None, state=None, verified=None,
+                   after=None, limit=None):
+        """
+        Return one page of users, newest first
+
+        Pages are addressed by an opaque cursor over (created_at, id) rather
+        than an OFFSET, so page 500 costs the same as page 1. Users without a
+        created_at come last (MySQL and SQLite sort NULL lowest).
+
+        Args:
+            role: Role name to filter by
+            status: One of 'active', 'inactive', 'suspended', 'deleted'
+            state: State of residence (exact match)
+            verified: True/False to filter on email verification
+            after: Cursor returned as ``next_cursor`` by the previous page
+            limit: Page size (1 to MAX_PAGE_SIZE)
+
+        Returns:
+            dict: users (list of dicts), next_cursor (str or None)
+        """
+        limit = max(1, min(int(limit or cls.DEFAULT_PAGE_SIZE), cls.MAX_PAGE_SIZE))
+        query = db.session.query(*cls.GRID_COLUMNS)
+
+        if role:
+            query = query.join(user_roles, user_roles.c.user_id == User.id).join(
+                Role, Role.id == user_roles.c.role_id
+            ).filter(Role.name == role)
+
+        query = cls._apply_status(query, status)
+
+        if state:
+            query = query.filter(User.state == state)
+
+        if verified is not None:
+            query = query.filter(User.email_verified.is_(bool(verified)))
+
+        if after:
+            created_at, user_id = cls.decode_cursor(after)
+            if created_at is None:
+                # Already in the undated tail
+                query = query.filter(User.created_at.is_(None), User.id < user_id)
+            else:
+                query = query.filter(or_(
+                    User.created_at < created_at,
+                    and_(User.created_at == created_at, User.id < user_id),
+                    User.created_at.is_(None),
+                ))
+
+        rows = query.order_by(User.created_at.desc(), User.id.desc()).limit(limit + 1).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        roles_by_user = cls._roles_for([row.id for row in rows])
+
+        users = [cls._row_to_dict(row, roles_by_user.get(row.id, [])) for row in rows]
+        next_cursor = cls.encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+
+        return {'users': users, 'next_cursor': next_cursor}
+
+    @classmethod
+    def _apply_status(cls, query, status):
+        if not status:
+            return query
+        if status not in cls.STATUSES:
+            raise ValueError(f"Invalid status: {status}")
+        if status == 'deleted':
+            return query.filter(User.deleted_at.isnot(None))
+
+        query = query.filter(User.deleted_at.is_(None))
+        if status == 'suspended':
+            return query.filter(User.is_suspended.is_(True))
+        if status == 'active':
+            return query.filter(User.is_active.is_(True), User.is_suspended.isnot(True))
+        return query.filter(User.is_active.is_(False))
+
+    @classmethod
+    def _roles_for(cls, user_ids):
+        """Load role names for a whole page in a single query"""
+        if not user_ids:
+            return {}
+        rows = db.session.query(user_roles.c.user_id, Role.name).join(
+            Role, Role.id == user_roles.c.role_id
+        ).filter(user_roles.c.user_id.in_(user_ids)).order_by(Role.name)
+
+        roles_by_user = {}
+        for user_id, role_name in rows:
+            roles_by_user.setdefault(user_id, []).append(role_name)
+        return roles_by_user
+
+    @staticmethod
+    def _row_to_dict(row, roles):
+        if row.deleted_at:
+            status = 'deleted'
+        elif row.is_suspended:
+            status = 'suspended'
+        elif row.is_active is False:
+            status = 'inactive'
+        else:
+            status = 'active'
+
+        return {
+            'id': row.id,
+            'username': row.username,
+            'email': row.email,
+            'full_name': f"{row.surname} {row.first_name}",
+            'state': row.state,
+            'status': status,
+            'email_verified': bool(row.email_verified),
+            'roles': roles,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+        }
+
+    @staticmethod
+    def encode_cursor(created_at, user_id):
+        payload = json.dumps([created_at.isoformat() if created_at else None, user_id]).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Decode a page cursor
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, user_id = json.loads(base64.urlsafe_b64decode(padded))
+            return (datetime.fromisoformat(created_at) if created_at is not None else None), int(user_id)
+        except (TypeError, ValueError, json.JSONDecodeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
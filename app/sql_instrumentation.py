@@ -0,0 +1,251 @@
+import os
+import re
+import sys
+import time
+import heapq
+from collections import Counter
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+from flask import current_app, request
+from sqlalchemy import event
+from app.extensions import db
+
+# Collectors receiving statements in the current thread/task. Empty unless a
+# request is being instrumented or a query_budget block is active.
+_collectors = ContextVar('sql_collectors', default=())
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SKIP_PATHS = (os.path.abspath(__file__), os.sep + 'site-packages' + os.sep, os.sep + 'lib' + os.sep + 'python')
+
+_IN_LIST = re.compile(r'\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block or view runs more queries than its budget"""
+
+
+def statement_shape(statement):
+    """Normalise a statement so repeats with different IN-list sizes match"""
+    return _WHITESPACE.sub(' ', _IN_LIST.sub('(?)', statement)).strip()
+
+
+def _call_site(depth):
+    """The innermost ``depth`` project frames that led to this statement"""
+    frames = []
+    frame = sys._getframe(1)
+    while frame is not None and len(frames) < depth:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PROJECT_ROOT) and not any(skip in filename for skip in _SKIP_PATHS):
+            frames.append(f"{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.f_lineno} in {frame.f_code.co_name}")
+        frame = frame.f_back
+    return tuple(frames)
+
+
+class QueryLog:
+    """Statements seen by one request or one query_budget block"""
+
+    def __init__(self, keep_slowest=5, stack_depth=4):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes = Counter()
+        self.shape_sites = {}
+        self.keep_slowest = keep_slowest
+        self.stack_depth = stack_depth
+        self._slowest = []  # min-heap of (ms, seq, statement, site)
+
+    def record(self, statement, elapsed_ms, site, parameters=None):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        shape = statement_shape(statement)
+        self.shapes[shape] += 1
+        self.shape_sites.setdefault(shape, site)
+
+        entry = (elapsed_ms, self.count, statement, site)
+        if len(self._slowest) < self.keep_slowest:
+            heapq.heappush(self._slowest, entry)
+        elif elapsed_ms > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def slowest(self):
+        """[(ms, statement, call_site)] slowest first"""
+        return [(ms, statement, site) for ms, _, statement, site in sorted(self._slowest, reverse=True)]
+
+    def repeated(self, threshold):
+        """Statement shapes run at least ``threshold`` times (likely N+1)"""
+        return [
+            (shape, count, self.shape_sites[shape])
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+    def summary(self):
+        lines = [f"{self.count} queries, {self.total_ms:.1f} ms"]
+        for shape, count in self.shapes.most_common(10):
+            lines.append(f"  {count} x {shape[:200]}")
+        return '\n'.join(lines)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _collectors.get() and context is not None:
+        context._sql_instrumentation_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = _collectors.get()
+    if not collectors:
+        return
+    started = getattr(context, '_sql_instrumentation_start', None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    site = _call_site(max(collector.stack_depth for collector in collectors))
+    parameters = None if executemany else parameters
+    for collector in collectors:
+        collector.record(statement, elapsed_ms, site[:collector.stack_depth], parameters)
+
+
+def install_listeners(engine):
+    """Attach the timing hooks to an engine (idempotent)"""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def push_collector(collector):
+    return _collectors.set(_collectors.get() + (collector,))
+
+
+def pop_collector(token):
+    _collectors.reset(token)
+
+
+def _enabled(app):
+    return app.config.get('SQL_INSTRUMENTATION', False)
+
+
+class query_budget(ContextDecorator):
+    """
+    Fail (or warn) when a block or view runs more than ``limit`` queries
+
+    ::
+
+        with query_budget(3):
+            client.get('/admin/api/users')
+
+        @admin_bp.route('/api/stats')
+        @query_budget(4)
+        def api_stats(): ...
+
+    Budgets raise QueryBudgetExceeded when SQL_QUERY_BUDGET_RAISE is set
+    (the default under testing) and log a warning otherwise. On views they
+    are skipped entirely unless SQL_INSTRUMENTATION is on or the app is
+    testing.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.log = None
+        self._tokens = []
+
+    def _recreate_cm(self):
+        # A decorated view can run in several threads at once: give each call
+        # its own log and tokens instead of sharing this instance's
+        return type(self)(self.limit)
+
+    def __enter__(self):
+        app = current_app._get_current_object()
+        self.log = None
+        if not (_enabled(app) or app.testing):
+            self._tokens.append(None)
+            return self
+        for engine in db.engines.values():
+            install_listeners(engine)
+        self.log = QueryLog(stack_depth=app.config.get('SQL_STACK_DEPTH', 4))
+        self._tokens.append((push_collector(self.log), self.log))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        entry = self._tokens.pop()
+        if entry is None:
+            return False
+        token, log = entry
+        pop_collector(token)
+        if exc_type is None and log.count > self.limit:
+            message = f"Query budget of {self.limit} exceeded: {log.summary()}"
+            config = current_app.config
+            if config.get('SQL_QUERY_BUDGET_RAISE', current_app.testing):
+                raise QueryBudgetExceeded(message)
+            current_app.logger.warning(message)
+        return False
+
+    @property
+    def count(self):
+        return self.log.count if self.log else 0
+
+
+def current_query_log():
+    """The QueryLog for the current request, or None when not instrumenting"""
+    if not request:
+        return None
+    return request.environ.get('sql_instrumentation.log')
+
+
+def init_sql_instrumentation(app):
+    """
+    Count and time every statement per request when SQL_INSTRUMENTATION is on
+
+    When it is off nothing is registered: no engine listeners and no
+    request hooks, so there is no per-query cost at all.
+    """
+    if not _enabled(app):
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            install_listeners(engine)
+
+    settings = {
+        'slow_ms': app.config.get('SQL_SLOW_QUERY_MS', 100),
+        'n_plus_one': app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 5),
+        'stack_depth': app.config.get('SQL_STACK_DEPTH', 4),
+    }
+    app.extensions['sql_instrumentation'] = settings
+
+    @app.before_request
+    def _start_query_log():
+        log = QueryLog(stack_depth=settings['stack_depth'])
+        request.environ['sql_instrumentation.token'] = push_collector(log)
+        request.environ['sql_instrumentation.log'] = log
+
+    @app.after_request
+    def _query_headers(response):
+        log = request.environ.get('sql_instrumentation.log')
+        if log is not None:
+            response.headers['X-Query-Count'] = str(log.count)
+            response.headers['X-Query-Time-Ms'] = f"{log.total_ms:.1f}"
+        return response
+
+    @app.teardown_request
+    def _report_query_log(exc):
+        token = request.environ.pop('sql_instrumentation.token', None)
+        log = request.environ.pop('sql_instrumentation.log', None)
+        if token is None:
+            return
+        pop_collector(token)
+
+        endpoint = request.endpoint or request.path
+        for ms, statement, site in log.slowest:
+            if ms < settings['slow_ms']:
+                break
+            app.logger.warning(
+                f"Slow query ({ms:.1f} ms) in {endpoint}: {statement_shape(statement)[:500]}\n"
+                + '\n'.join(f"    at {frame}" for frame in site)
+            )
+        for shape, count, site in log.repeated(settings['n_plus_one']):
+            app.logger.warning(
+                f"Possible N+1 in {endpoint}: {count} x {shape[:300]}\n"
+                + '\n'.join(f"    at {frame}" for frame in site)
+            )
+        app.logger.debug(f"{endpoint}: {log.count} queries in {log.total_ms:.1f} ms")
@@ -0,0 +1,129 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+ENTRY_POINTS = ('web', 'cli', 'worker')
+
+# `flask <command>`s that serve or inspect the web app need the full app
+_WEB_COMMANDS = {'run', 'shell', 'routes'}
+# flask options that take a value (so the value is not mistaken for the command)
+_FLASK_VALUE_OPTIONS = {'--app', '-A', '--env-file', '-e'}
+
+
+def detect_entry_point(argv=None):
+    """
+    Which entry point is creating the app: web, cli or worker
+
+    APP_ENTRY_POINT wins; otherwise `flask <command>` is the CLI (except
+    run/shell/routes) and everything else (gunicorn, pytest, scripts) is web.
+    """
+    explicit = os.environ.get('APP_ENTRY_POINT')
+    if explicit:
+        if explicit not in ENTRY_POINTS:
+            raise ValueError(f"APP_ENTRY_POINT must be one of {', '.join(ENTRY_POINTS)}")
+        return explicit
+
+    argv = sys.argv if argv is None else argv
+    if not argv:
+        return 'web'
+    program = os.path.basename(argv[0])
+    if program not in ('flask', 'flask.exe') and not argv[0].endswith(os.path.join('flask', '__main__.py')):
+        return 'web'
+
+    args = iter(argv[1:])
+    for arg in args:
+        if arg in _FLASK_VALUE_OPTIONS:
+            next(args, None)
+        elif not arg.startswith('-'):
+            return 'web' if arg in _WEB_COMMANDS else 'cli'
+    return 'web'
+
+
+class StartupTimer:
+    """Wall-clock time of each create_app phase, kept in app.extensions['startup']"""
+
+    def __init__(self, entry_point):
+        self.entry_point = entry_point
+        self.started = time.perf_counter()
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    def as_dict(self):
+        return {
+            'entry_point': self.entry_point,
+            'phases_ms': dict(self.phases),
+            'create_app_ms': round((time.perf_counter() - self.started) * 1000, 2),
+        }
+
+
+def parse_importtime(output):
+    """
+    Parse ``python -X importtime`` output
+
+    Returns:
+        list: (module, self_us, cumulative_us, depth) in import order
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            depth = (len(name) - len(name.lstrip())) // 2
+            modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+        except ValueError:
+            continue
+    return modules
+
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app(sys.argv[1])
+finished = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'total_ms': (finished - started) * 1000,
+    'startup': app.extensions['startup'],
+    'modules': sorted(sys.modules),
+}))
+"""
+
+
+def measure_startup(config_name='default', entry_point='web', importtime=True):
+    """
+    Cold-start the app in a fresh interpreter and report where the time went
+
+    Returns:
+        dict: import_ms, total_ms, startup (create_app phases), modules
+        (every module loaded) and, with ``importtime``, imports
+        (parse_importtime rows)
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, APP_ENTRY_POINT=entry_point)
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    result = subprocess.run(
+        command + ['-c', _PROBE, config_name], cwd=root, env=env,
+        capture_output=True, text=True, timeout=120,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"App failed to start:\n{result.stderr[-2000:]}")
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    if importtime:
+        report['imports'] = parse_importtime(result.stderr)
+    return report
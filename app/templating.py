@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from flask import current_app, g, request
+from jinja2 import FileSystemBytecodeCache, TemplateSyntaxError, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+
+class FragmentCacheExtension(Extension):
+    """
+    ``{% cache key, ttl %}...{% endcache %}`` backed by the app cache
+
+    ``key`` is a string or a list of parts, e.g.
+    ``{% cache ['featured-programs', catalog_version], 600 %}``. The first
+    part names the fragment for the hit/miss metrics; the rest vary the key.
+    ``ttl`` is optional and falls back to ``FRAGMENT_CACHE_TTL``.
+    """
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(
+            fragment_cache_stats={},
+            fragment_cache_stats_lock=threading.Lock(),
+        )
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        if parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        else:
+            args.append(nodes.Const(None))
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_cache_support', args), [], [], body
+        ).set_lineno(lineno)
+
+    def _cache_support(self, key, ttl, caller):
+        config = current_app.config
+        if not config.get('FRAGMENT_CACHE_ENABLED', True):
+            return caller()
+
+        parts = [key] if isinstance(key, str) else list(key)
+        name = str(parts[0])
+        cache_key = 'fragment:' + ':'.join(str(part) for part in parts)
+        if ttl is None:
+            ttl = config.get('FRAGMENT_CACHE_TTL', 300)
+
+        cache = current_app.extensions['cache']
+        rendered = cache.get(cache_key)
+        self._record(name, hit=rendered is not None)
+        if rendered is None:
+            rendered = caller()
+            cache.set(cache_key, str(rendered), ttl)
+        return Markup(rendered)
+
+    def _record(self, name, hit):
+        stats = self.environment.fragment_cache_stats
+        with self.environment.fragment_cache_stats_lock:
+            entry = stats.setdefault(name, {'hits': 0, 'misses': 0})
+            entry['hits' if hit else 'misses'] += 1
+
+
+def fragment_cache_stats(app=None):
+    """Return per-fragment hit/miss counts and hit ratio"""
+    app = app or current_app._get_current_object()
+    env = app.jinja_env
+    with env.fragment_cache_stats_lock:
+        snapshot = {name: dict(entry) for name, entry in env.fragment_cache_stats.items()}
+    for entry in snapshot.values():
+        total = entry['hits'] + entry['misses']
+        entry['hit_ratio'] = round(entry['hits'] / total, 4) if total else 0.0
+    return snapshot
+
+
+def init_templating(app):
+    """
+    Configure the Jinja environment before it is first created
+
+    Installs the ``{% cache %}`` fragment tag and, when enabled, the shared
+    bytecode cache. Must run before anything touches ``app.jinja_env`` (template filters,
+    context processors), because Flask builds the environment once from
+    ``app.jinja_options``.
+    """
+    app.jinja_options = {
+        **app.jinja_options,
+        'extensions': [*app.jinja_options.get('extensions', ()), FragmentCacheExtension],
+    }
+    
+    if app.config.get('JINJA_BYTECODE_CACHE'):
+        cache_dir = app.config.get('JINJA_BYTECODE_CACHE_DIR')
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_options = {
+            **app.jinja_options,
+            'bytecode_cache': FileSystemBytecodeCache(cache_dir),
+        }
+
+    app.extensions['templating'] = {
+        'booted_at': time.perf_counter(),
+        'precompiled': 0,
+        'precompile_ms': None,
+        'first_response_ms': None,
+        'first_response_endpoint': None,
+    }
+
+    @app.before_request
+    def _mark_request_start():
+        g._request_started_at = time.perf_counter()
+
+    @app.after_request
+    def _record_first_response(response):
+        stats = app.extensions['templating']
+        if stats['first_response_ms'] is None:
+            started = g.get('_request_started_at', stats['booted_at'])
+            stats['first_response_ms'] = (time.perf_counter() - started) * 1000
+            stats['first_response_endpoint'] = request.endpoint or request.path
+            app.logger.info(
+                "Worker %s first response (%s) took %.1f ms, %.1f ms after boot",
+                os.getpid(),
+                stats['first_response_endpoint'],
+                stats['first_response_ms'],
+                (time.perf_counter() - stats['booted_at']) * 1000,
+            )
+        return response
+
+    return app
+
+
+def list_app_templates(app):
+    """Return the names of all HTML templates the app can render"""
+    return sorted(
+        name for name in app.jinja_env.list_templates()
+        if name.endswith('.html')
+    )
+
+
+def precompile_templates(app=None):
+    """
+    Compile every template so the first request does not pay for it
+
+    Compiled code is kept in the environment's in-process cache and, when
+    the bytecode cache is enabled, written to the shared directory so the
+    next worker only has to unmarshal it.
+
+    Args:
+        app: Flask application (defaults to ``current_app``)
+
+    Returns:
+        tuple: (number_compiled, elapsed_ms, list_of_failed_names)
+    """
+    app = app or current_app._get_current_object()
+    started = time.perf_counter()
+    compiled = 0
+    failed = []
+
+    for name in list_app_templates(app):
+        try:
+            app.jinja_env.get_template(name)
+            compiled += 1
+        except TemplateSyntaxError as e:
+            failed.append(name)
+            app.logger.warning(f"Template {name} failed to compile: {e}")
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    stats = app.extensions.get('templating')
+    if stats is not None:
+        stats['precompiled'] = compiled
+        stats['precompile_ms'] = elapsed_ms
+
+    return compiled, elapsed_ms, failed
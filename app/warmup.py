@@ -0,0 +1,66 @@
+import time
+from sqlalchemy.orm import configure_mappers
+from app.extensions import db
+
+
+def _timed(timings, name, fn):
+    started = time.perf_counter()
+    result = fn()
+    timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def warm_shared(app):
+    """
+    Process-independent warmup, safe to run in the gunicorn master
+
+    Configures the ORM mappers and compiles every template without opening
+    a database connection, so with ``preload_app`` the results are shared
+    copy-on-write by every forked worker.
+
+    Returns:
+        dict: step -> elapsed ms
+    """
+    from app.templating import precompile_templates
+
+    timings = {}
+    _timed(timings, 'mappers', configure_mappers)
+    if app.config.get('PRECOMPILE_TEMPLATES'):
+        with app.app_context():
+            _timed(timings, 'templates', lambda: precompile_templates(app))
+    return timings
+
+
+def warm_worker(app):
+    """
+    Per-worker warmup, run after fork and before the worker accepts requests
+
+    Opens the worker's first pooled connection, runs the RBAC and stats
+    queries every page needs (filling SQLAlchemy's compiled-statement cache)
+    and primes the catalog version in the local cache tier. Failures are
+    logged, never raised: a cold worker is better than no worker.
+
+    Returns:
+        dict: step -> elapsed ms
+    """
+    from app.models.role import Role
+    from app.models.program import Program
+    from app.services.stats_service import StatsService
+
+    timings = {}
+    with app.app_context():
+        try:
+            _timed(timings, 'connect', lambda: db.session.execute(db.text('SELECT 1')))
+            _timed(timings, 'rbac', lambda: [role.permissions for role in Role.query.all()])
+            _timed(timings, 'stats', StatsService.dashboard_stats)
+            _timed(timings, 'catalog', Program.catalog_version)
+        except Exception as e:
+            app.logger.warning(f"Worker warmup incomplete: {str(e).splitlines()[0]}")
+        finally:
+            db.session.remove()
+    return timings
+
+
+def warmup(app):
+    """Both warmup stages, for servers that do not preload"""
+    return {**warm_shared(app), **warm_worker(app)}
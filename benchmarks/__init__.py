@@ -0,0 +1,7 @@
+"""
+Benchmarks for the hot paths: micro-benchmarks of services and models and a
+multi-process HTTP load test, run against SQLite and (when reachable) MySQL.
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --suite micro --baseline baseline.json
+"""
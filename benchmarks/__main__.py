@@ -0,0 +1,131 @@
+import argparse
+import sys
+from benchmarks.harness import (
+    boot_app, cleanup_target, compare, database_targets, environment,
+    load_results, seed, write_results, DEFAULT_BCRYPT_ROUNDS
+)
+from benchmarks.micro import MICRO_BENCHMARKS, run_micro
+from benchmarks.load import SCENARIOS, run_load
+from benchmarks.sequences import run_sequences
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('--suite', choices=['micro', 'load', 'sequences', 'all'], default='all')
+    parser.add_argument('--db', action='append', choices=['sqlite', 'mysql'],
+                        help='Database to run against (repeatable; default: sqlite and mysql if reachable)')
+    parser.add_argument('--only', action='append', help='Run only these micro-benchmarks / scenarios')
+    parser.add_argument('--repeat', type=int, default=5, help='Samples per micro-benchmark')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Seconds per micro-benchmark sample')
+    parser.add_argument('--processes', type=int, default=4, help='Load-test client processes')
+    parser.add_argument('--iterations', type=int, default=10, help='Scenario runs per client process')
+    parser.add_argument('--students', type=int, default=50, help='Seeded students')
+    parser.add_argument('--allocations', type=int, default=50,
+                        help='Username allocations per process in the sequences suite')
+    parser.add_argument('--sequence-keys', type=int, default=1,
+                        help='Sequences the allocations are spread over (1: all contend for one row)')
+    parser.add_argument('--bcrypt-rounds', type=int, default=DEFAULT_BCRYPT_ROUNDS,
+                        help='bcrypt cost (production uses 12)')
+    parser.add_argument('--output', '-o', help='Write results JSON here')
+    parser.add_argument('--baseline', help='Compare against this results JSON')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='Relative change counted as a regression (default 0.15)')
+    return parser.parse_args(argv)
+
+
+def run(args):
+    targets, skipped = database_targets(args.db or ['sqlite', 'mysql'])
+    for name, reason in skipped.items():
+        print(f"⚠️  Skipping {name}: {reason}")
+
+    results = {
+        'environment': environment(),
+        'settings': {
+            'repeat': args.repeat, 'processes': args.processes, 'iterations': args.iterations,
+            'students': args.students, 'bcrypt_rounds': args.bcrypt_rounds,
+            'allocations': args.allocations, 'sequence_keys': args.sequence_keys,
+        },
+        'micro': {}, 'load': {}, 'sequences': {},
+    }
+    for database, url in targets:
+        try:
+            app = boot_app(url, args.bcrypt_rounds)
+            seed(app, students=args.students)
+            if args.suite in ('micro', 'all'):
+                names = [n for n in (args.only or []) if n in MICRO_BENCHMARKS]
+                results['micro'][database] = run_micro(app, names, args.repeat, args.min_time)
+                # username_generation advanced the sequences; start the load test clean
+                seed(app, students=args.students)
+            if args.suite in ('load', 'all'):
+                scenarios = [n for n in (args.only or []) if n in SCENARIOS] or SCENARIOS
+                with app.app_context():
+                    from app.extensions import db
+                    db.engine.dispose()
+                results['load'][database] = run_load(
+                    url, args.processes, args.iterations, args.students, scenarios, args.bcrypt_rounds
+                )
+            if args.suite in ('sequences', 'all'):
+                with app.app_context():
+                    from app.extensions import db
+                    db.engine.dispose()
+                results['sequences'][database] = {'generate_username': run_sequences(
+                    url, args.processes, args.allocations, args.sequence_keys
+                )}
+        finally:
+            cleanup_target(url)
+    return results
+
+
+def report(results):
+    for database, benchmarks in results['micro'].items():
+        print(f"\nMicro-benchmarks ({database})")
+        for name, stats in benchmarks.items():
+            print(f"  {name:<28} {stats['median'] * 1e6:>10.1f} µs/call  (min {stats['min'] * 1e6:.1f})")
+    for database, scenarios in results['load'].items():
+        print(f"\nLoad test ({database})")
+        for name, stats in scenarios.items():
+            if not stats['requests']:
+                continue
+            print(f"  {name:<12} {stats['requests']:>5} req  {stats['throughput']:>7.1f} req/s  "
+                  f"p50 {stats['p50'] * 1000:.1f} ms  p95 {stats['p95'] * 1000:.1f} ms  "
+                  f"errors {stats['errors']}")
+    for database, benchmarks in results.get('sequences', {}).items():
+        print(f"\nSequence allocation ({database})")
+        for name, stats in benchmarks.items():
+            print(f"  {name:<18} {stats['requests']:>5} allocations  {stats.get('throughput', 0):>7.1f} /s  "
+                  f"p50 {stats.get('p50', 0) * 1000:.1f} ms  p99 {stats.get('p99', 0) * 1000:.1f} ms  "
+                  f"errors {stats['errors']}  duplicates {stats['duplicates']}  gaps {stats['gaps']}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args)
+    report(results)
+
+    if args.output:
+        write_results(results, args.output)
+        print(f"\n✅ Results written to {args.output}")
+
+    broken = [
+        f"{database}/{name}" for database, benchmarks in results['sequences'].items()
+        for name, stats in benchmarks.items() if stats['duplicates'] or stats['gaps']
+    ]
+    if broken:
+        print(f"\n❌ Duplicate or skipped sequence numbers: {', '.join(broken)}")
+        return 1
+
+    if args.baseline:
+        rows = compare(results, load_results(args.baseline), args.threshold)
+        regressions = [row for row in rows if row['verdict'] == 'regression']
+        print(f"\nAgainst {args.baseline} (threshold {args.threshold:.0%}):")
+        for row in rows:
+            marker = {'regression': '❌', 'improvement': '✅'}.get(row['verdict'], '  ')
+            print(f"  {marker} {row['key']:<45} {row['metric']:<6} {row['change']:+.1%}")
+        if regressions:
+            print(f"❌ {len(regressions)} regressions")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,288 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine
+from config import TestingConfig
+
+BENCH_PASSWORD = 'Bench@1234'
+# Fast hashes keep the numbers about the app, not bcrypt (see --bcrypt-rounds)
+DEFAULT_BCRYPT_ROUNDS = 4
+
+
+# ---- Timing ----------------------------------------------------------------
+
+def measure(fn, repeat=5, number=None, min_time=0.2):
+    """
+    Time ``fn`` like timeit: pick a loop count that runs for ``min_time``,
+    then take ``repeat`` samples with the GC off
+
+    Returns:
+        dict: Per-call seconds (min, median, mean, stdev) and loop counts
+    """
+    fn()  # warm caches, lazy imports and compiled templates
+    if number is None:
+        number = 1
+        while True:
+            started = time.perf_counter()
+            for _ in range(number):
+                fn()
+            if time.perf_counter() - started >= min_time / 10 or number >= 1_000_000:
+                break
+            number *= 10
+
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - started) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def latency_summary(latencies, elapsed):
+    """p50/p95/p99 and throughput of a list of request latencies (seconds)"""
+    if not latencies:
+        return {'requests': 0, 'throughput': 0.0}
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))]
+
+    return {
+        'requests': len(ordered),
+        'throughput': len(ordered) / elapsed if elapsed else 0.0,
+        'p50': percentile(50),
+        'p95': percentile(95),
+        'p99': percentile(99),
+        'max': ordered[-1],
+    }
+
+
+# ---- Databases -------------------------------------------------------------
+
+def database_targets(names):
+    """
+    Resolve database names to URLs, skipping ones that cannot be reached
+
+    ``sqlite`` is a fresh file (shared by the load-test processes);
+    ``mysql`` is BENCH_MYSQL_URL, or the configured server with a
+    ``<DB_NAME>_bench`` database.
+
+    Returns:
+        tuple: ([(name, url)], {name: reason skipped})
+    """
+    targets, skipped = [], {}
+    for name in names:
+        if name == 'sqlite':
+            handle, path = tempfile.mkstemp(prefix='yca-bench-', suffix='.db')
+            os.close(handle)
+            targets.append((name, f"sqlite:///{path}"))
+        elif name == 'mysql':
+            url = os.environ.get('BENCH_MYSQL_URL') or (
+                f"mysql+pymysql://{os.environ.get('DB_USER', 'root')}:"
+                f"{os.environ.get('DB_PASSWORD', '')}@"
+                f"{os.environ.get('DB_HOST', 'localhost')}:"
+                f"{os.environ.get('DB_PORT', '3306')}/"
+                f"{os.environ.get('DB_NAME', 'yazz_academy')}_bench"
+            )
+            try:
+                engine = create_engine(url)
+                with engine.connect():
+                    pass
+                engine.dispose()
+            except Exception as e:
+                skipped[name] = f"unavailable ({type(e).__name__})"
+                continue
+            targets.append((name, url))
+        else:
+            skipped[name] = 'unknown database'
+    return targets, skipped
+
+
+def cleanup_target(url):
+    if url.startswith('sqlite:///'):
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            try:
+                os.remove(url[len('sqlite:///'):] + suffix)
+            except OSError:
+                pass
+
+
+@contextmanager
+def testing_overrides(database_url, bcrypt_rounds=DEFAULT_BCRYPT_ROUNDS, **settings):
+    """Point create_app('testing') at ``database_url`` for the duration"""
+    settings = dict(settings, SQLALCHEMY_DATABASE_URI=database_url, BCRYPT_LOG_ROUNDS=bcrypt_rounds)
+    missing = object()
+    previous = {name: TestingConfig.__dict__.get(name, missing) for name in settings}
+    for name, value in settings.items():
+        setattr(TestingConfig, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is missing:
+                delattr(TestingConfig, name)
+            else:
+                setattr(TestingConfig, name, value)
+
+
+def boot_app(database_url, bcrypt_rounds=DEFAULT_BCRYPT_ROUNDS, **settings):
+    """create_app('testing') against ``database_url``"""
+    from app import create_app
+
+    with testing_overrides(database_url, bcrypt_rounds, **settings):
+        return create_app('testing')
+
+
+# A filled-in registration form: the deferred profile columns are about as
+# wide as a real student's
+PROFILE = {
+    'address': '12 Adetokunbo Ademola Crescent, Wuse II, Abuja, Federal Capital Territory',
+    'facebook_handle': 'bench.student', 'twitter_handle': 'bench_student',
+    'github_handle': 'bench-student', 'linkedin_handle': 'bench-student-1a2b3c',
+    'resume_path': 'resumes/bench-student-cv.pdf',
+    'bio': 'Aspiring software developer with a background in mathematics. ' * 12,
+    'qualifications': [
+        {'institution': 'University of Abuja', 'qualification': 'B.Sc. Mathematics', 'year': 2021},
+        {'institution': 'Government Secondary School Garki', 'qualification': 'WAEC SSCE', 'year': 2016},
+    ],
+    'selected_programs': [1],
+    'two_factor_backup_codes': [f'{n:04d}-bench-{n * 7919:06d}' for n in range(10)],
+}
+
+
+def seed(app, students=50):
+    """
+    Fresh schema with roles, programs and verified students
+
+    Students are ``bench<n>@example.com`` with BENCH_PASSWORD, each enrolled
+    in one program.
+    """
+    from contextlib import redirect_stdout
+    from app.extensions import db
+    from app.models.user import User
+    from app.models.role import Role
+    from app.models.program import Program
+    from app.services.enrollment_service import EnrollmentService
+    from seeders.roles_seeder import seed_roles
+    from seeders.programs_seeder import seed_programs
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        with redirect_stdout(open(os.devnull, 'w')):
+            seed_roles()
+            seed_programs()
+
+        student = Role.query.filter_by(name='Student').one()
+        programs = Program.query.order_by(Program.id).all()
+        password_hash = User(password=BENCH_PASSWORD).password_hash
+        for n in range(students):
+            user = User(
+                username=f'YCA/BENCH/STD/{n:04d}', email=f'bench{n}@example.com',
+                surname='Bench', first_name=f'Student{n}', gender=('Male', 'Female')[n % 2],
+                phone='+2348012345678', state='FCT', password_hash=password_hash,
+                email_verified=True, is_active=True, **PROFILE,
+            )
+            user.roles.append(student)
+            EnrollmentService.enroll(user, [programs[n % len(programs)].id])
+            db.session.add(user)
+        db.session.commit()
+        return {'students': students, 'programs': len(programs)}
+
+
+# ---- Results ---------------------------------------------------------------
+
+def environment():
+    """What the numbers were measured on"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'commit': commit,
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+    }
+
+
+def write_results(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# Lower is better for these; throughput is compared inverted
+COMPARED_METRICS = {'micro': 'median', 'load': 'p95', 'sequences': 'p99'}
+
+
+def compare(results, baseline, threshold=0.15):
+    """
+    Compare two result files benchmark by benchmark
+
+    Micro-benchmarks compare median time per call, load scenarios p95
+    latency and sequence allocation p99 latency. A change beyond
+    ``threshold`` (a fraction) is a regression or an improvement;
+    benchmarks missing from either side are ignored.
+
+    Returns:
+        list: dicts with key, metric, baseline, current, change, verdict
+    """
+    rows = []
+    for suite, metric in COMPARED_METRICS.items():
+        current_suite = results.get(suite, {})
+        baseline_suite = baseline.get(suite, {})
+        for database, benchmarks in current_suite.items():
+            for name, stats in benchmarks.items():
+                old = baseline_suite.get(database, {}).get(name, {}).get(metric)
+                new = stats.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                verdict = 'ok'
+                if change > threshold:
+                    verdict = 'regression'
+                elif change < -threshold:
+                    verdict = 'improvement'
+                rows.append({
+                    'key': f"{suite}/{database}/{name}", 'metric': metric,
+                    'baseline': old, 'current': new, 'change': change, 'verdict': verdict,
+                })
+    return rows
@@ -0,0 +1,152 @@
+import multiprocessing
+import os
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+from benchmarks.harness import BENCH_PASSWORD, boot_app, latency_summary
+
+SCENARIOS = ('login', 'courses', 'dashboard', 'register')
+
+# Expected status per scenario; anything else counts as an error
+EXPECTED = {'login': 302, 'courses': 200, 'dashboard': 200, 'logout': 302, 'register': 302}
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def _serve(database_url, bcrypt_rounds, port_queue, stop_event):
+    """Server process: the testing app on a threaded werkzeug server"""
+    import logging
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    app = boot_app(database_url, bcrypt_rounds)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    server.timeout = 0.2
+    port_queue.put(server.server_port)
+    while not stop_event.is_set():
+        server.handle_request()
+    server.server_close()
+
+
+class _Client:
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(CookieJar()), _NoRedirect()
+        )
+
+    def request(self, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        started = time.perf_counter()
+        try:
+            with self.opener.open(self.base_url + path, data=body, timeout=60) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            status = e.code
+        except (urllib.error.URLError, OSError):
+            status = None
+        return status, time.perf_counter() - started
+
+
+def _client_worker(base_url, worker, iterations, students, program_id, scenarios, start, results):
+    """One client process: log in, browse, log out and register, ``iterations`` times"""
+    client = _Client(base_url)
+    latencies = {name: [] for name in scenarios}
+    errors = {name: 0 for name in scenarios}
+
+    def record(name, path, data=None):
+        status, elapsed = client.request(path, data)
+        if name in latencies:
+            latencies[name].append(elapsed)
+            if status != EXPECTED[name]:
+                errors[name] += 1
+        return status
+
+    start.wait()
+    for i in range(iterations):
+        student = (worker * iterations + i) % students
+        if 'login' in scenarios or 'courses' in scenarios or 'dashboard' in scenarios:
+            record('login', '/auth/login', {
+                'email': f'bench{student}@example.com', 'password': BENCH_PASSWORD,
+            })
+            record('courses', '/dashboard/courses')
+            record('dashboard', '/student/')
+            record('logout', '/auth/logout')
+        if 'register' in scenarios:
+            record('register', '/auth/register', {
+                'surname': 'Load', 'first_name': f'Worker{worker}', 'gender': 'Female',
+                'email': f'load-{os.getpid()}-{worker}-{i}@example.com',
+                'phone': '+2348012345678', 'address': '1 Test Street', 'state': 'FCT',
+                'country': 'Nigeria', 'selected_programs': program_id,
+                'password': BENCH_PASSWORD, 'confirm_password': BENCH_PASSWORD, 'accept_terms': 'y',
+            })
+    results.put((latencies, errors))
+
+
+def run_load(database_url, processes=4, iterations=10, students=50, scenarios=SCENARIOS,
+             bcrypt_rounds=None):
+    """
+    Multi-process HTTP load test against a seeded database
+
+    One process serves the testing app; ``processes`` client processes
+    each run the login -> courses -> dashboard -> logout and register
+    scenarios ``iterations`` times, all starting together.
+
+    Returns:
+        dict: scenario -> latency_summary() plus an ``errors`` count
+    """
+    from benchmarks.harness import DEFAULT_BCRYPT_ROUNDS
+    from app.extensions import db
+    from app.models.program import Program
+
+    bcrypt_rounds = bcrypt_rounds or DEFAULT_BCRYPT_ROUNDS
+    app = boot_app(database_url, bcrypt_rounds)
+    with app.app_context():
+        program_id = db.session.query(Program.id).filter_by(is_active=True).order_by(
+            Program.id
+        ).limit(1).scalar()
+        db.engine.dispose()
+
+    ctx = multiprocessing.get_context()
+    port_queue, stop_event = ctx.Queue(), ctx.Event()
+    server = ctx.Process(target=_serve, args=(database_url, bcrypt_rounds, port_queue, stop_event), daemon=True)
+    server.start()
+    try:
+        base_url = f"http://127.0.0.1:{port_queue.get(timeout=60)}"
+        start, results = ctx.Event(), ctx.Queue()
+        clients = [
+            ctx.Process(target=_client_worker, args=(
+                base_url, worker, iterations, students, program_id, tuple(scenarios), start, results
+            ))
+            for worker in range(processes)
+        ]
+        for client in clients:
+            client.start()
+
+        started = time.perf_counter()
+        start.set()
+        collected = [results.get(timeout=600) for _ in clients]
+        elapsed = time.perf_counter() - started
+        for client in clients:
+            client.join()
+    finally:
+        stop_event.set()
+        server.join(timeout=5)
+        if server.is_alive():
+            server.terminate()
+
+    summary = {}
+    for name in scenarios:
+        latencies = [value for worker_latencies, _ in collected for value in worker_latencies[name]]
+        summary[name] = dict(
+            latency_summary(latencies, elapsed),
+            errors=sum(worker_errors[name] for _, worker_errors in collected),
+        )
+    return summary
@@ -0,0 +1,124 @@
+import io
+import os
+import tempfile
+from benchmarks.harness import measure
+
+# 1x1 PNG
+PNG_BYTES = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000001e221bc330000000049454e44ae426082'
+)
+PDF_BYTES = b'%PDF-1.4\n1 0 obj << /Type /Catalog >> endobj\ntrailer << /Root 1 0 R >>\n%%EOF\n'
+
+
+def _username_generation(app):
+    from app.services.username_generator import UsernameGenerator
+    return lambda: UsernameGenerator.generate_username(role_name='Student', program_name='Web Development')
+
+
+def _permission_check(app):
+    from app.models.user import User
+    user = User.query.filter_by(email='bench0@example.com').one()
+    user.roles  # load once; the check itself is in-memory
+
+    def check():
+        user.has_role('Student')
+        user.has_permission('courses', 'read')
+        user.has_permission('financials', 'export')
+    return check
+
+
+def _user_to_dict(app):
+    from app.models.user import User
+    users = User.query.limit(20).all()
+    for user in users:
+        user.roles
+    return lambda: [user.to_dict() for user in users]
+
+
+def _load_user(with_profile):
+    """Flask-Login's per-request user load, from an empty identity map"""
+    def factory(app):
+        from app.extensions import db
+        from app.models.user import User
+        user_id = User.query.filter_by(email='bench0@example.com').one().id
+        options = [User.load_profile()] if with_profile else []
+
+        def load():
+            db.session.expunge_all()
+            return User.query.options(*options).get(user_id)
+        return load
+    return factory
+
+
+def _upload_validation(app):
+    from werkzeug.datastructures import FileStorage
+    from app.services.file_upload_service import FileUploadService
+
+    def validate():
+        FileUploadService.validate_file(FileStorage(io.BytesIO(PNG_BYTES), 'photo.png'), 'image')
+        FileUploadService.validate_file(FileStorage(io.BytesIO(PDF_BYTES), 'cv.pdf'), 'document')
+    return validate
+
+
+def _template_render(app):
+    from flask import render_template
+    from app.auth.forms import RegistrationForm
+    from app.models.program import Program
+
+    programs = Program.query.filter_by(is_active=True).all()
+
+    def render():
+        with app.test_request_context('/auth/register'):
+            form = RegistrationForm()
+            form.selected_programs.choices = [(p.id, p.name) for p in programs]
+            render_template('auth/register.html', form=form, programs=programs)
+    return render
+
+
+def _rate_limit_check(uri):
+    """One sliding-window hit, as Flask-Limiter does per request"""
+    def factory(app):
+        from app import ratelimit  # noqa: F401 - registers sqlite://
+        from limits import parse
+        from limits.storage import storage_from_string
+        from limits.strategies import SlidingWindowCounterRateLimiter
+
+        storage = storage_from_string(uri)
+        storage.reset()
+        limiter = SlidingWindowCounterRateLimiter(storage)
+        # High enough never to trip, so every call does the full write path
+        item = parse('1000000000 per minute')
+        return lambda: limiter.hit(item, 'bench', '127.0.0.1')
+    return factory
+
+
+MICRO_BENCHMARKS = {
+    'username_generation': _username_generation,
+    'permission_check': _permission_check,
+    'user_to_dict_x20': _user_to_dict,
+    'load_user': _load_user(with_profile=False),
+    'load_user_with_profile': _load_user(with_profile=True),
+    'upload_validation': _upload_validation,
+    'template_render_register': _template_render,
+    'rate_limit_memory': _rate_limit_check('memory://'),
+    'rate_limit_sqlite': _rate_limit_check(
+        'sqlite:///' + os.path.join(tempfile.gettempdir(), f'yca-bench-ratelimit-{os.getpid()}.db')
+    ),
+}
+
+
+def run_micro(app, names=None, repeat=5, min_time=0.2):
+    """
+    Run micro-benchmarks inside an app context of a seeded app
+
+    Returns:
+        dict: name -> measure() stats (seconds per call)
+    """
+    results = {}
+    with app.app_context():
+        for name, factory in MICRO_BENCHMARKS.items():
+            if names and name not in names:
+                continue
+            results[name] = measure(factory(app), repeat=repeat, min_time=min_time)
+    return results
@@ -0,0 +1,134 @@
+import multiprocessing
+import time
+from collections import Counter
+from benchmarks.harness import boot_app, latency_summary
+
+# Outside any real intake so a shared bench database is not disturbed
+YEAR = 99
+ROLE = 'Student'
+
+
+def _programs(keys):
+    """Program names for ``keys`` distinct sequences (one per program code)"""
+    from app.models.registration_sequence import RegistrationSequence
+    return list(RegistrationSequence.PROGRAM_CODES)[:keys]
+
+
+def audit_allocations(usernames, stored):
+    """
+    Check allocated usernames against the stored sequence counters
+
+    Every key's numbers must be exactly 1..current_sequence: a number handed
+    out twice is a duplicate; one the counter passed but nobody received, or
+    one beyond the counter, is a gap.
+
+    Args:
+        usernames: Usernames returned by generate_username
+        stored: {'YCA/YY/PROG/ROLE': current_sequence} after the run
+
+    Returns:
+        dict: duplicates and gaps counts
+    """
+    numbers = {}
+    for username in usernames:
+        prefix, _, number = username.rpartition('/')
+        numbers.setdefault(prefix, []).append(int(number))
+
+    duplicates = gaps = 0
+    for prefix in set(numbers) | set(stored):
+        allocated = Counter(numbers.get(prefix, ()))
+        duplicates += sum(count - 1 for count in allocated.values())
+        gaps += sum(1 for n in range(1, stored.get(prefix, 0) + 1) if n not in allocated)
+        gaps += sum(1 for n in allocated if n > stored.get(prefix, 0))
+    return {'duplicates': duplicates, 'gaps': gaps}
+
+
+def _allocator(database_url, allocations, programs, ready, start, results):
+    """One process: ``allocations`` generate_username calls, round-robin over ``programs``"""
+    app = boot_app(database_url)
+    from app.extensions import db
+    from app.services.username_generator import UsernameGenerator
+
+    usernames, latencies, errors = [], [], Counter()
+    with app.app_context():
+        ready.release()
+        start.wait()
+        for i in range(allocations):
+            started = time.perf_counter()
+            try:
+                usernames.append(UsernameGenerator.generate_username(
+                    year=YEAR, role_name=ROLE, program_name=programs[i % len(programs)]
+                ))
+            except Exception as e:
+                db.session.rollback()
+                errors[type(e).__name__] += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+        db.session.remove()
+        db.engine.dispose()
+    results.put((usernames, latencies, dict(errors)))
+
+
+def run_sequences(database_url, processes=4, allocations=50, keys=1):
+    """
+    Stress the username sequence allocator from several processes
+
+    Each of ``processes`` processes calls generate_username ``allocations``
+    times, all starting together, spread over ``keys`` sequences (1, the
+    default, is the worst case: every call contends for one row). The
+    counters are reset first and audited afterwards.
+
+    Returns:
+        dict: latency_summary() of successful allocations (``throughput`` is
+        allocations/sec) plus errors, duplicates and gaps counts
+    """
+    from app.extensions import db
+    from app.models.registration_sequence import RegistrationSequence
+
+    app = boot_app(database_url)
+    with app.app_context():
+        db.create_all()
+        RegistrationSequence.query.filter_by(year=YEAR).delete()
+        db.session.commit()
+        programs = _programs(keys)
+        db.engine.dispose()
+
+    ctx = multiprocessing.get_context()
+    ready, start, results = ctx.Semaphore(0), ctx.Event(), ctx.Queue()
+    workers = [
+        ctx.Process(target=_allocator, args=(database_url, allocations, programs, ready, start, results))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for _ in workers:
+            ready.acquire(timeout=60)
+        started = time.perf_counter()
+        start.set()
+        collected = [results.get(timeout=600) for _ in workers]
+        elapsed = time.perf_counter() - started
+    finally:
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+
+    usernames = [username for worker_usernames, _, _ in collected for username in worker_usernames]
+    errors = Counter()
+    for _, _, worker_errors in collected:
+        errors.update(worker_errors)
+
+    with app.app_context():
+        stored = {
+            f"YCA/{row.year}/{row.program_code}/{row.role_code}": row.current_sequence
+            for row in RegistrationSequence.query.filter_by(year=YEAR)
+        }
+        db.engine.dispose()
+
+    return dict(
+        latency_summary([value for _, worker_latencies, _ in collected for value in worker_latencies], elapsed),
+        errors=sum(errors.values()),
+        error_types=dict(errors),
+        **audit_allocations(usernames, stored),
+    )
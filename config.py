@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,10 +20,26 @@ class Config:
         f"{os.environ.get('DB_NAME', 'yazz_academy')}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Read replica - GET/HEAD requests to REPLICA_ROUTES (endpoints or blueprints)
+    # and use_replica() blocks read from it while its lag is under the limit
+    SQLALCHEMY_REPLICA_URI = os.environ.get('DATABASE_REPLICA_URL')
+    REPLICA_ROUTES = os.environ.get(
+        'REPLICA_ROUTES', 'marketing,dashboard.index,dashboard.courses,reports,auth.check_email'
+    )
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
+    REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get('REPLICA_LAG_CHECK_INTERVAL', 1))
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_recycle': 280,
-        'pool_pre_ping': True,
     }
+    # Pool per worker - sized from the gunicorn worker model (app/db_pool.py).
+    # DB_MAX_CONNECTIONS is this app's share of MySQL max_connections, split
+    # across the workers; DB_POOL_SIZE / DB_MAX_OVERFLOW override outright.
+    DB_POOL_SIZE = int(os.environ['DB_POOL_SIZE']) if os.environ.get('DB_POOL_SIZE') else None
+    DB_MAX_OVERFLOW = int(os.environ['DB_MAX_OVERFLOW']) if os.environ.get('DB_MAX_OVERFLOW') else None
+    DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS', 0))  # 0 = no cap
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    # Connections idle longer than this are pinged on checkout (instead of every checkout)
+    DB_POOL_PING_IDLE_SECONDS = float(os.environ.get('DB_POOL_PING_IDLE_SECONDS', 30))
     
     # File Upload Configuration
     MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
@@ -50,11 +67,91 @@ class Config:
     REMEMBER_COOKIE_HTTPONLY = True
     
     # Rate Limiting - FIXED: Use string format
+    # Counters live in one WAL-mode SQLite file (on tmpfs where available) so
+    # every gunicorn worker on the host enforces the same limit.
+    # memory:// keeps them per process; redis:// etc. for multi-host setups.
     RATELIMIT_ENABLED = True
-    RATELIMIT_STORAGE_URL = os.environ.get('RATE_LIMIT_STORAGE_URL', 'memory://')
-    RATELIMIT_STRATEGY = 'fixed-window'
+    RATELIMIT_STORAGE_URI = os.environ.get(
+        'RATE_LIMIT_STORAGE_URL',
+        'sqlite:///' + os.path.join('/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+                                    'yca-ratelimit.db')
+    )
+    RATELIMIT_STRATEGY = os.environ.get('RATE_LIMIT_STRATEGY', 'sliding-window-counter')
     RATELIMIT_DEFAULT = "200 per day, 50 per hour"  # FIX: Changed from tuple to string
     
+    # Templates - compiled bytecode shared by all workers on the host
+    JINJA_BYTECODE_CACHE = os.environ.get('JINJA_BYTECODE_CACHE', 'true').lower() == 'true'
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get('JINJA_BYTECODE_CACHE_DIR')  # None = Jinja's per-user temp dir
+    PRECOMPILE_TEMPLATES = os.environ.get('PRECOMPILE_TEMPLATES', 'true').lower() == 'true'
+    
+    # Caching - per-process LRU in front of a shared tier
+    # CACHE_SHARED_URL: sqlite:////path/cache.db (single host) or redis://host:6379/0
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', 300))
+    CACHE_SHARED_URL = os.environ.get(
+        'CACHE_SHARED_URL', 'sqlite:///' + os.path.join(basedir, 'instance', 'cache.db')
+    )
+    CACHE_KEY_PREFIX = os.environ.get('CACHE_KEY_PREFIX', 'yca:')
+    CACHE_LOCAL_MAX_ENTRIES = int(os.environ.get('CACHE_LOCAL_MAX_ENTRIES', 1024))
+    CACHE_LOCAL_TTL = int(os.environ.get('CACHE_LOCAL_TTL', 30))  # cap for tier-1 copies
+    CACHE_TAG_VERSION_TTL = float(os.environ.get('CACHE_TAG_VERSION_TTL', 1.0))
+    CACHE_LOCK_TIMEOUT = int(os.environ.get('CACHE_LOCK_TIMEOUT', 10))
+    CACHE_EARLY_REFRESH_BETA = float(os.environ.get('CACHE_EARLY_REFRESH_BETA', 1.0))
+    FRAGMENT_CACHE_ENABLED = os.environ.get('FRAGMENT_CACHE_ENABLED', 'true').lower() == 'true'
+    FRAGMENT_CACHE_TTL = int(os.environ.get('FRAGMENT_CACHE_TTL', 600))
+    
+    # SQL instrumentation - per-request query counts, slow queries, N+1 warnings.
+    # Off means no engine listeners at all.
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'false').lower() == 'true'
+    SQL_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS', 100))
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', 5))
+    SQL_STACK_DEPTH = int(os.environ.get('SQL_STACK_DEPTH', 4))
+    SQL_QUERY_BUDGET_RAISE = False  # query_budget overruns only log outside tests
+    # EXPLAIN each new query shape and log full scans with a proposed index (dev only)
+    SQL_INDEX_ADVISOR = os.environ.get('SQL_INDEX_ADVISOR', 'false').lower() == 'true'
+    
+    # SocketIO is only initialized when enabled (serve it with eventlet workers)
+    SOCKETIO_ENABLED = os.environ.get('SOCKETIO_ENABLED', 'false').lower() == 'true'
+    
+    # Metrics - Prometheus exposition at /metrics. Under gunicorn set
+    # METRICS_MULTIPROC_DIR so every worker's samples are summed.
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR') or os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    METRICS_AUTH_TOKEN = os.environ.get('METRICS_AUTH_TOKEN')  # bearer token for scrapes; required outside debug
+    METRICS_NAMESPACE = 'yca'
+    
+    # Profiling - sampled stacks for chosen endpoints (`flask profile-merge`).
+    # Off means no request hooks at all.
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_ENDPOINTS = [e.strip() for e in os.environ.get('PROFILING_ENDPOINTS', '').split(',') if e.strip()]
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0.01))  # share of requests
+    PROFILING_INTERVAL_MS = float(os.environ.get('PROFILING_INTERVAL_MS', 5))
+    PROFILING_TOKEN_MAX_AGE = int(os.environ.get('PROFILING_TOKEN_MAX_AGE', 3600))
+    PROFILING_DIR = os.environ.get('PROFILING_DIR') or os.path.join(basedir, 'profiles')
+    
+    # Admission control - host-wide concurrency caps for expensive endpoints.
+    # Over the cap a request queues for up to the class's timeout, then gets
+    # 503 + Retry-After. Unlisted endpoints (marketing, static, /metrics) are
+    # never held back. Under sync/gthread gunicorn workers the caps (and
+    # their sum) are clamped to one below the worker count and the queue is
+    # dropped, so a worker always stays free for them.
+    ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', 'true').lower() == 'true'
+    # <endpoint or blueprint>=<class>; an endpoint entry beats its blueprint
+    ADMISSION_ROUTES = os.environ.get(
+        'ADMISSION_ROUTES',
+        'auth.login=auth,auth.register=auth,auth.forgot_password=auth,'
+        'auth.reset_password=auth,auth.change_password=auth,reports=reports'
+    )
+    # <class>=<max concurrency>:<queue timeout ms>:<target latency ms>[:<methods>]
+    # methods are +-separated and default to POST, so auth form GETs never queue
+    ADMISSION_CLASSES = os.environ.get('ADMISSION_CLASSES', 'auth=3:500:1500:POST,reports=2:250:10000:GET')
+    ADMISSION_LOCK_DIR = os.environ.get('ADMISSION_LOCK_DIR') or os.path.join(
+        '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(), 'yca-admission'
+    )
+    
+    # Analytics - daily registration rollups (`flask rollup-registrations` from cron)
+    ANALYTICS_ROLLUP_SETTLE_SECONDS = int(os.environ.get('ANALYTICS_ROLLUP_SETTLE_SECONDS', 120))
+    ANALYTICS_ROLLUP_BATCH_SIZE = int(os.environ.get('ANALYTICS_ROLLUP_BATCH_SIZE', 5000))
+    
     # Application URLs
     APP_URL = os.environ.get('APP_URL', 'http://localhost:5000')
     API_URL = os.environ.get('API_URL', 'http://localhost:5000/api/v1')
@@ -63,6 +160,8 @@ class Config:
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_ECHO = True
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'true').lower() == 'true'
+    SQL_INDEX_ADVISOR = os.environ.get('SQL_INDEX_ADVISOR', 'true').lower() == 'true'
     # Use more permissive limits in development
     RATELIMIT_DEFAULT = "500 per day, 100 per hour"
 
@@ -70,13 +169,26 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_REPLICA_URI = None
     WTF_CSRF_ENABLED = False
     RATELIMIT_ENABLED = False  # Disable rate limiting for tests
+    RATELIMIT_STORAGE_URI = 'memory://'
+    JINJA_BYTECODE_CACHE = False
+    PRECOMPILE_TEMPLATES = False
+    CACHE_SHARED_URL = None  # per-process tier only
+    ANALYTICS_ROLLUP_SETTLE_SECONDS = 0
+    SQL_QUERY_BUDGET_RAISE = True
+    METRICS_ENABLED = False
+    ADMISSION_ENABLED = False
+    BCRYPT_LOG_ROUNDS = 4  # the minimum; hashing cost is not under test
+    MAIL_SUPPRESS_SEND = True  # capture with mail.record_messages() instead
 
 
 class ProductionConfig(Config):
     DEBUG = False
     SQLALCHEMY_ECHO = False
+    CACHE_SHARED_URL = (os.environ.get('CACHE_SHARED_URL') or os.environ.get('REDIS_URL')
+                        or Config.CACHE_SHARED_URL)
 
 
 config = {
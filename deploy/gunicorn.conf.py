@@ -0,0 +1,145 @@
+"""
+Gunicorn configuration for Yazz Academy LMS
+
+Usage: gunicorn -c deploy/gunicorn.conf.py wsgi:app
+
+Production profile: the app is imported once in the master (preload) and
+shared copy-on-write by the workers; each worker drops the inherited DB
+pool after fork and warms up before accepting requests. Every setting can
+be overridden with the GUNICORN_* variables below.
+"""
+import os
+import shutil
+
+
+def _env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() == 'true'
+
+
+def _cpu_count():
+    # Respect container / taskset CPU limits where the platform exposes them
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Worker class: SocketIO needs eventlet (one worker per process group, or a
+# SOCKETIO_MESSAGE_QUEUE to fan out between several); plain HTTP uses sync,
+# or gthread when GUNICORN_THREADS > 1
+socketio_enabled = _env_bool('SOCKETIO_ENABLED', False)
+threads = int(os.environ.get('GUNICORN_THREADS') or 1)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS') or (
+    'eventlet' if socketio_enabled else ('gthread' if threads > 1 else 'sync')
+)
+
+if os.environ.get('GUNICORN_WORKERS'):
+    workers = int(os.environ['GUNICORN_WORKERS'])
+elif worker_class == 'eventlet':
+    workers = 1 if not os.environ.get('SOCKETIO_MESSAGE_QUEUE') else _cpu_count()
+else:
+    # (2 x cores) + 1, capped so small-memory hosts do not swap
+    workers = min(2 * _cpu_count() + 1, int(os.environ.get('GUNICORN_MAX_WORKERS', 8)))
+
+# The app sizes each worker's DB pool from the resolved worker model (app/db_pool.py)
+os.environ['GUNICORN_WORKER_CLASS'] = worker_class
+os.environ['GUNICORN_THREADS'] = str(threads)
+os.environ['GUNICORN_WORKERS'] = str(workers)
+
+# eventlet must monkey-patch before the app is imported, which happens in the
+# worker, so preloading only applies to sync/gthread workers
+preload_app = _env_bool('GUNICORN_PRELOAD', True) and worker_class != 'eventlet'
+
+# Recycle workers to bound slow leaks; jitter stops them restarting together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+worker_tmp_dir = os.environ.get('GUNICORN_WORKER_TMP_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.environ.get('GUNICORN_ERROR_LOG', '-')
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+# Shared directory where every worker writes its metric samples; exported
+# before the app (and prometheus_client) is imported
+metrics_dir = os.environ.get('METRICS_MULTIPROC_DIR', '/tmp/yca-metrics')
+os.environ.setdefault('METRICS_MULTIPROC_DIR', metrics_dir)
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', metrics_dir)
+
+
+def _flask_app(wsgi):
+    """The Flask app behind whatever wsgi.py exported"""
+    return wsgi if hasattr(wsgi, 'app_context') else None
+
+
+def on_starting(server):
+    """Start each deploy with an empty metrics directory"""
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def when_ready(server):
+    """
+    Preloaded app: warm what every worker can share, then drop DB connections
+
+    Runs in the master before the first fork, so compiled templates and
+    configured mappers are inherited copy-on-write.
+    """
+    if not preload_app:
+        return
+    app = _flask_app(server.app.wsgi())
+    if app is None:
+        return
+
+    from app.replica import app_engines
+    from app.warmup import warm_shared
+
+    timings = warm_shared(app)
+    for engine in app_engines(app):
+        engine.dispose()
+    server.log.info("Master warmed up before fork: %s", timings)
+
+
+def post_fork(server, worker):
+    """
+    Never share pooled DB connections with the parent
+
+    ``dispose(close=False)`` gives the worker a fresh pool without closing
+    the sockets the master (or a sibling) may still be using.
+    """
+    app = _flask_app(server.app.wsgi()) if preload_app else None
+    if app is None:
+        return
+
+    from app.replica import app_engines
+
+    for engine in app_engines(app):
+        engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Warm the worker (templates, DB pool, RBAC, caches) before it accepts requests"""
+    app = _flask_app(worker.wsgi)
+    if app is None:
+        return
+
+    from app.warmup import warm_shared, warm_worker
+
+    # Preloaded workers inherited the shared warmup from the master
+    timings = {} if preload_app else warm_shared(app)
+    timings.update(warm_worker(app))
+    worker.log.info("Worker %s warmed up: %s", worker.pid, timings)
+
+
+def child_exit(server, worker):
+    """Drop live gauges (in-flight requests, queues) of a worker that exited"""
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid, metrics_dir)
@@ -0,0 +1,58 @@
+"""Add stats counters
+
+Revision ID: 3f6c1d2a9b10
+Revises: 21bf0943c662
+Create Date: 2026-10-19 09:12:40.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6c1d2a9b10'
+down_revision = '21bf0943c662'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stats_counters',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    _seed_counters()
+
+
+def _seed_counters():
+    """Count the existing rows so the dashboard is right straight after deploy"""
+    counters = sa.table('stats_counters', sa.column('name'), sa.column('value'), sa.column('updated_at'))
+    users = sa.table('users', sa.column('id'), sa.column('is_active'))
+    programs = sa.table('programs', sa.column('id'), sa.column('is_active'))
+    roles = sa.table('roles', sa.column('id'))
+    user_roles = sa.table('user_roles', sa.column('user_id'), sa.column('role_id'))
+    now = sa.func.current_timestamp()
+
+    def seed(select):
+        op.execute(counters.insert().from_select(['name', 'value', 'updated_at'], select))
+
+    # NULL is_active means the column default (active), as in StatsService.compute_actual
+    for prefix, table in (('users', users), ('programs', programs)):
+        seed(sa.select(sa.literal(f'{prefix}.total'), sa.func.count(table.c.id), now))
+        seed(sa.select(sa.literal(f'{prefix}.active'), sa.func.count(table.c.id), now)
+             .where(sa.or_(table.c.is_active.is_(None), table.c.is_active == sa.true())))
+    seed(
+        sa.select(
+            sa.literal('roles.') + sa.cast(roles.c.id, sa.String(20)) + sa.literal('.users'),
+            sa.func.count(user_roles.c.user_id),
+            now,
+        )
+        .select_from(roles.outerjoin(user_roles, user_roles.c.role_id == roles.c.id))
+        .group_by(roles.c.id)
+    )
+
+
+def downgrade():
+    op.drop_table('stats_counters')
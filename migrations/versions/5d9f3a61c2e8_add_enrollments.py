@@ -0,0 +1,41 @@
+"""Add enrollments
+
+Revision ID: 5d9f3a61c2e8
+Revises: c41e8b27d5a6
+Create Date: 2026-10-19 12:05:31.627490
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d9f3a61c2e8'
+down_revision = 'c41e8b27d5a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('enrollments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('program_id', sa.Integer(), nullable=False),
+    sa.Column('cohort', sa.String(length=20), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['program_id'], ['programs.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'program_id', name='uq_enrollments_user_program')
+    )
+    op.create_index('ix_enrollments_program_status_user', 'enrollments', ['program_id', 'status', 'user_id'], unique=False)
+    op.create_index('ix_enrollments_program_cohort_status', 'enrollments', ['program_id', 'cohort', 'status'], unique=False)
+    # Existing selections are copied by `flask backfill-enrollments` (chunked, re-runnable)
+
+
+def downgrade():
+    op.drop_index('ix_enrollments_program_cohort_status', table_name='enrollments')
+    op.drop_index('ix_enrollments_program_status_user', table_name='enrollments')
+    op.drop_table('enrollments')
@@ -0,0 +1,32 @@
+"""Add user directory indexes
+
+Revision ID: 7a2e4c9d1f35
+Revises: 3f6c1d2a9b10
+Create Date: 2026-10-19 10:03:17.482919
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2e4c9d1f35'
+down_revision = '3f6c1d2a9b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_users_state_created_at', 'users', ['state', 'created_at', 'id'], unique=False)
+    op.create_index('ix_users_active_created_at', 'users', ['is_active', 'created_at', 'id'], unique=False)
+    op.create_index('ix_users_verified_created_at', 'users', ['email_verified', 'created_at', 'id'], unique=False)
+    op.create_index('ix_user_roles_role_id_user_id', 'user_roles', ['role_id', 'user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_user_roles_role_id_user_id', table_name='user_roles')
+    op.drop_index('ix_users_verified_created_at', table_name='users')
+    op.drop_index('ix_users_active_created_at', table_name='users')
+    op.drop_index('ix_users_state_created_at', table_name='users')
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -0,0 +1,62 @@
+"""Add cohorts and waitlist
+
+Revision ID: 8b3e1f0a7c42
+Revises: 5d9f3a61c2e8
+Create Date: 2026-10-19 13:02:48.915034
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b3e1f0a7c42'
+down_revision = '5d9f3a61c2e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cohorts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('program_id', sa.Integer(), nullable=False),
+    sa.Column('code', sa.String(length=10), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=True),
+    sa.Column('starts_on', sa.Date(), nullable=True),
+    sa.Column('ends_on', sa.Date(), nullable=True),
+    sa.Column('capacity', sa.Integer(), nullable=False),
+    sa.Column('seats_available', sa.Integer(), nullable=False),
+    sa.Column('is_open', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint('seats_available >= 0', name='ck_cohorts_seats_nonnegative'),
+    sa.CheckConstraint('seats_available <= capacity', name='ck_cohorts_seats_within_capacity'),
+    sa.ForeignKeyConstraint(['program_id'], ['programs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('program_id', 'code', name='uq_cohorts_program_code')
+    )
+    op.create_table('cohort_waitlist',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cohort_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['cohort_id'], ['cohorts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cohort_id', 'user_id', name='uq_cohort_waitlist_user')
+    )
+    op.create_index('ix_cohort_waitlist_cohort_id_id', 'cohort_waitlist', ['cohort_id', 'id'], unique=False)
+    with op.batch_alter_table('enrollments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cohort_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_enrollments_cohort_id', 'cohorts', ['cohort_id'], ['id'], ondelete='SET NULL')
+        batch_op.create_index('ix_enrollments_cohort_id_user', ['cohort_id', 'user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('enrollments', schema=None) as batch_op:
+        batch_op.drop_index('ix_enrollments_cohort_id_user')
+        batch_op.drop_constraint('fk_enrollments_cohort_id', type_='foreignkey')
+        batch_op.drop_column('cohort_id')
+    op.drop_index('ix_cohort_waitlist_cohort_id_id', table_name='cohort_waitlist')
+    op.drop_table('cohort_waitlist')
+    op.drop_table('cohorts')
@@ -0,0 +1,43 @@
+"""Add registration rollups
+
+Revision ID: c41e8b27d5a6
+Revises: 7a2e4c9d1f35
+Create Date: 2026-10-19 11:20:54.306117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e8b27d5a6'
+down_revision = '7a2e4c9d1f35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('registration_daily_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('program_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('state', sa.String(length=100), nullable=False),
+    sa.Column('gender', sa.String(length=10), nullable=False),
+    sa.Column('signups', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('day', 'program_id', 'state', 'gender')
+    )
+    op.create_index('ix_registration_rollups_program_day', 'registration_daily_rollups', ['program_id', 'day'], unique=False)
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('last_created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Rollups start empty; run `flask rollup-registrations --rebuild` once after upgrading
+
+
+def downgrade():
+    op.drop_table('rollup_watermarks')
+    op.drop_index('ix_registration_rollups_program_day', table_name='registration_daily_rollups')
+    op.drop_table('registration_daily_rollups')
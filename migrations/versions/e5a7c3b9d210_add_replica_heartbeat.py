@@ -0,0 +1,28 @@
+"""Add replica heartbeat
+
+Revision ID: e5a7c3b9d210
+Revises: 8b3e1f0a7c42
+Create Date: 2026-10-19 15:41:07.230518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a7c3b9d210'
+down_revision = '8b3e1f0a7c42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('replica_heartbeat',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('beat_ms', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('replica_heartbeat')
@@ -0,0 +1,30 @@
+"""Add hot path indexes
+
+Revision ID: f2c8d4e6a913
+Revises: e5a7c3b9d210
+Create Date: 2026-10-19 16:27:51.604182
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c8d4e6a913'
+down_revision = 'e5a7c3b9d210'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_programs_active_category', 'programs', ['is_active', 'category'], unique=False)
+    op.create_index('ix_programs_featured_active', 'programs', ['is_featured', 'is_active'], unique=False)
+    op.create_index('ix_users_deleted_created_at', 'users', ['deleted_at', 'created_at', 'id'], unique=False)
+    op.create_index('ix_users_email_verification_token', 'users', ['email_verification_token'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_email_verification_token', table_name='users')
+    op.drop_index('ix_users_deleted_created_at', table_name='users')
+    op.drop_index('ix_programs_featured_active', table_name='programs')
+    op.drop_index('ix_programs_active_category', table_name='programs')
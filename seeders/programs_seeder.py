@@ -1,8 +1,17 @@
 from app.extensions import db
 from app.models.program import Program
+from seeders.upsert import bulk_upsert, summary
 
 def seed_programs():
-    """Seed initial programs from the catalogue"""
+    """
+    Seed initial programs from the catalogue
+
+    Idempotent: re-running updates prices, descriptions and outcomes that
+    changed here; programs added through the admin are left alone.
+
+    Returns:
+        dict: inserted, updated and unchanged counts
+    """
     programs_data = [
         # Tech & Digital Skills
         {
@@ -197,11 +206,10 @@ def seed_programs():
         }
     ]
     
-    for program_data in programs_data:
-        program = Program.query.filter_by(code=program_data['code']).first()
-        if not program:
-            program = Program(**program_data)
-            db.session.add(program)
-    
+    counts = bulk_upsert(Program, programs_data, key='code')
+    if counts['inserted'] or counts['updated']:
+        # Core statements skip the ORM events that invalidate the catalog cache
+        db.session.info['catalog_changed'] = True
     db.session.commit()
-    print(f"✓ Seeded {len(programs_data)} programs")
\ No newline at end of file
+    print(f"✓ Seeded programs: {summary(counts)}")
+    return counts
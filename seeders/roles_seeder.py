@@ -1,8 +1,17 @@
 from app.extensions import db
 from app.models.role import Role
+from seeders.upsert import bulk_upsert, summary
 
 def seed_roles():
-    """Seed initial roles with permissions"""
+    """
+    Seed initial roles with permissions
+
+    Idempotent: re-running updates descriptions and permissions that changed
+    here and leaves the other roles alone.
+
+    Returns:
+        dict: inserted, updated and unchanged counts
+    """
     roles_data = [
         {
             'name': 'System Admin',
@@ -71,15 +80,7 @@ def seed_roles():
         }
     ]
     
-    for role_data in roles_data:
-        role = Role.query.filter_by(name=role_data['name']).first()
-        if not role:
-            role = Role(
-                name=role_data['name'],
-                description=role_data['description'],
-                permissions=role_data.get('permissions', {})
-            )
-            db.session.add(role)
-    
+    counts = bulk_upsert(Role, roles_data, key='name')
     db.session.commit()
-    print(f"✓ Seeded {len(roles_data)} roles")
\ No newline at end of file
+    print(f"✓ Seeded roles: {summary(counts)}")
+    return counts
@@ -0,0 +1,335 @@
+"""
+Synthetic users, enrollments and registration sequences for load tests
+
+Sized for hardware planning (a million users in minutes), so the per-row
+work is kept to random.choices over pools: Faker fills the name, street and
+bio pools once per process, passwords are hashed once for a small pool, and
+rows are bulk-loaded with executemany (which PyMySQL folds into multi-row
+INSERTs). Users get explicit ids above the current maximum, so workers can
+write user_roles and enrollments without reading anything back. Run it
+against an idle database: a registration made meanwhile could take an id
+the generator has planned.
+"""
+import os
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from operator import itemgetter
+from sqlalchemy import create_engine, func, select
+from app.extensions import bcrypt, db
+from app.models.enrollment import Enrollment
+from app.models.program import Program
+from app.models.registration_sequence import RegistrationSequence
+from app.models.role import Role
+from app.models.user import User
+from app.models.user_roles import user_roles
+from seeders.upsert import bulk_upsert
+
+# Every generated user's password is one of these (see pool_password)
+PASSWORD_POOL_SIZE = 16
+
+# Role mix of a training academy: mostly students
+ROLE_WEIGHTS = {
+    'Student': 960, 'Teacher': 25, 'Guest': 8, 'Registrar': 2, 'Secretary': 2,
+    'Financial Secretary': 1, 'Logistic Manager': 1, 'Head of School': 1,
+}
+STAFF_PROGRAM_CODES = {'Head of School': 'ADM', 'Secretary': 'ADM', 'Registrar': 'ADM',
+                       'Financial Secretary': 'ADM', 'Logistic Manager': 'ADM'}
+GENDER_WEIGHTS = {'Male': 49, 'Female': 49, 'Other': 2}
+# Most students come from the FCT and the states around it
+STATE_WEIGHTS = {
+    'FCT': 35, 'Lagos': 12, 'Nasarawa': 7, 'Niger': 6, 'Kaduna': 6, 'Kogi': 5, 'Plateau': 4,
+    'Kano': 4, 'Rivers': 3, 'Oyo': 3, 'Enugu': 3, 'Benue': 3, 'Delta': 3, 'Edo': 3, 'Ogun': 3,
+}
+# Programs per student
+ENROLLMENT_COUNT_WEIGHTS = {1: 70, 2: 22, 3: 8}
+
+_pools = None
+
+
+def pool_password(n):
+    """Plain-text password of pool slot ``n`` (user id modulo PASSWORD_POOL_SIZE)"""
+    return f'Loadtest@{n:02d}'
+
+
+def password_hashes():
+    """Hash the password pool once; users share the hashes"""
+    return [bcrypt.generate_password_hash(pool_password(n)).decode('utf-8') for n in range(PASSWORD_POOL_SIZE)]
+
+
+def _value_pools(seed):
+    """Faker output drawn once per process and reused for every row"""
+    global _pools
+    if _pools is None:
+        from faker import Faker
+        fake = Faker('en_NG')
+        fake.seed_instance(seed)
+        _pools = {
+            'first_names': list({fake.first_name() for _ in range(600)}),
+            'last_names': list({fake.last_name() for _ in range(600)}),
+            'streets': [fake.street_address() for _ in range(1000)],
+            'cities': [fake.city() for _ in range(200)],
+            'bios': [fake.paragraph(nb_sentences=5) for _ in range(300)],
+            'institutions': [f'University of {fake.city()}' for _ in range(40)],
+            'degrees': ['B.Sc. Computer Science', 'B.Sc. Mathematics', 'B.A. English', 'HND Accounting',
+                        'OND Electrical Engineering', 'WAEC SSCE', 'NECO SSCE', 'B.Eng. Civil Engineering'],
+        }
+    return _pools
+
+
+def plan_users(count, programs, roles, sequences, years=3, seed=0, now=None):
+    """
+    Decide role, main program, registration time and username for each user
+
+    Done up front in one process because usernames need per-key sequence
+    numbers (YCA/YY/PROG/ROLE/SEQ) that workers could not agree on.
+
+    Args:
+        count: Users to plan
+        programs: list of (id, code)
+        roles: dict of role name -> id
+        sequences: dict of (year, role_code, program_code, cohort) -> current
+            sequence; advanced in place
+        years: Registrations are spread over this many years, growing
+            towards the present
+        seed: Random seed
+
+    Returns:
+        list: (created_at, role_id, program_id, username) tuples in
+        registration order
+    """
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    span_seconds = years * 365 * 86400
+    role_names = [name for name in ROLE_WEIGHTS if name in roles]
+    role_draws = rng.choices(role_names, weights=[ROLE_WEIGHTS[name] for name in role_names], k=count)
+    # Zipf-like popularity in catalogue order
+    program_draws = rng.choices(programs, weights=[1 / (rank + 1) for rank in range(len(programs))], k=count)
+    ages = sorted((span_seconds * (1 - rng.triangular(0, 1, 1)) for _ in range(count)), reverse=True)
+
+    planned = []
+    for age, role_name, (program_id, program_code) in zip(ages, role_draws, program_draws):
+        created_at = now - timedelta(seconds=age)
+        year = created_at.year % 100
+        role_code = RegistrationSequence.ROLE_CODES[role_name]
+        code = STAFF_PROGRAM_CODES.get(role_name, program_code)
+        key = (year, role_code, code, 'A')
+        sequences[key] = sequences.get(key, 0) + 1
+        planned.append((created_at, roles[role_name], program_id,
+                        f"YCA/{year}/{code}/{role_code}/{str(sequences[key]).zfill(4)}"))
+    return planned
+
+
+def build_rows(first_id, planned, program_ids, student_role_id, hashes, seed=0, now=None):
+    """
+    users, user_roles and enrollments rows for a slice of the plan
+
+    Returns:
+        tuple: (users, user_roles, enrollments) lists of dicts
+    """
+    rng = random.Random(seed)
+    pools = _value_pools(seed)
+    now = now or datetime.utcnow()
+    choice = rng.choice
+    states, state_weights = list(STATE_WEIGHTS), list(STATE_WEIGHTS.values())
+    genders, gender_weights = list(GENDER_WEIGHTS), list(GENDER_WEIGHTS.values())
+    counts, count_weights = list(ENROLLMENT_COUNT_WEIGHTS), list(ENROLLMENT_COUNT_WEIGHTS.values())
+
+    users, roles, enrollments = [], [], []
+    for offset, (created_at, role_id, program_id, username) in enumerate(planned):
+        user_id = first_id + offset
+        first_name, surname = choice(pools['first_names']), choice(pools['last_names'])
+        handle = f'{first_name}{surname}{user_id}'.lower()
+        verified = rng.random() < 0.85
+        logged_in = verified and rng.random() < 0.8
+        users.append({
+            'id': user_id,
+            'username': username,
+            'email': f'{first_name}.{surname}.{user_id}@example.com'.lower(),
+            'phone': f'+23480{rng.randrange(10**8):08d}',
+            'surname': surname,
+            'first_name': first_name,
+            'middle_name': choice(pools['first_names']) if rng.random() < 0.4 else None,
+            'gender': rng.choices(genders, gender_weights)[0],
+            'address': f"{choice(pools['streets'])}, {choice(pools['cities'])}",
+            'state': rng.choices(states, state_weights)[0],
+            'country': 'Nigeria',
+            'facebook_handle': handle if rng.random() < 0.3 else None,
+            'twitter_handle': handle if rng.random() < 0.25 else None,
+            'github_handle': handle if rng.random() < 0.2 else None,
+            'linkedin_handle': handle if rng.random() < 0.3 else None,
+            'photo_path': f'photos/{user_id}.jpg' if rng.random() < 0.6 else None,
+            'resume_path': f'resumes/{user_id}.pdf' if rng.random() < 0.3 else None,
+            'bio': choice(pools['bios']) if rng.random() < 0.4 else None,
+            'qualifications': [{'institution': choice(pools['institutions']),
+                                'qualification': choice(pools['degrees']),
+                                'year': created_at.year - rng.randrange(0, 8)}],
+            'selected_programs': [program_id],
+            'password_hash': hashes[user_id % len(hashes)],
+            'is_active': rng.random() < 0.95,
+            'email_verified': verified,
+            'email_verified_at': created_at + timedelta(minutes=rng.randrange(5, 2880)) if verified else None,
+            'last_login': created_at + (now - created_at) * rng.random() if logged_in else None,
+            'login_count': rng.randrange(1, 200) if logged_in else 0,
+            'created_at': created_at,
+            'updated_at': created_at,
+            'deleted_at': now - (now - created_at) * rng.random() if rng.random() < 0.01 else None,
+        })
+        roles.append({'user_id': user_id, 'role_id': role_id, 'assigned_at': created_at})
+
+        if role_id != student_role_id:
+            continue
+        chosen = [program_id] + rng.sample(program_ids, rng.choices(counts, count_weights)[0] - 1)
+        weeks_ago = (now - created_at).days / 7
+        for enrolled in dict.fromkeys(chosen):
+            if weeks_ago < 2:
+                status = Enrollment.STATUS_PENDING
+            elif weeks_ago < 14:
+                status = Enrollment.STATUS_ACTIVE if rng.random() < 0.92 else Enrollment.STATUS_WITHDRAWN
+            else:
+                status = rng.choices((Enrollment.STATUS_COMPLETED, Enrollment.STATUS_WITHDRAWN,
+                                      Enrollment.STATUS_ACTIVE), (75, 10, 15))[0]
+            enrollments.append({
+                'user_id': user_id, 'program_id': enrolled, 'status': status,
+                'cohort': f'{created_at.year}{"AB"[created_at.month > 6]}',
+                'created_at': created_at, 'updated_at': created_at,
+            })
+    return users, roles, enrollments
+
+
+def _insert_many(connection, table, rows, batch_size):
+    """
+    executemany INSERT with the statement compiled once
+
+    Binds each column's type processor (JSON, DateTime) directly, which
+    skips SQLAlchemy's per-row parameter construction: that, not the driver,
+    was most of the load time. Every row must have the first row's keys.
+    """
+    if not rows:
+        return
+    dialect = connection.dialect
+    columns = list(rows[0])
+    compiled = table.insert().compile(dialect=dialect, column_keys=columns)
+    names = compiled.positiontup if compiled.positional else list(compiled.params)
+    # The compiled INSERT also binds the Python-side defaults of the other columns
+    defaults = {}
+    for name in names:
+        default = table.c[name].default
+        if name not in rows[0] and default is not None:
+            defaults[name] = default.arg(None) if default.is_callable else default.arg
+    fetch = itemgetter(*names)
+    processors = [
+        (index, processor) for index, processor in
+        enumerate(table.c[name].type._cached_bind_processor(dialect) for name in names) if processor
+    ]
+    for start in range(0, len(rows), batch_size):
+        params = []
+        for row in rows[start:start + batch_size]:
+            values = list(fetch({**defaults, **row} if defaults else row))
+            for index, processor in processors:
+                if values[index] is not None:
+                    values[index] = processor(values[index])
+            params.append(tuple(values))
+        if not compiled.positional:
+            params = [dict(zip(names, values)) for values in params]
+        connection.exec_driver_sql(compiled.string, params)
+
+
+def load_rows(connection, users, roles, enrollments, batch_size=1000):
+    """Insert the rows in executemany batches on ``connection``"""
+    for table, rows in ((User.__table__, users), (user_roles, roles), (Enrollment.__table__, enrollments)):
+        _insert_many(connection, table, rows, batch_size)
+
+
+def _load_chunk(task):
+    """Worker: build and load one chunk in its own transaction"""
+    uri, first_id, planned, program_ids, student_role_id, hashes, seed, batch_size = task
+    engine = create_engine(uri, connect_args={'timeout': 60} if uri.startswith('sqlite') else {})
+    try:
+        users, roles, enrollments = build_rows(first_id, planned, program_ids, student_role_id, hashes, seed)
+        with engine.begin() as connection:
+            load_rows(connection, users, roles, enrollments, batch_size)
+    finally:
+        engine.dispose()
+    return len(users), len(roles), len(enrollments)
+
+
+def generate(count, processes=None, chunk_size=10000, batch_size=1000, years=3, seed=0, progress=None):
+    """
+    Generate ``count`` users with their roles and enrollments
+
+    Roles and programs must be seeded first. Chunks of ``chunk_size`` users
+    are built and loaded by ``processes`` worker processes (in-process for
+    an in-memory SQLite database); registration sequences are advanced past
+    the generated usernames at the end.
+
+    Args:
+        progress: Optional callable(users_done, users_total)
+
+    Returns:
+        dict: row counts per table, seconds and rows per second
+    """
+    started = time.perf_counter()
+    programs = [(row.id, row.code) for row in db.session.execute(select(Program.id, Program.code).order_by(Program.id))]
+    roles = dict(db.session.execute(select(Role.name, Role.id)).all())
+    if not programs or 'Student' not in roles:
+        raise ValueError('Seed roles and programs first (flask seed-db)')
+
+    first_id = (db.session.execute(select(func.max(User.id))).scalar() or 0) + 1
+    sequence_table = RegistrationSequence.__table__
+    sequences = {
+        (row.year, row.role_code, row.program_code, row.cohort): row.current_sequence
+        for row in db.session.execute(select(sequence_table))
+    }
+    planned = plan_users(count, programs, roles, sequences, years=years, seed=seed)
+    hashes = password_hashes()
+    db.session.commit()  # release the read transaction before the workers write
+
+    program_ids = [program_id for program_id, _ in programs]
+    tasks = [
+        (first_id + start, planned[start:start + chunk_size], program_ids, roles['Student'], hashes,
+         seed + start, batch_size)
+        for start in range(0, count, chunk_size)
+    ]
+    totals = Counter()
+    url = db.engine.url
+    in_memory = url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+    processes = 1 if in_memory else (processes or os.cpu_count() or 1)
+
+    def done(counts):
+        totals.update(dict(zip(('users', 'user_roles', 'enrollments'), counts)))
+        if progress:
+            progress(totals['users'], count)
+
+    if processes == 1:
+        with db.engine.begin() as connection:
+            for first, chunk, _, student_role_id, _, chunk_seed, _ in tasks:
+                rows = build_rows(first, chunk, program_ids, student_role_id, hashes, chunk_seed)
+                load_rows(connection, *rows, batch_size=batch_size)
+                done(tuple(len(part) for part in rows))
+    else:
+        uri = url.render_as_string(hide_password=False)
+        with get_context().Pool(processes) as pool:
+            for counts in pool.imap_unordered(_load_chunk, [(uri, *task) for task in tasks]):
+                done(counts)
+
+    bulk_upsert(
+        RegistrationSequence,
+        [dict(zip(('year', 'role_code', 'program_code', 'cohort'), key), current_sequence=value)
+         for key, value in sequences.items()],
+        key=('year', 'role_code', 'program_code', 'cohort'),
+    )
+    db.session.commit()
+
+    seconds = time.perf_counter() - started
+    rows = sum(totals.values())
+    return {
+        **totals,
+        'sequences': len(sequences),
+        'processes': processes,
+        'seconds': seconds,
+        'users_per_second': totals['users'] / seconds if seconds else 0.0,
+        'rows_per_second': rows / seconds if seconds else 0.0,
+    }
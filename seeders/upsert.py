@@ -0,0 +1,95 @@
+from datetime import datetime
+from sqlalchemy import and_, select, tuple_
+from app.extensions import db
+
+
+def _upsert_statement(table, keys, rows, update_columns, dialect):
+    """INSERT ... ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE for ``rows``"""
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(rows)
+        return stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in update_columns})
+    if dialect in ('sqlite', 'postgresql'):
+        from sqlalchemy.dialects import postgresql, sqlite
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = insert(table).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=list(keys), set_={column: stmt.excluded[column] for column in update_columns}
+        )
+    return None
+
+
+def bulk_upsert(model, rows, key):
+    """
+    Bring ``model``'s table in line with ``rows`` in one round trip each way
+
+    Reads the existing rows for all keys in one SELECT, compares the seeded
+    columns, and writes only new and changed rows with a single
+    INSERT ... ON DUPLICATE KEY UPDATE (MySQL) or ON CONFLICT DO UPDATE
+    (SQLite, PostgreSQL). Columns a row does not mention are left alone, so
+    admin edits to them survive re-seeding. Runs on db.session; the caller
+    commits.
+
+    Args:
+        model: Mapped class, e.g. Role
+        rows: List of dicts of column values; every dict must contain ``key``
+        key: Name of the unique column identifying a row, or a tuple of
+            names for a composite unique key
+
+    Returns:
+        dict: inserted, updated and unchanged counts
+    """
+    table = model.__table__
+    keys = (key,) if isinstance(key, str) else tuple(key)
+    key_columns = [table.c[name] for name in keys]
+
+    def identity(row):
+        return tuple(row[name] for name in keys)
+
+    columns = sorted({column for row in rows for column in row})
+    match = key_columns[0] if len(keys) == 1 else tuple_(*key_columns)
+    idents = [identity(row) for row in rows]
+    existing = {
+        tuple(row[:len(keys)]): dict(zip(columns, row[len(keys):]))
+        for row in db.session.execute(
+            select(*key_columns, *(table.c[column] for column in columns))
+            .where(match.in_([ident[0] for ident in idents] if len(keys) == 1 else idents))
+        )
+    }
+
+    inserts, updates = [], []
+    for row in rows:
+        current = existing.get(identity(row))
+        if current is None:
+            inserts.append(row)
+        elif any(current[column] != value for column, value in row.items()):
+            updates.append(row)
+
+    changed = inserts + updates
+    dialect = db.session.get_bind().dialect.name
+    stamp = {'updated_at': datetime.utcnow()} if 'updated_at' in table.c else {}
+    # A multi-row VALUES needs the same columns in every row: one statement
+    # per column set (the catalogue has a handful)
+    groups = {}
+    for row in changed:
+        groups.setdefault(tuple(sorted(row)), []).append(row | stamp)
+    for group_columns, values in groups.items():
+        update_columns = [column for column in (*group_columns, *stamp) if column not in keys]
+        stmt = _upsert_statement(table, keys, values, update_columns, dialect)
+        if stmt is not None:
+            db.session.execute(stmt)
+            continue
+        for row in values:
+            if identity(row) in existing:
+                db.session.execute(
+                    table.update().where(and_(*(column == row[column.name] for column in key_columns)))
+                    .values({column: row[column] for column in update_columns})
+                )
+            else:
+                db.session.execute(table.insert().values(row))
+
+    return {'inserted': len(inserts), 'updated': len(updates), 'unchanged': len(rows) - len(changed)}
+
+
+def summary(counts):
+    return f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged"
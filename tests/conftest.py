@@ -0,0 +1,88 @@
+"""
+Shared fixtures
+
+``app`` is one application per test session (per pytest-xdist worker) on
+its own SQLite file, with the schema created once. Each test runs in an
+outer transaction on a single connection: db.session works inside a
+SAVEPOINT that is reopened after every commit or rollback, and the outer
+transaction is rolled back when the test ends. Tests that need real commits
+seen by other connections (threads, processes, a second engine) or a
+differently configured app still build their own ``app``.
+"""
+import os
+import pytest
+from sqlalchemy import event
+from config import TestingConfig
+from app import create_app
+from app.cache import cache
+from app.extensions import db
+
+# 'gw0', 'gw1', ... under pytest-xdist
+WORKER = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+
+
+def _enable_savepoints(engine):
+    """pysqlite's own transaction handling breaks SAVEPOINT; let SQLAlchemy emit BEGIN"""
+    @event.listens_for(engine, 'connect')
+    def _autocommit_driver(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def _begin(connection):
+        connection.exec_driver_sql('BEGIN')
+
+
+@pytest.fixture(scope='session')
+def database_uri(tmp_path_factory):
+    """A SQLite file per worker (the base temp dir is already per worker)"""
+    return f"sqlite:///{tmp_path_factory.getbasetemp() / f'yca-test-{WORKER}.db'}"
+
+
+@pytest.fixture(scope='session')
+def session_app(database_uri):
+    """Application and schema shared by every test in this worker"""
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', database_uri)
+        app = create_app('testing')
+    with app.app_context():
+        _enable_savepoints(db.engine)
+        db.engine.dispose()
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def app(session_app):
+    """The session app; everything the test writes is rolled back afterwards"""
+    with session_app.app_context():
+        connection = db.engine.connect()
+        outer = connection.begin()
+        savepoint = connection.begin_nested()
+        factory = db.session.session_factory
+        factory.configure(bind=connection)
+        db.session.remove()
+
+        def _reopen_savepoint(session, transaction):
+            nonlocal savepoint
+            if not savepoint.is_active and outer.is_active:
+                savepoint = connection.begin_nested()
+
+        event.listen(factory, 'after_transaction_end', _reopen_savepoint)
+        cache.clear()
+        try:
+            yield session_app
+        finally:
+            db.session.remove()
+            event.remove(factory, 'after_transaction_end', _reopen_savepoint)
+            factory.kw.pop('bind', None)
+            outer.rollback()
+            connection.close()
+            cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    """Test client for the session app"""
+    return app.test_client()
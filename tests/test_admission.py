@@ -0,0 +1,176 @@
+import multiprocessing
+import threading
+import pytest
+from config import TestingConfig
+from app import create_app
+from app.extensions import db
+from app.admission import (
+    AdmissionClass, AdmissionController, SlotPool, fit_to_workers, parse_classes, parse_routes
+)
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """
+    Own application with one slow endpoint capped at a single request
+
+    Admission hooks and classes are set up by create_app from the config,
+    so the shared app cannot be switched over.
+    """
+    monkeypatch.setattr(TestingConfig, 'ADMISSION_ENABLED', True)
+    monkeypatch.setattr(TestingConfig, 'ADMISSION_ROUTES', 'slow=slow,form=form')
+    monkeypatch.setattr(TestingConfig, 'ADMISSION_CLASSES', 'slow=1:50:1000:GET,form=1:0:1000')
+    monkeypatch.setattr(TestingConfig, 'ADMISSION_LOCK_DIR', str(tmp_path / 'admission'))
+    app = create_app('testing')
+
+    app.config['SLOW_STARTED'] = threading.Event()
+    app.config['SLOW_RELEASE'] = threading.Event()
+
+    def slow():
+        app.config['SLOW_STARTED'].set()
+        app.config['SLOW_RELEASE'].wait(5)
+        return 'done'
+    app.add_url_rule('/_slow', 'slow', slow)
+    app.add_url_rule('/_form', 'form', lambda: 'form', methods=['GET', 'POST'])
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def _try_slot(directory, results):
+    pool = SlotPool(directory, 'auth', 1)
+    token = pool.try_acquire(1)
+    results.put(token is not None)
+    if token is not None:
+        pool.release(token)
+
+class TestAdmission:
+
+    def test_parse_config(self):
+        assert parse_routes('auth.login=auth, reports=reports') == {'auth.login': 'auth', 'reports': 'reports'}
+        assert parse_classes('auth=3:500:1500,reports=2:::get+post') == {
+            'auth': {'max_concurrency': 3, 'queue_timeout_ms': 500.0, 'target_latency_ms': 1500.0,
+                     'methods': ('POST',)},
+            'reports': {'max_concurrency': 2, 'queue_timeout_ms': 250.0, 'target_latency_ms': 1000.0,
+                        'methods': ('GET', 'POST')},
+        }
+
+    def test_classify_prefers_endpoint_over_blueprint(self, tmp_path):
+        controller = AdmissionController(
+            parse_classes('auth=2,light=4'), {'auth': 'light', 'auth.register': 'auth'}, str(tmp_path)
+        )
+        assert controller.classify('auth.register', 'auth').name == 'auth'
+        assert controller.classify('auth.logout', 'auth').name == 'light'
+        assert controller.classify('marketing.index', 'marketing') is None
+        assert controller.classify('auth.register', 'auth', 'POST').name == 'auth'
+        assert controller.classify('auth.register', 'auth', 'GET') is None
+
+        with pytest.raises(ValueError):
+            AdmissionController({}, {'auth': 'missing'}, str(tmp_path))
+
+    def test_slots_are_shared_across_processes(self, tmp_path):
+        pool = SlotPool(str(tmp_path), 'auth', 1)
+        token = pool.try_acquire(1)
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+
+        child = context.Process(target=_try_slot, args=(str(tmp_path), results))
+        child.start()
+        child.join(10)
+        assert results.get(timeout=5) is False
+
+        pool.release(token)
+        child = context.Process(target=_try_slot, args=(str(tmp_path), results))
+        child.start()
+        child.join(10)
+        assert results.get(timeout=5) is True
+
+    def test_cap_adapts_to_latency(self, tmp_path):
+        admission_class = AdmissionClass('auth', 4, 0, 100, str(tmp_path))
+
+        for _ in range(3):
+            admission_class.release(admission_class.acquire(), 0.5)
+        assert admission_class.limit < 2
+        assert admission_class.retry_after() == 1
+
+        for _ in range(60):
+            admission_class.release(admission_class.acquire(), 0.001)
+        assert admission_class.limit == 4
+        assert admission_class.stats()['admitted'] == 63
+
+    def test_saturated_class_is_shed_while_others_are_served(self, app):
+        held = {}
+
+        def hold_slot():
+            held['status'] = app.test_client().get('/_slow').status_code
+        holder = threading.Thread(target=hold_slot)
+        holder.start()
+        assert app.config['SLOW_STARTED'].wait(5)
+
+        try:
+            client = app.test_client()
+            shed = client.get('/_slow')
+            assert shed.status_code == 503
+            assert shed.headers['Retry-After'] == '1'
+            assert client.get('/about').status_code == 200
+        finally:
+            app.config['SLOW_RELEASE'].set()
+            holder.join(5)
+
+        assert held['status'] == 200
+        stats = app.extensions['admission'].stats()['slow']
+        assert (stats['admitted'], stats['queued'], stats['shed'], stats['in_flight']) == (1, 1, 1, 0)
+
+    def test_get_is_not_throttled_by_a_post_class(self, app):
+        form = app.extensions['admission'].classes['form']
+        token = form.acquire()
+        try:
+            client = app.test_client()
+            assert client.get('/_form').status_code == 200
+            assert client.post('/_form').status_code == 503
+        finally:
+            form.release(token, 0.001)
+
+        assert form.stats()['shed'] == 1
+        assert app.test_client().post('/_form').status_code == 200
+
+    def test_caps_fit_to_gunicorn_workers(self):
+        classes = parse_classes('auth=3:500:1500,reports=2:250:10000:GET')
+
+        fitted, clamped = fit_to_workers(classes, {'GUNICORN_WORKERS': '3', 'GUNICORN_WORKER_CLASS': 'sync'})
+        assert {name: s['max_concurrency'] for name, s in fitted.items()} == {'auth': 1, 'reports': 1}
+        assert {s['queue_timeout_ms'] for s in fitted.values()} == {0}
+        assert 'auth cap 3 -> 1' in clamped
+
+        fitted, _ = fit_to_workers(classes, {'GUNICORN_WORKERS': '3', 'GUNICORN_THREADS': '4'})
+        assert sum(s['max_concurrency'] for s in fitted.values()) == 5
+        assert fit_to_workers(classes, {'GUNICORN_WORKERS': '1', 'GUNICORN_WORKER_CLASS': 'eventlet'}) == (classes, [])
+        assert fit_to_workers(classes, {}) == (classes, [])
+
+    def test_unlisted_endpoint_keeps_a_worker_when_every_class_is_saturated(self, monkeypatch, tmp_path):
+        workers = 3
+        monkeypatch.setenv('GUNICORN_WORKERS', str(workers))
+        monkeypatch.setenv('GUNICORN_WORKER_CLASS', 'sync')
+        monkeypatch.setattr(TestingConfig, 'ADMISSION_ENABLED', True)
+        monkeypatch.setattr(TestingConfig, 'ADMISSION_ROUTES', 'auth.login=auth,reports=reports')
+        monkeypatch.setattr(TestingConfig, 'ADMISSION_CLASSES', 'auth=3:500:1500,reports=2:250:10000:GET')
+        monkeypatch.setattr(TestingConfig, 'ADMISSION_LOCK_DIR', str(tmp_path / 'admission'))
+        app = create_app('testing')
+        controller = app.extensions['admission']
+
+        held = []
+        for admission_class in controller.classes.values():
+            token = admission_class.acquire()
+            while token is not None:
+                held.append((admission_class, token))
+                token = admission_class.acquire()
+        try:
+            assert len(held) == workers - 1
+            client = app.test_client()
+            assert client.post('/auth/login').status_code == 503
+            assert client.get('/about').status_code == 200
+        finally:
+            for admission_class, token in held:
+                admission_class.release(token, 0.001)
+        assert controller.classes['auth'].queue_timeout == 0
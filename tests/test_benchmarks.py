@@ -0,0 +1,64 @@
+import pytest
+from benchmarks.harness import boot_app, cleanup_target, compare, measure, seed
+from benchmarks.micro import MICRO_BENCHMARKS, run_micro
+from benchmarks.load import run_load
+from benchmarks.sequences import audit_allocations, run_sequences
+
+@pytest.fixture
+def database_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'bench.db'}"
+    yield url
+    cleanup_target(url)
+
+@pytest.fixture
+def app(database_url):
+    """Seeded benchmark app on a file database"""
+    app = boot_app(database_url)
+    seed(app, students=4)
+    return app
+
+class TestBenchmarks:
+
+    def test_measure_reports_per_call_time(self):
+        stats = measure(lambda: sum(range(100)), repeat=3, min_time=0.01)
+        assert stats['repeat'] == 3
+        assert 0 < stats['min'] <= stats['median']
+
+    def test_micro_suite_runs(self, app):
+        results = run_micro(app, repeat=2, min_time=0.01)
+        assert set(results) == set(MICRO_BENCHMARKS)
+        assert all(stats['median'] > 0 for stats in results.values())
+
+    def test_load_test_logs_in_and_browses(self, app, database_url):
+        results = run_load(database_url, processes=2, iterations=2, students=4,
+                           scenarios=('login', 'courses'))
+        assert results['login']['requests'] == 4
+        assert results['login']['errors'] == 0
+        assert results['courses']['errors'] == 0
+        assert results['courses']['p95'] >= results['courses']['p50']
+
+    def test_sequence_stress_allocates_without_duplicates_or_gaps(self, database_url):
+        results = run_sequences(database_url, processes=3, allocations=10, keys=2)
+        assert results['requests'] == 30
+        assert (results['errors'], results['duplicates'], results['gaps']) == (0, 0, 0)
+        assert results['p99'] >= results['p50']
+
+    def test_audit_counts_duplicates_and_gaps(self):
+        usernames = ['YCA/99/PYT/STD/0001', 'YCA/99/PYT/STD/0001', 'YCA/99/PYT/STD/0003',
+                     'YCA/99/WD/STD/0001']
+        stored = {'YCA/99/PYT/STD': 3, 'YCA/99/WD/STD': 1}
+        assert audit_allocations(usernames, stored) == {'duplicates': 1, 'gaps': 1}
+        assert audit_allocations(['YCA/99/PYT/STD/0003'], {'YCA/99/PYT/STD': 2}) == {'duplicates': 0, 'gaps': 3}
+
+    def test_compare_flags_regressions(self):
+        baseline = {'micro': {'sqlite': {'a': {'median': 1.0}, 'b': {'median': 1.0}}},
+                    'load': {'sqlite': {'login': {'p95': 0.1}}}}
+        current = {'micro': {'sqlite': {'a': {'median': 1.3}, 'b': {'median': 0.5}, 'new': {'median': 1}}},
+                   'load': {'sqlite': {'login': {'p95': 0.105}}}}
+
+        verdicts = {row['key']: row['verdict'] for row in compare(current, baseline, threshold=0.15)}
+        assert verdicts == {
+            'micro/sqlite/a': 'regression',
+            'micro/sqlite/b': 'improvement',
+            'load/sqlite/login': 'ok',
+        }
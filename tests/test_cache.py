@@ -0,0 +1,135 @@
+import threading
+import time
+import pytest
+from flask import Flask
+from app.cache import AppCache
+from app.cache import core as cache_core
+
+def make_cache(shared_url=None, **overrides):
+    """Build a cache the way init_app would for one worker"""
+    flask_app = Flask(__name__)
+    flask_app.config.update(
+        CACHE_SHARED_URL=shared_url,
+        CACHE_LOCAL_MAX_ENTRIES=overrides.pop('max_entries', 1024),
+        CACHE_TAG_VERSION_TTL=0,
+        **overrides
+    )
+    return AppCache(flask_app)
+
+@pytest.fixture
+def shared_url(tmp_path):
+    """SQLite shared tier file"""
+    return f"sqlite:///{tmp_path / 'cache.db'}"
+
+class TestLocalTier:
+
+    def test_get_set_and_ttl(self):
+        """Values expire after their TTL"""
+        cache = make_cache()
+        cache.set('catalog:version', 'v1', ttl=0.05)
+
+        assert cache.get('catalog:version') == 'v1'
+        time.sleep(0.06)
+        assert cache.get('catalog:version') is None
+
+    def test_lru_eviction_counted_per_namespace(self):
+        """Oldest entries are evicted and counted against their namespace"""
+        cache = make_cache(max_entries=2)
+        cache.set('users:a', 1)
+        cache.set('users:b', 2)
+        cache.get('users:a')
+        cache.set('programs:c', 3)
+
+        assert cache.get('users:b') is None
+        assert cache.get('users:a') == 1
+        assert cache.stats()['users']['evictions'] == 1
+
+    def test_hit_miss_stats(self):
+        """Hits and misses are tracked per namespace"""
+        cache = make_cache()
+        cache.set('fragment:nav', '<ul>')
+        cache.get('fragment:nav')
+        cache.get('fragment:missing')
+
+        stats = cache.stats()['fragment']
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_ratio'] == 0.5
+
+class TestSingleFlight:
+
+    def test_concurrent_misses_load_once(self):
+        """N threads missing the same key run the loader once"""
+        cache = make_cache()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'value'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_set('report:daily', loader)))
+            for _ in range(10)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == ['value'] * 10
+        assert len(calls) == 1
+
+    def test_early_refresh_keeps_serving(self, monkeypatch):
+        """An entry about to expire is recomputed while still valid"""
+        # -ln(1 - 0.5) * delta * beta is ~693 s, well past the 60 s TTL
+        monkeypatch.setattr(cache_core.random, 'random', lambda: 0.5)
+        cache = make_cache(CACHE_EARLY_REFRESH_BETA=1000.0)
+        cache.set('report:daily', 'old', ttl=60, delta=1.0)
+
+        value = cache.get_or_set('report:daily', lambda: 'new', ttl=60)
+
+        assert value == 'new'
+        assert cache.stats()['report']['early_refreshes'] == 1
+
+    def test_no_early_refresh_when_draw_is_low(self, monkeypatch):
+        """A draw of 0 adds no jitter, so a fresh entry is served as is"""
+        monkeypatch.setattr(cache_core.random, 'random', lambda: 0.0)
+        cache = make_cache(CACHE_EARLY_REFRESH_BETA=1000.0)
+        cache.set('report:daily', 'old', ttl=60, delta=1.0)
+
+        assert cache.get_or_set('report:daily', lambda: 'new', ttl=60) == 'old'
+        assert cache.stats()['report'].get('early_refreshes', 0) == 0
+
+class TestSharedTier:
+
+    def test_value_visible_to_other_worker(self, shared_url):
+        """A value set by one worker is read by another via the shared tier"""
+        worker_a = make_cache(shared_url)
+        worker_b = make_cache(shared_url)
+        worker_a.set('catalog:version', 'v7')
+
+        assert worker_b.get('catalog:version') == 'v7'
+        assert worker_b.stats()['catalog']['shared_hits'] == 1
+
+    def test_tag_invalidation_across_workers(self, shared_url):
+        """Invalidating a tag drops tagged entries in every worker"""
+        worker_a = make_cache(shared_url)
+        worker_b = make_cache(shared_url)
+        worker_a.set('programs:featured', ['PYT'], tags=['catalog'])
+        assert worker_b.get('programs:featured') == ['PYT']
+
+        worker_a.invalidate_tag('catalog')
+
+        assert worker_a.get('programs:featured') is None
+        assert worker_b.get('programs:featured') is None
+
+    def test_delete_propagates(self, shared_url):
+        """Deleting a key removes it from the shared tier"""
+        worker_a = make_cache(shared_url)
+        worker_b = make_cache(shared_url)
+        worker_a.set('catalog:version', 'v1')
+        worker_b.delete('catalog:version')
+
+        assert make_cache(shared_url).get('catalog:version') is None
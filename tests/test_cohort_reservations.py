@@ -0,0 +1,258 @@
+import threading
+import time
+from collections import namedtuple
+import pytest
+from sqlalchemy.dialects import mysql
+from config import TestingConfig
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.program import Program
+from app.models.cohort import Cohort, CohortWaitlist
+from app.models.enrollment import Enrollment
+from app.models.role import Role
+from app.services.cohort_service import CohortService
+from app.services.enrollment_service import EnrollmentService
+from app.services.registration_service import RegistrationService
+
+Row = namedtuple('Row', 'id user_id')
+
+def make_users(count, start=0):
+    users = [
+        User(
+            username=f'user{n}',
+            email=f'user{n}@example.com',
+            surname='Test',
+            first_name=f'User{n}',
+            gender='Female',
+            password_hash='x',
+        )
+        for n in range(start, start + count)
+    ]
+    db.session.add_all(users)
+    db.session.commit()
+    return users
+
+def setup_cohort(capacity):
+    program = Program(code='WD', name='Web Development', category='Tech', price_ngn=1)
+    db.session.add(program)
+    cohort = CohortService.create_cohort(program, 'A', capacity)
+    db.session.commit()
+    return cohort
+
+class TestCohortReservations:
+
+    def test_overflow_goes_to_waitlist_in_order(self, app):
+        cohort = setup_cohort(2)
+        users = make_users(4)
+
+        statuses = [CohortService.reserve_seat(user, cohort).status for user in users]
+
+        assert statuses == ['pending', 'pending', 'waitlisted', 'waitlisted']
+        assert cohort.seats_available == 0
+        assert CohortService.waitlist_position(users[3], cohort) == 2
+        # Reserving twice changes nothing
+        assert CohortService.reserve_seat(users[0], cohort).status == 'pending'
+        assert cohort.seats_available == 0
+
+    def test_cancel_promotes_head_of_waitlist(self, app):
+        cohort = setup_cohort(1)
+        first, second, third = make_users(3)
+        for user in (first, second, third):
+            CohortService.reserve_seat(user, cohort)
+
+        promoted = CohortService.cancel(first, cohort)
+
+        assert [e.user_id for e in promoted] == [second.id]
+        assert cohort.seats_available == 0
+        assert CohortService.waitlist_position(third, cohort) == 1
+
+        CohortService.cancel(third, cohort)
+        assert CohortWaitlist.query.count() == 0
+        with pytest.raises(ValueError):
+            CohortService.cancel(third, cohort)
+
+    def test_capacity_increase_promotes(self, app):
+        cohort = setup_cohort(1)
+        users = make_users(3)
+        for user in users:
+            CohortService.reserve_seat(user, cohort)
+
+        promoted = CohortService.set_capacity(cohort, 4)
+
+        assert len(promoted) == 2
+        assert cohort.capacity == 4 and cohort.seats_available == 1
+        with pytest.raises(ValueError):
+            CohortService.set_capacity(cohort, 2)
+
+    def test_registration_enroll_takes_seat(self, app):
+        cohort = setup_cohort(1)
+        first, second = make_users(2)
+
+        EnrollmentService.enroll(first, [cohort.program_id], cohort='A')
+        EnrollmentService.enroll(second, [cohort.program_id], cohort='A')
+        db.session.commit()
+
+        assert [e.status for e in first.enrollments + second.enrollments] == ['pending', 'waitlisted']
+
+    def test_registration_takes_a_seat_freed_while_joining_the_queue(self, app, monkeypatch):
+        """place() promotes after queueing, so a seat freed mid-way is not left empty"""
+        cohort = setup_cohort(1)
+        first, second = make_users(2)
+        EnrollmentService.enroll(first, [cohort.program_id], cohort='A')
+        db.session.commit()
+
+        is_open = CohortService._is_open
+        def cancel_in_between(cohort_id):
+            # A concurrent cancel() commits after our UPDATE found no seat
+            CohortService._leave(first.id, first.enrollments[0])
+            first.enrollments[0].status = Enrollment.STATUS_WITHDRAWN
+            return is_open(cohort_id)
+        monkeypatch.setattr(CohortService, '_is_open', staticmethod(cancel_in_between))
+
+        EnrollmentService.enroll(second, [cohort.program_id], cohort='A')
+        db.session.commit()
+
+        assert second.enrollments[0].status == 'pending'
+        assert CohortWaitlist.query.count() == 0
+        CohortService._refresh(cohort)
+        assert cohort.seats_available == 0
+
+    def test_closed_cohort_rejects_instead_of_queueing(self, app):
+        cohort = setup_cohort(1)
+        cohort.is_open = False
+        db.session.commit()
+        user, = make_users(1)
+
+        with pytest.raises(ValueError, match='closed'):
+            CohortService.reserve_seat(user, cohort)
+        with pytest.raises(ValueError, match='closed'):
+            EnrollmentService.enroll(user, [cohort.program_id], cohort='A')
+        db.session.rollback()
+
+        assert CohortWaitlist.query.count() == 0
+        assert Enrollment.query.count() == 0
+
+    def test_failed_registration_gives_its_seats_back(self, app):
+        """An enroll error after an earlier seat was taken rolls the seat back"""
+        open_cohort = setup_cohort(1)
+        design = Program(code='GD', name='Graphic Design', category='Creative', price_ngn=1)
+        closed = CohortService.create_cohort(design, 'A', 1, is_open=False)
+        db.session.add(Role(name='Student'))
+        db.session.commit()
+        form = {
+            'email': 'new@example.com', 'password': 'Str0ng!Passw0rd', 'confirm_password': 'Str0ng!Passw0rd',
+            'surname': 'Test', 'first_name': 'New', 'gender': 'Female', 'cohort': 'A',
+            'selected_programs': [open_cohort.program_id, closed.program_id],
+        }
+
+        user, error = RegistrationService.register_user(form)
+        db.session.commit()  # a later commit in the same request must not persist the seat
+
+        assert user is None and 'closed' in error
+        CohortService._refresh(open_cohort)
+        assert open_cohort.seats_available == 1
+        assert Enrollment.query.count() == 0
+
+        user, error = RegistrationService.register_user(dict(form, role='Nobody'))
+        assert (user, error) == (None, 'Invalid role: Nobody')
+        CohortService._refresh(open_cohort)
+        assert open_cohort.seats_available == 1
+
+    def test_waitlist_head_is_a_locking_current_read(self, app, monkeypatch):
+        """On MySQL the head is read FOR UPDATE SKIP LOCKED, not from the snapshot"""
+        cohort = setup_cohort(1)
+        statements = []
+        execute = db.session.execute
+        def record(statement, *args, **kwargs):
+            statements.append(statement)
+            return execute(statement, *args, **kwargs)
+        monkeypatch.setattr(db.session, 'execute', record)
+
+        CohortService._waitlist_head(cohort.id)
+
+        sql = str(statements[0].compile(dialect=mysql.dialect()))
+        assert sql.rstrip().endswith('FOR UPDATE SKIP LOCKED')
+
+    def test_promote_stops_when_the_head_keeps_vanishing(self, app, monkeypatch):
+        """
+        A stale head (REPEATABLE READ snapshot of a row a concurrent cancel
+        deleted) costs a few retries, not an endless loop holding the seat
+        """
+        cohort = setup_cohort(1)
+        first, second = make_users(2)
+        CohortService.reserve_seat(first, cohort)
+        CohortService.reserve_seat(second, cohort)
+        reads = []
+        def stale_head(cohort_id):
+            reads.append(cohort_id)
+            return Row(id=-1, user_id=second.id)
+        monkeypatch.setattr(CohortService, '_waitlist_head', staticmethod(stale_head))
+
+        assert CohortService.cancel(first, cohort) == []
+        assert len(reads) == CohortService.PROMOTE_RETRIES + 1
+        assert cohort.seats_available == 1
+        assert CohortService.waitlist_position(second, cohort) == 1
+
+
+class TestCohortReservationStress:
+
+    THREADS = 8
+    USERS_PER_THREAD = 12
+    CAPACITY = 40
+
+    def test_concurrent_reservations(self, tmp_path, monkeypatch):
+        """
+        Threads with their own connections race for a file-backed cohort
+
+        Run with ``-s`` to see reservations/sec.
+        """
+        monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI',
+                            f"sqlite:///{tmp_path / 'cohorts.db'}")
+        app = create_app('testing')
+        total = self.THREADS * self.USERS_PER_THREAD
+
+        with app.app_context():
+            db.create_all()
+            cohort_id = setup_cohort(self.CAPACITY).id
+            user_ids = [user.id for user in make_users(total)]
+            db.session.remove()
+
+        errors = []
+        barrier = threading.Barrier(self.THREADS)
+
+        def worker(ids):
+            with app.app_context():
+                try:
+                    barrier.wait()
+                    cohort = db.session.get(Cohort, cohort_id)
+                    for user_id in ids:
+                        CohortService.reserve_seat(db.session.get(User, user_id), cohort)
+                except Exception as e:  # reported below
+                    errors.append(e)
+                finally:
+                    db.session.remove()
+
+        chunks = [user_ids[i::self.THREADS] for i in range(self.THREADS)]
+        threads = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        assert not errors, errors
+        with app.app_context():
+            seated = Enrollment.query.filter(Enrollment.status.in_(Enrollment.CURRENT_STATUSES)).count()
+            waitlisted = CohortWaitlist.query.count()
+            cohort = db.session.get(Cohort, cohort_id)
+
+            assert seated == self.CAPACITY
+            assert cohort.seats_available == 0
+            assert waitlisted == total - self.CAPACITY
+            assert Enrollment.query.filter_by(status='waitlisted').count() == waitlisted
+            db.drop_all()
+
+        print(f"\n{total} reservations from {self.THREADS} threads in {elapsed:.2f}s "
+              f"({total / elapsed:.0f} reservations/sec)")
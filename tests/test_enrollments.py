@@ -0,0 +1,93 @@
+import pytest
+from app.extensions import db
+from app.models.user import User
+from app.models.program import Program
+from app.models.enrollment import Enrollment
+from app.services.enrollment_service import EnrollmentService
+
+@pytest.fixture
+def app(app):
+    """Session app with two programs"""
+    db.session.add_all([
+        Program(id=1, code='WEB', name='Web Development', category='Tech', price_ngn=1),
+        Program(id=2, code='DSN', name='Graphic Design', category='Creative', price_ngn=1),
+    ])
+    db.session.commit()
+    return app
+
+def make_user(n, selected_programs=None):
+    user = User(
+        username=f'user{n}',
+        email=f'user{n}@example.com',
+        surname='Test',
+        first_name=f'User{n}',
+        gender='Male',
+        password_hash='x',
+        selected_programs=selected_programs or [],
+    )
+    db.session.add(user)
+    return user
+
+class TestEnrollments:
+
+    def test_backfill_from_selected_programs(self, app):
+        """JSON selections become enrollment rows; re-running adds nothing"""
+        make_user(1, ['1', '2'])
+        make_user(2, ['1', '99'])
+        make_user(3, [])
+        db.session.commit()
+
+        stats = EnrollmentService.backfill(chunk_size=2)
+
+        assert stats == {'users': 3, 'created': 3, 'skipped': 1}
+        assert EnrollmentService.backfill()['created'] == 0
+        assert EnrollmentService.count(1) == 2
+
+    def test_enroll_skips_existing_and_rejects_unknown(self, app):
+        user = make_user(1)
+        EnrollmentService.enroll(user, ['1'], cohort='A')
+        db.session.commit()
+
+        assert EnrollmentService.enroll(user, [1, 2]) != []
+        assert len(user.enrollments) == 2
+        with pytest.raises(ValueError):
+            EnrollmentService.enroll(user, [42])
+
+    def test_roster_pages_and_filters(self, app):
+        """Roster is keyed on user id and honours cohort and status"""
+        users = [make_user(n) for n in range(5)]
+        for n, user in enumerate(users):
+            EnrollmentService.enroll(user, [1], cohort='A' if n % 2 else 'B')
+        db.session.commit()
+        users[1].enrollments[0].status = Enrollment.STATUS_WITHDRAWN
+        db.session.commit()
+
+        first = EnrollmentService.roster(1, limit=2)
+        second = EnrollmentService.roster(1, after=first['next_cursor'], limit=2)
+
+        assert [s['username'] for s in first['students'] + second['students']] == [
+            'user0', 'user2', 'user3', 'user4'
+        ]
+        assert second['next_cursor'] is None
+        assert [s['username'] for s in EnrollmentService.roster(1, cohort='A')['students']] == ['user3']
+        assert EnrollmentService.counts_by_program() == {1: 4}
+
+    def test_courses_for_user(self, app):
+        """My courses returns enrollments with programs loaded"""
+        user = make_user(1)
+        EnrollmentService.enroll(user, [2, 1])
+        db.session.commit()
+
+        courses = EnrollmentService.courses_for(user.id)
+
+        assert {c.program.name for c in courses} == {'Web Development', 'Graphic Design'}
+
+    def test_user_delete_removes_enrollments(self, app):
+        user = make_user(1)
+        EnrollmentService.enroll(user, [1])
+        db.session.commit()
+
+        db.session.delete(user)
+        db.session.commit()
+
+        assert Enrollment.query.count() == 0
@@ -0,0 +1,137 @@
+import csv
+import io
+import threading
+import zipfile
+import pytest
+from app.extensions import db
+from app.models.user import User
+from app.models.role import Role
+from app.models.program import Program
+from app.models.enrollment import Enrollment
+from app.services.enrollment_service import EnrollmentService
+from app.services.export_service import ExportService
+
+@pytest.fixture
+def app(app):
+    """Session app with a few users and programs"""
+    student, teacher = Role(name='Student'), Role(name='Teacher')
+    python = Program(code='PYT', name='Python', category='Tech', price_ngn=1000)
+    design = Program(code='DSN', name='Design', category='Creative', price_ngn=500)
+    db.session.add_all([student, teacher, python, design])
+    db.session.flush()
+
+    for i in range(7):
+        user = User(
+            username=f'user{i}',
+            email=f'user{i}@example.com',
+            surname='Okafor',
+            first_name=f'Adaeze{i}',
+            gender='Female',
+            password_hash='x',
+        )
+        EnrollmentService.enroll(user, [python.id, design.id] if i % 2 else [python.id])
+        user.roles.append(student)
+        if i == 0:
+            user.roles.append(teacher)
+        db.session.add(user)
+    db.session.commit()
+    return app
+
+class TestExportService:
+
+    def test_users_fold_roles(self, app):
+        """Users with several roles come out as one row"""
+        rows = list(ExportService.iter_users())
+
+        assert len(rows) == 7
+        roles = {row[1]: row[10] for row in rows}
+        assert roles['user0'] == 'Student, Teacher'
+        assert roles['user1'] == 'Student'
+
+    def test_registrations_total_fees(self, app):
+        """Selected programs are named and priced"""
+        rows = {row[0]: row for row in ExportService.iter_registrations()}
+
+        assert rows['user1'][6] == 'Python, Design'
+        assert rows['user1'][7] == '1500.00'
+        assert rows['user2'][7] == '1000.00'
+
+    def test_registrations_follow_enrollments(self, app):
+        """A withdrawn enrollment drops out of the export even if the JSON still lists it"""
+        user = User.query.filter_by(username='user1').one()
+        user.selected_programs = [1, 2]
+        design = next(e for e in user.enrollments if e.program.code == 'DSN')
+        design.status = Enrollment.STATUS_WITHDRAWN
+        db.session.commit()
+
+        rows = {row[0]: row for row in ExportService.iter_registrations()}
+
+        assert rows['user1'][6] == 'Python'
+        assert rows['user1'][7] == '1000.00'
+        assert len(rows) == 7
+
+    def test_csv_streams_in_chunks(self, app, monkeypatch):
+        """CSV is yielded in several chunks that join into one document"""
+        monkeypatch.setattr(ExportService, 'CSV_FLUSH_ROWS', 2)
+        headers, rows = ExportService.dataset('users')
+        chunks = list(ExportService.stream_csv(headers, rows))
+
+        assert len(chunks) == 4
+        text = b''.join(chunks).decode('utf-8-sig')
+        parsed = list(csv.reader(io.StringIO(text)))
+        assert parsed[0] == ExportService.USER_HEADERS
+        assert len(parsed) == 8
+
+    def test_xlsx_stream_is_valid_workbook(self, app):
+        """Streamed XLSX chunks form a readable zip"""
+        headers, rows = ExportService.dataset('registrations')
+        data = b''.join(ExportService.stream_xlsx(headers, rows))
+
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            assert 'xl/worksheets/sheet1.xml' in archive.namelist()
+            # constant_memory writes inline strings into the sheet itself
+            assert b'user6' in archive.read('xl/worksheets/sheet1.xml')
+
+    def test_formula_cells_are_escaped(self, app):
+        """User text a spreadsheet would evaluate is exported as text"""
+        user = User.query.filter_by(username='user0').one()
+        user.surname = '=HYPERLINK("http://evil.example","click")'
+        user.middle_name = '@SUM(1+1)'
+        user.phone = '+2348012345678'
+        db.session.commit()
+
+        headers, rows = ExportService.dataset('users')
+        text = b''.join(ExportService.stream_csv(headers, rows)).decode('utf-8-sig')
+        row = next(r for r in csv.reader(io.StringIO(text)) if r[1] == 'user0')
+        assert row[3] == '\'=HYPERLINK("http://evil.example","click")'
+        assert row[5] == "'@SUM(1+1)"
+        assert row[7] == '+2348012345678'
+
+        headers, rows = ExportService.dataset('users')
+        data = b''.join(ExportService.stream_xlsx(headers, rows))
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            sheet = archive.read('xl/worksheets/sheet1.xml')
+        assert b'<f>' not in sheet
+        assert b'=HYPERLINK' in sheet
+
+    def test_abandoned_xlsx_download_leaves_nothing_running(self, app, monkeypatch):
+        """Closing the generator mid-stream (client gone) cleans up at once"""
+        monkeypatch.setattr(ExportService, 'XLSX_CHUNK_BYTES', 512)
+        threads = threading.active_count()
+        headers, rows = ExportService.dataset('users')
+        stream = ExportService.stream_xlsx(headers, rows)
+
+        assert next(stream)
+        stream.close()
+
+        assert threading.active_count() == threads
+
+    def test_unknown_dataset(self, app):
+        with pytest.raises(ValueError):
+            ExportService.dataset('payments')
+
+    def test_export_route_requires_login(self, app):
+        """Anonymous users are sent to the login page"""
+        response = app.test_client().get('/reports/export/users.csv')
+
+        assert response.status_code in (302, 401)
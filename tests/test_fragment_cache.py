@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy import event
+from flask import render_template_string
+from app.extensions import db
+from app.templating import fragment_cache_stats
+
+@pytest.fixture
+def app(app, monkeypatch):
+    """Session app with the fragment hit/miss counts reset for this test"""
+    monkeypatch.setattr(app.jinja_env, 'fragment_cache_stats', {})
+    return app
+
+class TestFragmentCache:
+
+    TEMPLATE = "{% cache ['greeting', version], 60 %}{{ counter.next() }}{% endcache %}"
+
+    class Counter:
+        def __init__(self):
+            self.calls = 0
+
+        def next(self):
+            self.calls += 1
+            return self.calls
+
+    def test_fragment_rendered_once_per_key(self, app):
+        """Second render with same key parts comes from cache"""
+        with app.test_request_context():
+            counter = self.Counter()
+            first = render_template_string(self.TEMPLATE, counter=counter, version=1)
+            second = render_template_string(self.TEMPLATE, counter=counter, version=1)
+
+            assert first == second == '1'
+            assert counter.calls == 1
+
+    def test_key_parts_vary_fragment(self, app):
+        """Changing a key part re-renders the fragment"""
+        with app.test_request_context():
+            counter = self.Counter()
+            render_template_string(self.TEMPLATE, counter=counter, version=1)
+            changed = render_template_string(self.TEMPLATE, counter=counter, version=2)
+
+            assert changed == '2'
+
+    def test_hit_metrics(self, app):
+        """Hits and misses are counted per fragment name"""
+        with app.test_request_context():
+            counter = self.Counter()
+            for _ in range(3):
+                render_template_string(self.TEMPLATE, counter=counter, version=1)
+
+            stats = fragment_cache_stats(app)['greeting']
+            assert stats['misses'] == 1
+            assert stats['hits'] == 2
+
+    def test_disabled_renders_every_time(self, app, monkeypatch):
+        """FRAGMENT_CACHE_ENABLED=False bypasses the cache"""
+        monkeypatch.setitem(app.config, 'FRAGMENT_CACHE_ENABLED', False)
+        with app.test_request_context():
+            counter = self.Counter()
+            render_template_string(self.TEMPLATE, counter=counter, version=1)
+            render_template_string(self.TEMPLATE, counter=counter, version=1)
+
+            assert counter.calls == 2
+
+    def test_home_page_keeps_static_cards_without_featured_programs(self, app):
+        """The original program cards are the fallback when nothing is featured"""
+        html = app.test_client().get('/').get_data(as_text=True)
+
+        assert 'Software Engineering' in html
+        assert 'Graphic Design' in html
+
+    def test_home_page_queries_featured_programs_only_on_miss(self, app):
+        """A fragment cache hit does not touch the programs table"""
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        client = app.test_client()
+        event.listen(db.engine, 'after_cursor_execute', record)
+        try:
+            client.get('/')
+            misses = [s for s in statements if 'is_featured' in s]
+            statements.clear()
+            client.get('/')
+            hits = [s for s in statements if 'is_featured' in s]
+        finally:
+            event.remove(db.engine, 'after_cursor_execute', record)
+
+        assert len(misses) == 1
+        assert hits == []
@@ -0,0 +1,124 @@
+import pytest
+from sqlalchemy import text
+from config import TestingConfig
+from app import create_app
+from app.extensions import db
+from app.index_advisor import IndexAdvisor, ShapeLog, capture, explain, propose_index
+from app.sql_instrumentation import pop_collector
+
+@pytest.fixture
+def advisor_app(monkeypatch, tmp_path):
+    """
+    Own application on a SQLite file with the index advisor on
+
+    SQL_INDEX_ADVISOR is read by create_app, and `flask index-advice` builds
+    a second app from TestingConfig that must find the same schema.
+    """
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'advisor.db'}")
+    monkeypatch.setattr(TestingConfig, 'SQL_INDEX_ADVISOR', True)
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def plan(statement, parameters=()):
+    with db.engine.connect() as connection:
+        return explain(connection, statement, parameters)
+
+class TestIndexAdvisor:
+
+    def test_equality_then_order_then_range(self):
+        statement = (
+            "SELECT users.id FROM users WHERE users.created_at >= ? AND users.deleted_at IS NULL "
+            "AND users.gender = ? ORDER BY users.created_at DESC, users.id DESC LIMIT ?"
+        )
+        assert propose_index(statement, 'users') == ['deleted_at', 'gender', 'created_at', 'id']
+
+    def test_join_keys_count_as_equality(self):
+        statement = (
+            "SELECT roles.name FROM roles JOIN user_roles AS user_roles_1 "
+            "ON roles.id = user_roles_1.role_id WHERE user_roles_1.user_id = ?"
+        )
+        assert propose_index(statement, 'user_roles_1') == ['user_id', 'role_id']
+
+    def test_sort_is_blamed_on_the_order_by_table(self, app):
+        statement = (
+            "SELECT users.id FROM users JOIN enrollments ON enrollments.user_id = users.id "
+            "WHERE users.email = ? ORDER BY enrollments.updated_at DESC"
+        )
+        log = ShapeLog()
+        log.record(statement, 0, None, ('a@example.com',))
+
+        new = IndexAdvisor().review(log, 'auth.profile')
+        assert [finding['ddl'] for finding in new] == [
+            'CREATE INDEX ix_enrollments_user_id_updated_at ON enrollments (user_id, updated_at)'
+        ]
+
+    def test_unqualified_columns_of_a_single_table(self, app):
+        assert propose_index("SELECT id FROM programs WHERE is_active = ? ORDER BY name", 'programs') == []
+        assert propose_index(
+            "SELECT id FROM programs WHERE is_active = ? ORDER BY name", 'programs', unqualified=True
+        ) == ['is_active', 'name']
+
+        log = ShapeLog()
+        log.record("SELECT id FROM users WHERE surname = ?", 0, None, ('Test',))
+        new = IndexAdvisor().review(log, 'auth.profile')
+        assert [finding['ddl'] for finding in new] == ['CREATE INDEX ix_users_surname ON users (surname)']
+
+    def test_unattributable_sort_is_logged(self, app, caplog):
+        log = ShapeLog()
+        log.record(
+            "SELECT users.id FROM users JOIN enrollments ON enrollments.user_id = users.id "
+            "WHERE users.email = ? ORDER BY lower(enrollments.status)", 0, None, ('a@example.com',)
+        )
+
+        with caplog.at_level('INFO'):
+            assert IndexAdvisor().review(log, 'auth.profile') == []
+        assert 'sort without index on an unknown table, no proposal' in caplog.text
+
+    def test_explain_finds_full_scan(self, app):
+        assert plan("SELECT users.id FROM users WHERE users.surname = ?", ('Test',)) == [('users', 'full scan')]
+        assert plan("SELECT users.id FROM users WHERE users.email = ?", ('a@example.com',)) == []
+
+    def test_hot_path_indexes_avoid_scans(self, app):
+        assert plan("SELECT users.id FROM users WHERE users.email_verification_token = ?", ('t',)) == []
+        assert plan(
+            "SELECT programs.id FROM programs WHERE programs.is_active = 1 AND programs.category = ?", ('tech',)
+        ) == []
+        assert plan(
+            "SELECT users.id FROM users WHERE users.deleted_at IS NULL ORDER BY users.created_at DESC, users.id DESC"
+        ) == []
+
+    def test_review_records_finding_once(self, app):
+        advisor = IndexAdvisor()
+        log = ShapeLog()
+        log.record("SELECT users.id FROM users WHERE users.surname = ?", 0, None, ('Test',))
+        log.record("SELECT users.id FROM users WHERE users.surname = ?", 0, None, ('Other',))
+
+        new = advisor.review(log, 'auth.profile')
+        assert [finding['ddl'] for finding in new] == ['CREATE INDEX ix_users_surname ON users (surname)']
+        assert advisor.review(log, 'admin.users') == []
+        assert advisor.report()[0]['endpoints'] == {'auth.profile', 'admin.users'}
+
+    def test_requests_are_reviewed(self, advisor_app):
+        log, token = capture()
+        try:
+            db.session.execute(text("SELECT users.id FROM users WHERE users.surname = 'x'")).all()
+        finally:
+            pop_collector(token)
+        assert len(log.samples) == 1
+
+        response = advisor_app.test_client().get('/auth/api/check-email?email=someone@example.com')
+        assert response.status_code == 200
+        assert advisor_app.extensions['index_advisor'].explained
+        assert not advisor_app.extensions['index_advisor'].findings
+
+    def test_disabled_by_default(self, app):
+        assert 'index_advisor' not in app.extensions
+
+    def test_index_advice_command(self, advisor_app):
+        result = advisor_app.test_cli_runner().invoke(args=['index-advice', '--config', 'testing', '/courses'])
+        assert result.exit_code == 0, result.output
+        assert '/courses' in result.output
@@ -0,0 +1,86 @@
+import pytest
+from config import TestingConfig
+from app import create_app
+from app.cache import cache
+from app.metrics import db_pool_invalidated, observe_db_pool, track_bcrypt
+
+@pytest.fixture
+def app(monkeypatch):
+    """
+    Own application with metrics enabled
+
+    METRICS_ENABLED is read by create_app, so the shared app cannot be
+    switched over.
+    """
+    monkeypatch.setattr(TestingConfig, 'METRICS_ENABLED', True)
+    app = create_app('testing')
+    app.add_url_rule('/_ping', 'ping', lambda: 'pong')
+    with app.app_context():
+        yield app
+
+class TestMetrics:
+
+    def test_disabled_has_no_endpoint(self):
+        app = create_app('testing')
+        assert 'metrics' not in app.extensions
+        assert app.test_client().get('/metrics').status_code == 404
+
+    def test_request_latency_histogram(self, app):
+        client = app.test_client()
+        client.get('/_ping')
+        client.get('/_ping')
+
+        response = client.get('/metrics')
+        body = response.get_data(as_text=True)
+        assert response.status_code == 200
+        assert 'yca_http_request_duration_seconds_bucket{' in body
+        assert 'endpoint="ping",le="+Inf",method="GET",status="2xx"' in body
+        assert 'yca_http_requests_in_progress' in body
+
+    def test_cache_and_bcrypt_metrics(self, app):
+        cache.get_or_set('report:metrics-test', lambda: 1)
+        with track_bcrypt('hash'):
+            pass
+
+        body = app.test_client().get('/metrics').get_data(as_text=True)
+        assert 'yca_cache_events_total{event="misses",namespace="report"}' in body
+        assert 'yca_bcrypt_duration_seconds_count{operation="hash"}' in body
+        assert 'yca_bcrypt_in_progress 0.0' in body
+
+    def test_db_pool_metrics(self, app, tmp_path):
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import QueuePool
+        engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=1, max_overflow=2)
+        first, second = engine.connect(), engine.connect()
+        observe_db_pool('primary', engine.pool)
+        db_pool_invalidated('primary', 'ping')
+        first.close()
+        second.close()
+        engine.dispose()
+
+        body = app.test_client().get('/metrics').get_data(as_text=True)
+        assert 'yca_db_pool_checked_out_connections{bind="primary"} 2.0' in body
+        assert 'yca_db_pool_overflow_connections{bind="primary"} 1.0' in body
+        assert 'yca_db_pool_invalidations_total{bind="primary",reason="ping"}' in body
+
+    def test_auth_token(self, app):
+        app.config['METRICS_AUTH_TOKEN'] = 'secret'
+        client = app.test_client()
+
+        assert client.get('/metrics').status_code == 401
+        response = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+        assert response.status_code == 200
+
+    def test_no_public_endpoint_without_token_outside_debug(self, monkeypatch):
+        """A production-like app serves /metrics only behind a token"""
+        monkeypatch.setattr(TestingConfig, 'METRICS_ENABLED', True)
+        monkeypatch.setattr(TestingConfig, 'TESTING', False)
+        app = create_app('testing')
+        assert 'metrics' in app.extensions
+        assert app.test_client().get('/metrics').status_code == 404
+
+        monkeypatch.setattr(TestingConfig, 'METRICS_AUTH_TOKEN', 'secret', raising=False)
+        app = create_app('testing')
+        client = app.test_client()
+        assert client.get('/metrics').status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
@@ -0,0 +1,73 @@
+import json
+from flask import request
+from config import TestingConfig
+from app import create_app
+from app.profiling import PROFILE_HEADER, make_profile_token, profile_files, read_collapsed
+
+# The timer never fires within a test (see make_app); the handler takes
+# exactly TICKS samples of itself, so counts do not depend on scheduling
+TICKS = 5
+
+def busy_handler():
+    sampler = request.environ.get('profiling.sampler')
+    if sampler is not None:
+        for _ in range(TICKS):
+            sampler.sample()
+    return 'done'
+
+def make_app(monkeypatch, tmp_path, **settings):
+    monkeypatch.setattr(TestingConfig, 'PROFILING_ENABLED', True)
+    monkeypatch.setattr(TestingConfig, 'PROFILING_DIR', str(tmp_path))
+    monkeypatch.setattr(TestingConfig, 'PROFILING_INTERVAL_MS', 60_000)
+    for name, value in settings.items():
+        monkeypatch.setattr(TestingConfig, name, value)
+    app = create_app('testing')
+    app.add_url_rule('/_busy', 'busy', busy_handler)
+    app.add_url_rule('/_other', 'other', busy_handler)
+    return app
+
+class TestProfiling:
+
+    def test_disabled_registers_nothing(self):
+        app = create_app('testing')
+        assert 'profiling' not in app.extensions
+
+    def test_sampled_endpoint_writes_collapsed_stacks(self, monkeypatch, tmp_path):
+        app = make_app(monkeypatch, tmp_path, PROFILING_ENDPOINTS=['busy'], PROFILING_SAMPLE_RATE=1.0)
+        client = app.test_client()
+
+        assert client.get('/_busy').headers['X-Profiled'] == 'busy'
+        assert 'X-Profiled' not in client.get('/_other').headers
+
+        grouped = profile_files(str(tmp_path))
+        assert list(grouped) == ['busy']
+        stacks = read_collapsed(grouped['busy'])
+        assert sum(stacks.values()) == TICKS
+        assert any('busy_handler (tests/test_profiling.py' in stack for stack in stacks)
+
+    def test_signed_header_overrides_sample_rate(self, monkeypatch, tmp_path):
+        app = make_app(monkeypatch, tmp_path, PROFILING_ENDPOINTS=['busy'], PROFILING_SAMPLE_RATE=0.0)
+        client = app.test_client()
+        with app.app_context():
+            token = make_profile_token(['other'])
+
+        assert 'X-Profiled' not in client.get('/_busy').headers
+        assert 'X-Profiled' not in client.get('/_other', headers={PROFILE_HEADER: 'forged'}).headers
+        assert 'X-Profiled' not in client.get('/_busy', headers={PROFILE_HEADER: token}).headers
+        assert client.get('/_other', headers={PROFILE_HEADER: token}).headers['X-Profiled'] == 'other'
+
+    def test_merge_command_writes_speedscope(self, monkeypatch, tmp_path):
+        app = make_app(monkeypatch, tmp_path, PROFILING_ENDPOINTS=['busy'], PROFILING_SAMPLE_RATE=1.0)
+        client = app.test_client()
+        client.get('/_busy')
+        client.get('/_busy')
+
+        result = app.test_cli_runner().invoke(args=['profile-merge', 'busy'])
+        assert 'busy:' in result.output
+
+        with open(tmp_path / 'merged' / 'busy.speedscope.json') as f:
+            profile = json.load(f)
+        sampled = profile['profiles'][0]
+        assert sampled['type'] == 'sampled'
+        assert len(sampled['samples']) == len(sampled['weights'])
+        assert any(frame['name'].startswith('busy_handler') for frame in profile['shared']['frames'])
@@ -0,0 +1,95 @@
+import multiprocessing
+import pytest
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, SlidingWindowCounterRateLimiter
+from config import TestingConfig
+from app import create_app
+from app.extensions import db
+from app.ratelimit import SQLiteRateLimitStorage
+
+@pytest.fixture
+def storage_uri(tmp_path):
+    return f"sqlite:///{tmp_path / 'ratelimit.db'}"
+
+@pytest.fixture
+def storage(storage_uri):
+    return storage_from_string(storage_uri)
+
+def _hammer(storage_uri, attempts, results):
+    limiter = SlidingWindowCounterRateLimiter(storage_from_string(storage_uri))
+    item = parse('20 per minute')
+    results.put(sum(limiter.hit(item, 'login', '10.0.0.1') for _ in range(attempts)))
+
+class TestSQLiteRateLimitStorage:
+
+    def test_registered_for_sqlite_scheme(self, storage, tmp_path):
+        assert isinstance(storage, SQLiteRateLimitStorage)
+        assert storage.path == str(tmp_path / 'ratelimit.db')
+        assert storage.check()
+
+    def test_sliding_window_limits_and_reports(self, storage):
+        limiter = SlidingWindowCounterRateLimiter(storage)
+        item = parse('5 per minute')
+
+        assert [limiter.hit(item, 'a') for _ in range(7)] == [True] * 5 + [False] * 2
+        assert limiter.get_window_stats(item, 'a').remaining == 0
+        assert limiter.test(parse('5 per minute'), 'b')
+
+        limiter.clear(item, 'a')
+        assert limiter.hit(item, 'a')
+
+    def test_previous_window_is_weighted(self, storage, monkeypatch):
+        limiter = SlidingWindowCounterRateLimiter(storage)
+        item = parse('10 per minute')
+        clock = [600.0]
+        monkeypatch.setattr('app.ratelimit.time.time', lambda: clock[0])
+
+        for _ in range(10):
+            assert limiter.hit(item, 'k')
+        # A quarter into the next window, 75% of the previous window still counts
+        clock[0] = 675.0
+        previous, _, current, _ = storage.get_sliding_window(item.key_for('k'), 60)
+        assert (previous, current) == (10, 0)
+        # floor(7.5 + current) + 1 <= 10 admits three more
+        assert [limiter.hit(item, 'k') for _ in range(4)] == [True, True, True, False]
+
+        # Two windows later everything has rolled off
+        clock[0] = 800.0
+        assert sum(limiter.hit(item, 'k') for _ in range(12)) == 10
+
+    def test_fixed_window(self, storage):
+        limiter = FixedWindowRateLimiter(storage)
+        item = parse('3 per minute')
+
+        assert [limiter.hit(item, 'f') for _ in range(4)] == [True, True, True, False]
+        assert storage.get(item.key_for('f')) == 4  # rejected hits count too, as with memory://
+        assert storage.reset() >= 1
+        assert storage.get(item.key_for('f')) == 0
+
+    def test_limit_is_shared_across_processes(self, storage_uri, storage):
+        # Open the file in the parent first: children must reconnect after fork
+        storage.check()
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        workers = [context.Process(target=_hammer, args=(storage_uri, 10, results)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+
+        assert sum(results.get(timeout=5) for _ in workers) == 20
+
+    def test_app_enforces_limits_through_sqlite(self, storage_uri, monkeypatch):
+        monkeypatch.setattr(TestingConfig, 'RATELIMIT_ENABLED', True)
+        monkeypatch.setattr(TestingConfig, 'RATELIMIT_STORAGE_URI', storage_uri)
+        app = create_app('testing')
+        with app.app_context():
+            db.create_all()
+            client = app.test_client()
+            statuses = [client.get('/auth/login').status_code for _ in range(11)]
+            db.session.remove()
+            db.drop_all()
+
+        assert statuses[:10] == [200] * 10
+        assert statuses[10] == 429
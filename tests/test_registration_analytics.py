@@ -0,0 +1,160 @@
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import event
+from app.extensions import db
+from app.models.user import User
+from app.models.program import Program
+from app.models.registration_rollup import RegistrationRollup, RollupWatermark
+from app.models.enrollment import Enrollment
+from app.services.analytics_service import AnalyticsService
+from app.services.enrollment_service import EnrollmentService
+
+@pytest.fixture
+def app(app):
+    """Session app with two programs"""
+    db.session.add_all([
+        Program(id=1, code='PYT', name='Python', category='Tech', price_ngn=1),
+        Program(id=2, code='DSN', name='Design', category='Creative', price_ngn=1),
+    ])
+    db.session.commit()
+    return app
+
+_seq = iter(range(10000))
+
+def add_user(day, state='Lagos', gender='Female', programs=(1,)):
+    n = next(_seq)
+    user = User(
+        username=f'user{n}',
+        email=f'user{n}@example.com',
+        surname='Test',
+        first_name='User',
+        gender=gender,
+        password_hash='x',
+        state=state,
+        created_at=datetime.combine(day, datetime.min.time()) + timedelta(hours=9),
+    )
+    EnrollmentService.enroll(user, programs)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+class TestRegistrationAnalytics:
+
+    def test_refresh_is_incremental(self, app):
+        """Only users past the watermark are folded in"""
+        add_user(date(2026, 3, 1))
+        add_user(date(2026, 3, 1), programs=(1, 2))
+
+        assert AnalyticsService.refresh_rollups() == 2
+        assert AnalyticsService.refresh_rollups() == 0
+
+        add_user(date(2026, 3, 2), state=None, gender='Male', programs=())
+        assert AnalyticsService.refresh_rollups() == 1
+
+        rows = {(r.day, r.program_id, r.state, r.gender): r.signups for r in RegistrationRollup.query}
+        assert rows[(date(2026, 3, 1), RegistrationRollup.ALL_PROGRAMS, 'Lagos', 'Female')] == 2
+        assert rows[(date(2026, 3, 1), 1, 'Lagos', 'Female')] == 2
+        assert rows[(date(2026, 3, 1), 2, 'Lagos', 'Female')] == 1
+        assert rows[(date(2026, 3, 2), RegistrationRollup.ALL_PROGRAMS, '', 'Male')] == 1
+        assert db.session.get(RollupWatermark, RollupWatermark.REGISTRATIONS).last_id == 3
+
+    def test_settle_window_defers_recent_users(self, app, monkeypatch):
+        """Registrations newer than the settle window wait for the next run"""
+        monkeypatch.setitem(app.config, 'ANALYTICS_ROLLUP_SETTLE_SECONDS', 3600)
+        add_user(date(2026, 3, 1))
+
+        assert AnalyticsService.refresh_rollups(now=datetime(2026, 3, 1, 9, 30)) == 0
+        assert AnalyticsService.refresh_rollups(now=datetime(2026, 3, 1, 12, 0)) == 1
+
+    def test_rebuild_matches_incremental(self, app, monkeypatch):
+        """A rebuild produces the same rollups"""
+        monkeypatch.setitem(app.config, 'ANALYTICS_ROLLUP_BATCH_SIZE', 2)
+        for i in range(5):
+            add_user(date(2026, 3, 1) + timedelta(days=i % 2), programs=(1 + i % 2,))
+        AnalyticsService.refresh_rollups()
+        before = sorted((r.day, r.program_id, r.state, r.gender, r.signups) for r in RegistrationRollup.query)
+
+        assert AnalyticsService.rebuild_rollups() == 5
+        after = sorted((r.day, r.program_id, r.state, r.gender, r.signups) for r in RegistrationRollup.query)
+        assert before == after
+
+    def test_program_counts_follow_enrollments(self, app):
+        """Withdrawn enrollments are not counted; a rebuild picks up later changes"""
+        user = add_user(date(2026, 3, 1), programs=(1, 2))
+        user.enrollments[1].status = Enrollment.STATUS_WITHDRAWN
+        db.session.commit()
+        AnalyticsService.refresh_rollups()
+
+        rows = {(r.program_id, r.signups) for r in RegistrationRollup.query}
+        assert rows == {(RegistrationRollup.ALL_PROGRAMS, 1), (1, 1)}
+
+        user.enrollments[0].status = Enrollment.STATUS_WITHDRAWN
+        db.session.commit()
+        AnalyticsService.rebuild_rollups()
+
+        assert {r.program_id for r in RegistrationRollup.query} == {RegistrationRollup.ALL_PROGRAMS}
+
+    def test_trend(self, app):
+        """Daily series is dense and filtered from rollups"""
+        for day, count in ((1, 1), (3, 2), (7, 4)):
+            for _ in range(count):
+                add_user(date(2026, 3, day))
+        add_user(date(2026, 3, 3), gender='Male', programs=(2,))
+        AnalyticsService.refresh_rollups()
+
+        trend = AnalyticsService.trend('2026-03-01', '2026-03-07', window=3)
+        assert trend['signups'] == [1, 0, 3, 0, 0, 0, 4]
+        assert trend['total'] == 8
+        assert trend['moving_average'][2] == 1.33
+        assert trend['slope_per_day'] > 0
+
+        python = AnalyticsService.trend('2026-03-01', '2026-03-07', program_id=1)
+        assert python['total'] == 7
+        assert AnalyticsService.trend('2026-03-01', '2026-03-07', gender='Male')['total'] == 1
+
+    def test_breakdown_and_cohorts(self, app):
+        """Breakdowns and cohort comparisons group rollup rows"""
+        add_user(date(2026, 1, 10), state='Lagos', programs=(1,))
+        add_user(date(2026, 1, 11), state='FCT', programs=(1, 2))
+        add_user(date(2026, 2, 10), state='FCT', programs=(2,))
+        AnalyticsService.refresh_rollups()
+
+        by_state = AnalyticsService.breakdown('2026-01-01', '2026-02-28', by='state')
+        assert [(item['key'], item['signups']) for item in by_state['items']] == [('FCT', 2), ('Lagos', 1)]
+
+        by_program = AnalyticsService.breakdown('2026-01-01', '2026-02-28', by='program')
+        assert {item['label']: item['signups'] for item in by_program['items']} == {'Python': 2, 'Design': 2}
+
+        comparison = AnalyticsService.compare_cohorts(
+            ('2026-01-01', '2026-01-31'), ('2026-02-01', '2026-02-28'), by='program'
+        )
+        assert [cohort['total'] for cohort in comparison['cohorts']] == [3, 1]
+        items = {item['label']: item for item in comparison['items']}
+        assert items['Python']['signups'] == [2, 0]
+        assert items['Design']['signups'] == [1, 1]
+
+    def test_counts_go_in_one_upsert(self, app):
+        """New and existing rollup rows are written by a single statement"""
+        day = date(2026, 3, 1)
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if 'registration_daily_rollups' in statement:
+                statements.append(statement)
+        event.listen(db.engine, 'after_cursor_execute', record)
+        try:
+            RegistrationRollup.apply_counts(db.session.connection(), {(day, 0, 'FCT', 'Male'): 2})
+            RegistrationRollup.apply_counts(db.session.connection(), {
+                (day, 0, 'FCT', 'Male'): 1, (day, 0, 'Lagos', 'Female'): 4,
+            })
+        finally:
+            event.remove(db.engine, 'after_cursor_execute', record)
+
+        assert len(statements) == 2
+        signups = {(row.state, row.gender): row.signups for row in RegistrationRollup.query.filter_by(day=day)}
+        assert signups == {('FCT', 'Male'): 3, ('Lagos', 'Female'): 4}
+
+    def test_invalid_range(self, app):
+        with pytest.raises(ValueError):
+            AnalyticsService.trend('2026-03-07', '2026-03-01')
+        with pytest.raises(ValueError):
+            AnalyticsService.breakdown(by='email')
@@ -0,0 +1,103 @@
+import time
+import pytest
+from flask import current_app
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from config import TestingConfig
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.replica_heartbeat import ReplicaHeartbeat
+from app.replica import app_engines, use_primary, use_replica
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """
+    Own application with a primary and a replica SQLite file
+
+    The replica engine and its lag check are set up by create_app, and
+    routing needs committed data on two separate files.
+    """
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_REPLICA_URI', f"sqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(TestingConfig, 'REPLICA_LAG_CHECK_INTERVAL', 60)
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(bind=_replica_engine())
+        _set_heartbeats(lag_ms=0)
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def _set_heartbeats(lag_ms):
+    now_ms = int(time.time() * 1000)
+    for engine, beat_ms in ((db.engines[None], now_ms), (_replica_engine(), now_ms - lag_ms)):
+        with engine.begin() as connection:
+            connection.execute(ReplicaHeartbeat.__table__.delete())
+            connection.execute(ReplicaHeartbeat.__table__.insert().values(id=ReplicaHeartbeat.ROW_ID, beat_ms=beat_ms))
+
+def _replica_engine():
+    return current_app.extensions['replica'].engine
+
+def make_user(email):
+    return User(username=email.split('@')[0], email=email, surname='Test', first_name='User',
+                gender='Female', password_hash='x')
+
+def _add_to_replica_only(email):
+    with Session(bind=_replica_engine()) as session:
+        session.add(make_user(email))
+        session.commit()
+
+class TestReplicaRouting:
+
+    def test_routed_get_reads_from_replica(self, app):
+        _add_to_replica_only('replica@example.com')
+        client = app.test_client()
+
+        response = client.get('/auth/api/check-email?email=replica@example.com')
+        assert response.get_json()['available'] is False
+
+    def test_lagging_replica_falls_back_to_primary(self, app):
+        _add_to_replica_only('replica@example.com')
+        _set_heartbeats(lag_ms=30_000)
+
+        response = app.test_client().get('/auth/api/check-email?email=replica@example.com')
+        assert response.get_json()['available'] is True
+        assert app.extensions['replica'].lag == pytest.approx(30, abs=0.1)
+
+    def test_unrouted_requests_use_primary(self, app):
+        _add_to_replica_only('replica@example.com')
+        with app.test_request_context('/auth/profile'):
+            app.preprocess_request()
+            assert User.query.filter_by(email='replica@example.com').first() is None
+
+    def test_read_after_write_stays_on_primary(self, app):
+        _add_to_replica_only('replica@example.com')
+
+        with use_replica():
+            assert User.query.filter_by(email='replica@example.com').count() == 1
+            with use_primary():
+                assert User.query.filter_by(email='replica@example.com').count() == 0
+
+            db.session.add(make_user('primary@example.com'))
+            db.session.flush()
+            assert User.query.filter_by(email='primary@example.com').count() == 1
+            assert User.query.filter_by(email='replica@example.com').count() == 0
+        db.session.rollback()
+
+    def test_dml_statement_pins_session_to_primary(self, app):
+        _add_to_replica_only('replica@example.com')
+
+        with use_replica():
+            db.session.execute(update(User).where(User.id == 0).values(surname='X'))
+            assert User.query.filter_by(email='replica@example.com').first() is None
+        db.session.rollback()
+
+    def test_no_replica_configured(self):
+        app = create_app('testing')
+        assert 'replica' not in app.extensions
+        assert len(app_engines(app)) == 1
+
+    def test_app_engines_include_replica(self, app):
+        assert app_engines(app)[-1] is _replica_engine()
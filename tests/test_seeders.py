@@ -0,0 +1,65 @@
+import pytest
+from decimal import Decimal
+from sqlalchemy import event
+from app.extensions import db
+from app.models.program import Program
+from app.models.role import Role
+from seeders.programs_seeder import seed_programs
+from seeders.roles_seeder import seed_roles
+
+@pytest.fixture
+def statements(app):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+    event.listen(db.engine, 'after_cursor_execute', record)
+    yield executed
+    event.remove(db.engine, 'after_cursor_execute', record)
+
+class TestSeeders:
+
+    def test_first_run_inserts_in_bulk(self, app, statements):
+        counts = seed_programs()
+        assert counts['inserted'] == Program.query.count() > 10
+        assert (counts['updated'], counts['unchanged']) == (0, 0)
+        inserts = [s for s in statements if s.startswith('INSERT')]
+        assert len(inserts) <= 4  # one per column set in the catalogue
+        assert all('ON CONFLICT' in s for s in inserts)
+
+    def test_reseeding_is_idempotent(self, app, statements):
+        seed_roles()
+        statements.clear()
+        counts = seed_roles()
+        assert counts == {'inserted': 0, 'updated': 0, 'unchanged': Role.query.count()}
+        assert not [s for s in statements if s.startswith(('INSERT', 'UPDATE'))]
+
+    def test_changed_rows_are_updated(self, app):
+        seed_roles()
+        seed_programs()
+        python = Program.query.filter_by(code='PYT').one()
+        python.price_ngn = Decimal('1.00')
+        python.is_featured = True  # not seeded: an admin edit that must survive
+        guest = Role.query.filter_by(name='Guest').one()
+        guest.permissions = {}
+        db.session.add(Program(code='ADM', name='Admin added', category='Other', price_ngn=1))
+        db.session.commit()
+
+        assert seed_roles()['updated'] == 1
+        counts = seed_programs()
+        assert (counts['inserted'], counts['updated']) == (0, 1)
+
+        db.session.expire_all()
+        python = Program.query.filter_by(code='PYT').one()
+        assert python.price_ngn == Decimal('95000.00')
+        assert python.is_featured is True
+        assert Role.query.filter_by(name='Guest').one().permissions == {'courses': ['read'], 'blog': ['read']}
+        assert Program.query.filter_by(code='ADM').one().name == 'Admin added'
+
+    def test_catalog_cache_is_invalidated(self, app):
+        seed_programs()
+        version = Program.catalog_version()
+        Program.query.filter_by(code='PYT').update({'price_ngn': 1})
+        db.session.commit()
+        seed_programs()
+        assert Program.catalog_version() != version
@@ -0,0 +1,120 @@
+import logging
+import threading
+import pytest
+from flask import jsonify
+from sqlalchemy import event
+from config import TestingConfig
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.role import Role
+from app.sql_instrumentation import (
+    QueryBudgetExceeded, query_budget, statement_shape, _before_cursor_execute
+)
+
+def seed_users(count=6):
+    role = Role(name='Student')
+    db.session.add(role)
+    for n in range(count):
+        user = User(username=f'user{n}', email=f'user{n}@example.com', surname='Test',
+                    first_name='User', gender='Male', password_hash='x')
+        user.roles.append(role)
+        db.session.add(user)
+    db.session.commit()
+    db.session.expire_all()
+
+def load_roles():
+    # One query for users, then one lazy load per user
+    return {user.username: [role.name for role in user.roles] for user in User.query.all()}
+
+@pytest.fixture
+def app(app):
+    """Session app (instrumentation off) with a few users"""
+    seed_users()
+    return app
+
+@pytest.fixture
+def instrumented_app(monkeypatch):
+    """
+    Own application with per-request instrumentation
+
+    SQL_INSTRUMENTATION is read by create_app, so the shared app cannot be
+    switched over.
+    """
+    monkeypatch.setattr(TestingConfig, 'SQL_INSTRUMENTATION', True)
+    app = create_app('testing')
+    app.add_url_rule('/_roles', 'roles', lambda: jsonify(load_roles()))
+    app.add_url_rule('/_budgeted', 'budgeted', query_budget(2)(lambda: jsonify(load_roles())))
+    with app.app_context():
+        db.create_all()
+        seed_users()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+class TestSqlInstrumentation:
+
+    def test_disabled_registers_nothing(self):
+        """With instrumentation off the engine has no listeners"""
+        # A fresh app: query_budget in other tests hooks the shared engine
+        app = create_app('testing')
+        assert 'sql_instrumentation' not in app.extensions
+        with app.app_context():
+            assert not event.contains(db.engine, 'before_cursor_execute', _before_cursor_execute)
+
+    def test_query_budget_context_manager(self, app):
+        with query_budget(10) as budget:
+            load_roles()
+        assert budget.count == 7
+
+        with pytest.raises(QueryBudgetExceeded, match='6 x SELECT roles'):
+            with query_budget(3):
+                load_roles()
+
+    def test_request_counts_and_n_plus_one(self, instrumented_app, caplog):
+        client = instrumented_app.test_client()
+        with caplog.at_level(logging.WARNING):
+            response = client.get('/_roles')
+
+        assert response.headers['X-Query-Count'] == '7'
+        assert float(response.headers['X-Query-Time-Ms']) >= 0
+        warning = next(r.getMessage() for r in caplog.records if 'Possible N+1' in r.getMessage())
+        assert '6 x SELECT roles' in warning
+        assert 'tests/test_sql_instrumentation.py' in warning
+
+    def test_query_budget_on_view(self, instrumented_app):
+        with pytest.raises(QueryBudgetExceeded):
+            instrumented_app.test_client().get('/_budgeted')
+
+    def test_query_budget_on_view_in_concurrent_requests(self, instrumented_app):
+        """Overlapping calls of one decorated view keep their own counts"""
+        entered = threading.Barrier(2, timeout=5)
+        serial = threading.Lock()  # the in-memory database has one connection
+
+        @query_budget(7)
+        def view():
+            entered.wait()
+            with serial:
+                roles = load_roles()
+            entered.wait()
+            return jsonify(roles)
+        instrumented_app.add_url_rule('/_overlapping', 'overlapping', view)
+
+        statuses, errors = [], []
+        def call():
+            try:
+                statuses.append(instrumented_app.test_client().get('/_overlapping').status_code)
+            except Exception as e:  # reported below
+                errors.append(e)
+        threads = [threading.Thread(target=call) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        assert not errors, errors
+        assert statuses == [200, 200]
+
+    def test_statement_shape_collapses_in_lists(self):
+        assert statement_shape('SELECT * FROM t WHERE id IN (?, ?, ?)') == \
+            statement_shape('SELECT *\n FROM t WHERE id IN (?, ?)')
@@ -0,0 +1,72 @@
+import os
+from flask import url_for
+from app import create_app
+from app.extensions import LazyExtension
+from app.startup import detect_entry_point, measure_startup, parse_importtime
+
+# Generous enough for a loaded CI box; the module checks below are the real guard
+STARTUP_BUDGET_MS = float(os.environ.get('STARTUP_BUDGET_MS', 6000))
+
+HEAVY_MODULES = ('numpy', 'PIL', 'magic', 'flask_socketio', 'flask_migrate', 'alembic', 'xlsxwriter')
+WEB_ONLY_MODULES = ('flask_jwt_extended', 'numpy', 'PIL', 'magic', 'flask_socketio')
+
+class TestStartup:
+
+    def test_detect_entry_point(self, monkeypatch):
+        monkeypatch.delenv('APP_ENTRY_POINT', raising=False)
+        assert detect_entry_point(['/usr/bin/gunicorn', 'wsgi:app']) == 'web'
+        assert detect_entry_point(['/venv/bin/flask', 'run']) == 'web'
+        assert detect_entry_point(['/venv/bin/flask', '--app', 'wsgi', 'export', 'users']) == 'cli'
+        assert detect_entry_point(['/venv/bin/flask', 'db', 'upgrade']) == 'cli'
+
+        monkeypatch.setenv('APP_ENTRY_POINT', 'worker')
+        assert detect_entry_point(['/venv/bin/flask', 'run']) == 'worker'
+
+    def test_lazy_extension_imports_on_first_use(self):
+        created = []
+        extension = LazyExtension('demo', lambda: created.append(1) or {'ready': True})
+
+        assert not extension.loaded
+        assert extension.get('ready') is True
+        assert extension.loaded and created == [1]
+
+    def test_cli_app_keeps_routes_but_skips_web_extensions(self):
+        app = create_app('testing', entry_point='cli')
+
+        # Commands that send email render templates, which need url_for
+        assert 'auth.login' in app.view_functions
+        with app.test_request_context():
+            assert url_for('auth.login') == '/auth/login'
+        assert 'migrate' in app.extensions
+        assert 'flask-jwt-extended' not in app.extensions
+        assert app.extensions['startup']['entry_point'] == 'cli'
+
+    def test_web_cold_start_defers_heavy_imports(self):
+        report = measure_startup('testing', 'web', importtime=False)
+
+        loaded = set(report['modules'])
+        assert not loaded.intersection(HEAVY_MODULES)
+        assert report['total_ms'] < STARTUP_BUDGET_MS
+
+    def test_cli_cold_start_skips_web_modules(self):
+        report = measure_startup('testing', 'cli', importtime=False)
+
+        loaded = set(report['modules'])
+        assert not loaded.intersection(WEB_ONLY_MODULES)
+        assert 'blueprints' in report['startup']['phases_ms']
+
+    def test_parse_importtime(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _io\n"
+            "import time:      2000 |       2500 | flask\n"
+        )
+        assert parse_importtime(output) == [('_io', 120, 120, 1), ('flask', 2000, 2500, 0)]
+
+    def test_startup_report_command(self):
+        app = create_app('testing')
+        result = app.test_cli_runner().invoke(args=['startup-report', '--entry-point', 'worker',
+                                                    '--config', 'testing', '--top', '3'])
+        assert result.exit_code == 0, result.output
+        assert 'Cold start (worker, testing)' in result.output
+        assert 'extensions' in result.output
@@ -0,0 +1,121 @@
+import os
+import runpy
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import event
+from app.extensions import db
+from app.models.user import User
+from app.models.role import Role
+from app.models.program import Program
+from app.models.stats_counter import StatsCounter
+from app.services.stats_service import StatsService
+
+MIGRATION = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations', 'versions',
+                         '3f6c1d2a9b10_add_stats_counters.py')
+
+def make_user(email, **kwargs):
+    return User(
+        username=email.split('@')[0],
+        email=email,
+        surname='Test',
+        first_name='User',
+        gender='Female',
+        password_hash='x',
+        **kwargs
+    )
+
+class TestStatsCounters:
+
+    def test_counts_follow_inserts(self, app):
+        """New users and programs bump the counters in the same flush"""
+        student = Role(name='Student')
+        db.session.add(student)
+        user = make_user('a@example.com')
+        user.roles.append(student)
+        db.session.add_all([user, make_user('b@example.com', is_active=False)])
+        db.session.add(Program(code='PYT', name='Python', category='Tech', price_ngn=1))
+        db.session.commit()
+
+        stats = StatsService.dashboard_stats()
+        assert stats['total_users'] == 2
+        assert stats['active_users'] == 1
+        assert stats['total_programs'] == 1
+        assert StatsService.role_user_counts([student]) == {student.id: 1}
+
+    def test_status_and_role_changes(self, app):
+        """Deactivating, role changes and deletes adjust counters"""
+        student, teacher = Role(name='Student'), Role(name='Teacher')
+        user = make_user('a@example.com')
+        user.roles.append(student)
+        db.session.add_all([student, teacher, user])
+        db.session.commit()
+
+        user.is_active = False
+        user.roles.remove(student)
+        user.roles.append(teacher)
+        db.session.commit()
+
+        assert StatsService.dashboard_stats()['active_users'] == 0
+        assert StatsService.role_user_counts([student, teacher]) == {student.id: 0, teacher.id: 1}
+
+        db.session.delete(user)
+        db.session.commit()
+
+        assert StatsService.dashboard_stats()['total_users'] == 0
+        assert StatsService.role_user_counts([teacher]) == {teacher.id: 0}
+
+    def test_rollback_discards_deltas(self, app):
+        """Rolled back changes never reach the counters"""
+        db.session.add(make_user('a@example.com'))
+        db.session.flush()
+        db.session.rollback()
+
+        assert StatsService.dashboard_stats()['total_users'] == 0
+
+    def test_reconcile_fixes_drift(self, app):
+        """Changes made outside the ORM are corrected by reconcile"""
+        db.session.add(make_user('a@example.com'))
+        db.session.commit()
+        db.session.execute(User.__table__.update().values(is_active=False))
+        db.session.commit()
+
+        drift = StatsService.reconcile()
+
+        assert drift[StatsCounter.USERS_ACTIVE] == (1, 0)
+        assert StatsService.dashboard_stats()['active_users'] == 0
+        assert StatsService.reconcile() == {}
+
+    def test_first_write_creates_counter_in_one_statement(self, app):
+        """A counter that does not exist yet is inserted by the same upsert that increments"""
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if 'stats_counters' in statement:
+                statements.append(statement)
+        event.listen(db.engine, 'after_cursor_execute', record)
+        try:
+            StatsCounter.apply_deltas(db.session.connection(), {'users.total': 2, 'roles.9.users': 1})
+            StatsCounter.apply_deltas(db.session.connection(), {'users.total': -1, 'programs.total': 0})
+        finally:
+            event.remove(db.engine, 'after_cursor_execute', record)
+
+        assert len(statements) == 2
+        assert StatsCounter.get_values(['users.total', 'roles.9.users', 'programs.total']) == {
+            'users.total': 1, 'roles.9.users': 1, 'programs.total': 0,
+        }
+
+    def test_migration_seeds_counters_from_existing_rows(self, app):
+        """Upgrading a database with data fills the counters without reconcile"""
+        student = Role(name='Student')
+        user = make_user('a@example.com')
+        user.roles.append(student)
+        db.session.add_all([student, Role(name='Teacher'), user, make_user('b@example.com', is_active=False),
+                            Program(code='PYT', name='Python', category='Tech', price_ngn=1)])
+        db.session.commit()
+        connection = db.session.connection()
+        StatsCounter.__table__.drop(connection)
+
+        migration = runpy.run_path(MIGRATION)
+        with Operations.context(MigrationContext.configure(connection)):
+            migration['upgrade']()
+
+        assert {row.name: row.value for row in StatsCounter.query} == StatsService.compute_actual()
@@ -0,0 +1,78 @@
+import pytest
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import func
+from app import create_app
+from app.extensions import db
+from app.models.enrollment import Enrollment
+from app.models.registration_sequence import RegistrationSequence
+from app.models.role import Role
+from app.models.stats_counter import StatsCounter
+from app.models.user import User
+from seeders import synthetic
+from seeders.programs_seeder import seed_programs
+from seeders.roles_seeder import seed_roles
+
+@pytest.fixture
+def app(monkeypatch):
+    """
+    Own in-memory application with roles and programs seeded
+
+    generate() writes through its own engine connections (worker processes
+    for a file database), which would block on the shared app's test
+    transaction and could not be rolled back with it.
+    """
+    monkeypatch.setattr(synthetic, 'PASSWORD_POOL_SIZE', 2)
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        seed_roles()
+        seed_programs()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+class TestSyntheticData:
+
+    def test_plan_is_deterministic_and_sequenced(self):
+        programs = [(1, 'PYT'), (2, 'WD')]
+        roles = {'Student': 1, 'Teacher': 2, 'Registrar': 3}
+        now = datetime(2026, 6, 1)
+        first = synthetic.plan_users(500, programs, roles, {}, seed=7, now=now)
+        assert first == synthetic.plan_users(500, programs, roles, {}, seed=7, now=now)
+
+        sequences = {}
+        planned = synthetic.plan_users(500, programs, roles, sequences, seed=7, now=now)
+        usernames = [username for _, _, _, username in planned]
+        assert len(set(usernames)) == 500
+        assert sum(sequences.values()) == 500
+        assert [created_at for created_at, *_ in planned] == sorted(created_at for created_at, *_ in planned)
+        assert Counter(role_id for _, role_id, _, _ in planned).most_common(1)[0][0] == roles['Student']
+
+    def test_generate_loads_users_roles_and_enrollments(self, app):
+        stats = synthetic.generate(300, chunk_size=100, seed=1)
+        assert stats['users'] == User.query.count() == 300
+        assert stats['user_roles'] == 300
+        assert stats['enrollments'] == Enrollment.query.count() > 250
+        assert stats['processes'] == 1  # in-memory SQLite
+        assert db.session.query(func.count(func.distinct(User.email))).scalar() == 300
+
+        user = User.query.order_by(User.id).first()
+        assert user.roles and user.qualifications
+        assert user.verify_password(synthetic.pool_password(user.id % synthetic.PASSWORD_POOL_SIZE))
+
+    def test_sequences_continue_after_generated_usernames(self, app):
+        synthetic.generate(200, chunk_size=100, seed=2)
+        student = Role.query.filter_by(name='Student').one()
+        user = User.query.filter(User.roles.contains(student)).order_by(User.id.desc()).first()
+        _, year, program_code, role_code, number = user.username.split('/')
+        sequence = RegistrationSequence.query.filter_by(
+            year=int(year), role_code=role_code, program_code=program_code, cohort='A'
+        ).one()
+        assert sequence.current_sequence == int(number)
+
+    def test_gen_data_command(self, app):
+        result = app.test_cli_runner().invoke(args=['gen-data', '--users', '120', '--chunk-size', '50'])
+        assert result.exit_code == 0, result.output
+        assert 'Generated 120 users' in result.output
+        assert StatsCounter.get_values([StatsCounter.USERS_TOTAL])[StatsCounter.USERS_TOTAL] == 120
@@ -0,0 +1,38 @@
+from flask import render_template
+from config import TestingConfig
+from app import create_app
+from app.templating import list_app_templates, precompile_templates
+
+def make_app(monkeypatch, cache_dir):
+    monkeypatch.setattr(TestingConfig, 'JINJA_BYTECODE_CACHE', True)
+    monkeypatch.setattr(TestingConfig, 'JINJA_BYTECODE_CACHE_DIR', str(cache_dir))
+    return create_app('testing')
+
+class TestTemplatePrecompile:
+
+    def test_precompile_writes_bytecode_for_every_template(self, monkeypatch, tmp_path):
+        app = make_app(monkeypatch, tmp_path)
+
+        compiled, elapsed_ms, failed = precompile_templates(app)
+
+        assert failed == []
+        assert compiled == len(list_app_templates(app)) > 0
+        assert elapsed_ms >= 0
+        assert len(list(tmp_path.glob('__jinja2_*.cache'))) == compiled
+        assert app.extensions['templating']['precompiled'] == compiled
+
+    def test_next_worker_renders_from_bytecode_cache(self, monkeypatch, tmp_path):
+        precompile_templates(make_app(monkeypatch, tmp_path))
+        cached = sorted(tmp_path.glob('__jinja2_*.cache'))
+
+        # A fresh app stands in for the next worker: same directory, empty in-process cache
+        app = make_app(monkeypatch, tmp_path)
+        def compile_source(*args, **kwargs):
+            raise AssertionError('template was recompiled instead of loaded from bytecode')
+        monkeypatch.setattr(app.jinja_env, 'compile', compile_source)
+
+        with app.test_request_context('/'):
+            html = render_template('auth/login.html', form=None)
+
+        assert '<html' in html.lower()
+        assert sorted(tmp_path.glob('__jinja2_*.cache')) == cached
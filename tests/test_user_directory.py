@@ -0,0 +1,97 @@
+import pytest
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models.user import User
+from app.models.role import Role
+from app.services.user_directory_service import UserDirectoryService
+
+@pytest.fixture
+def app(app):
+    """Session app with a small directory of users"""
+    student, teacher = Role(name='Student'), Role(name='Teacher')
+    db.session.add_all([student, teacher])
+
+    base = datetime(2025, 1, 1)
+    for i in range(25):
+        user = User(
+            username=f'user{i}',
+            email=f'user{i}@example.com',
+            surname='Test',
+            first_name=f'User{i}',
+            gender='Male',
+            password_hash='x',
+            state='FCT' if i % 2 else 'Lagos',
+            is_active=i % 5 != 0,
+            email_verified=i % 3 == 0,
+            # Pairs share a timestamp so the id tie-breaker is exercised
+            created_at=base + timedelta(minutes=i // 2),
+        )
+        user.roles.append(teacher if i % 4 == 0 else student)
+        db.session.add(user)
+    db.session.commit()
+    return app
+
+def collect_pages(**filters):
+    """Walk every page and return the usernames in order"""
+    usernames, cursor = [], None
+    while True:
+        page = UserDirectoryService.list_users(after=cursor, limit=4, **filters)
+        usernames.extend(user['username'] for user in page['users'])
+        cursor = page['next_cursor']
+        if not cursor:
+            return usernames
+
+class TestUserDirectory:
+
+    def test_pages_cover_every_user_once(self, app):
+        """Keyset pages are newest first with no gaps or repeats"""
+        usernames = collect_pages()
+
+        assert len(usernames) == 25
+        assert len(set(usernames)) == 25
+        assert usernames[0] == 'user24'
+
+    def test_role_filter(self, app):
+        """Role filter goes through user_roles"""
+        usernames = collect_pages(role='Teacher')
+
+        assert sorted(usernames) == sorted(f'user{i}' for i in range(0, 25, 4))
+
+    def test_status_state_and_verified_filters(self, app):
+        """Filters combine"""
+        page = UserDirectoryService.list_users(status='inactive', state='Lagos', limit=50)
+
+        assert {u['username'] for u in page['users']} == {'user0', 'user10', 'user20'}
+        assert all(u['status'] == 'inactive' for u in page['users'])
+
+        verified = UserDirectoryService.list_users(verified=True, limit=50)['users']
+        assert all(u['email_verified'] for u in verified)
+
+    def test_roles_batch_loaded(self, app):
+        """Each row carries its role names"""
+        page = UserDirectoryService.list_users(limit=5)
+
+        assert all(u['roles'] in (['Student'], ['Teacher']) for u in page['users'])
+
+    def test_invalid_cursor(self, app):
+        """A malformed cursor is rejected"""
+        with pytest.raises(ValueError):
+            UserDirectoryService.list_users(after='not-a-cursor')
+
+    def test_users_without_created_at_come_last(self, app):
+        """NULL created_at rows are reachable past page 1 and can end a page"""
+        db.session.execute(
+            User.__table__.update().where(User.username.in_(['user3', 'user7', 'user11'])).values(created_at=None)
+        )
+        db.session.commit()
+
+        usernames = collect_pages()
+
+        assert len(usernames) == 25 == len(set(usernames))
+        assert usernames[-3:] == ['user11', 'user7', 'user3']
+
+    def test_limit_is_at_least_one(self, app):
+        page = UserDirectoryService.list_users(limit=-5)
+
+        assert [u['username'] for u in page['users']] == ['user24']
+        assert page['next_cursor']
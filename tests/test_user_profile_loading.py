@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import event, inspect
+from app.extensions import db, load_user
+from app.models.user import User
+from app.services.registration_service import RegistrationService
+
+PROFILE_COLUMNS = {
+    'address', 'facebook_handle', 'twitter_handle', 'github_handle', 'linkedin_handle',
+    'resume_path', 'bio', 'qualifications', 'selected_programs',
+}
+
+@pytest.fixture
+def app(app):
+    """Session app with one filled-in profile"""
+    user = User(username='student', email='student@example.com', surname='Test', first_name='User',
+                gender='Female', password_hash='x', address='12 Crescent, Abuja', bio='Hello',
+                qualifications=[{'qualification': 'B.Sc.'}], two_factor_backup_codes=['0001'])
+    db.session.add(user)
+    db.session.commit()
+    db.session.expunge_all()
+    return app
+
+@pytest.fixture
+def statements(app):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+    event.listen(db.engine, 'after_cursor_execute', record)
+    yield executed
+    event.remove(db.engine, 'after_cursor_execute', record)
+
+def user_id():
+    return db.session.execute(db.select(User.id)).scalar_one()
+
+def load(statements):
+    user = load_user(user_id())
+    statements.clear()
+    return user
+
+class TestUserProfileLoading:
+
+    def test_load_user_skips_profile_and_two_factor(self, app, statements):
+        uid = user_id()
+        statements.clear()
+        user = load_user(uid)
+        assert len(statements) == 1
+        assert 'users.bio' not in statements[0]
+        assert PROFILE_COLUMNS | {'two_factor_secret', 'two_factor_backup_codes'} <= inspect(user).unloaded
+        assert user.display_name == 'User T.'
+        assert len(statements) == 1
+
+    def test_one_query_loads_the_whole_group(self, app, statements):
+        user = load(statements)
+        assert user.bio == 'Hello'
+        assert user.address == '12 Crescent, Abuja'
+        assert user.qualifications == [{'qualification': 'B.Sc.'}]
+        assert len(statements) == 1
+        assert 'two_factor_backup_codes' in inspect(user).unloaded
+
+    def test_load_profile_reads_profile_with_the_row(self, app, statements):
+        user = User.query.options(User.load_profile()).get(user_id())
+        assert not PROFILE_COLUMNS & inspect(user).unloaded
+        assert 'two_factor_secret' in inspect(user).unloaded
+        user = User.query.options(User.load_two_factor()).populate_existing().get(user.id)
+        assert user.two_factor_backup_codes == ['0001']
+
+    def test_profile_update_writes_deferred_columns(self, app):
+        uid = user_id()
+        user, error = RegistrationService.update_user_profile(uid, {'bio': 'Updated', 'github_handle': 'gh'})
+        assert error is None
+        db.session.expunge_all()
+        user = User.query.options(User.load_profile()).get(uid)
+        assert (user.bio, user.github_handle) == ('Updated', 'gh')
@@ -1,13 +1,16 @@
 import pytest
 from datetime import datetime
+from sqlalchemy.exc import OperationalError
 from app.services.username_generator import UsernameGenerator
 from app.models.registration_sequence import RegistrationSequence
 from app.extensions import db
 from app import create_app
+from config import TestingConfig
 
 @pytest.fixture
-def app():
-    """Create test application"""
+def committed_app(tmp_path, monkeypatch):
+    """Application on its own SQLite file, for tests whose threads must see each other's commits"""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'sequences.db'}")
     app = create_app('testing')
     with app.app_context():
         db.create_all()
@@ -15,11 +18,6 @@ def app():
         db.session.remove()
         db.drop_all()
 
-@pytest.fixture
-def client(app):
-    """Create test client"""
-    return app.test_client()
-
 class TestUsernameGenerator:
     
     def test_generate_student_username(self, app):
@@ -65,8 +63,9 @@ class TestUsernameGenerator:
                     program_name='Web Development'
                 )
     
-    def test_concurrent_username_generation(self, app):
+    def test_concurrent_username_generation(self, committed_app):
         """Test that username generation is thread-safe"""
+        app = committed_app
         with app.app_context():
             import concurrent.futures
             
@@ -91,6 +90,30 @@ class TestUsernameGenerator:
             sequences = [int(u.split('/')[-1]) for u in usernames]
             assert sorted(sequences) == list(range(1, 11))
     
+    def test_deadlock_victim_is_retried(self, app, monkeypatch):
+        """An InnoDB deadlock on a brand-new key is retried, other errors are not"""
+        allocate = RegistrationSequence._allocate.__func__
+        calls = []
+        def deadlock_once(cls, *args):
+            calls.append(args)
+            if len(calls) == 1:
+                raise OperationalError('INSERT ...', {}, Exception(1213, 'Deadlock found'))
+            return allocate(cls, *args)
+        monkeypatch.setattr(RegistrationSequence, '_allocate', classmethod(deadlock_once))
+
+        assert RegistrationSequence.get_next_sequence(24, 'STD', 'WD') == 1
+        assert len(calls) == 2
+
+        def lost_connection(cls, *args):
+            raise OperationalError('INSERT ...', {}, Exception(2013, 'Lost connection'))
+        monkeypatch.setattr(RegistrationSequence, '_allocate', classmethod(lost_connection))
+        with pytest.raises(OperationalError):
+            RegistrationSequence.get_next_sequence(24, 'STD', 'WD')
+
+    def test_new_key_is_created_by_the_upsert(self, app):
+        assert [RegistrationSequence.get_next_sequence(25, 'STD', 'DA') for _ in range(3)] == [1, 2, 3]
+        assert RegistrationSequence.query.filter_by(year=25).count() == 1
+
     def test_batch_generation(self, app):
         """Test batch generation of usernames"""
         with app.app_context():
@@ -0,0 +1,50 @@
+import os
+import runpy
+from config import TestingConfig
+from app import create_app
+from app.warmup import warm_shared, warm_worker
+
+GUNICORN_CONF = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'deploy', 'gunicorn.conf.py')
+
+def load_gunicorn_conf(monkeypatch, **env):
+    for name in ('SOCKETIO_ENABLED', 'SOCKETIO_MESSAGE_QUEUE', 'GUNICORN_MAX_REQUESTS_JITTER',
+                 'GUNICORN_PRELOAD'):
+        monkeypatch.delenv(name, raising=False)
+    # The config exports these; setting them here lets monkeypatch undo it
+    for name in ('GUNICORN_WORKERS', 'GUNICORN_WORKER_CLASS', 'GUNICORN_THREADS'):
+        monkeypatch.setenv(name, '')
+    monkeypatch.setenv('METRICS_MULTIPROC_DIR', '/tmp/yca-test-metrics')
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', '/tmp/yca-test-metrics')
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(GUNICORN_CONF)
+
+class TestWarmup:
+
+    def test_warm_shared_precompiles_templates(self, monkeypatch):
+        monkeypatch.setattr(TestingConfig, 'PRECOMPILE_TEMPLATES', True)
+        app = create_app('testing')
+
+        timings = warm_shared(app)
+
+        assert set(timings) == {'mappers', 'templates'}
+        assert app.extensions['templating']['precompiled'] > 0
+
+    def test_warm_worker_runs_every_step(self, app):
+        timings = warm_worker(app)
+        assert set(timings) == {'connect', 'rbac', 'stats', 'catalog'}
+
+    def test_gunicorn_sync_profile(self, monkeypatch):
+        conf = load_gunicorn_conf(monkeypatch, GUNICORN_MAX_REQUESTS='2000')
+
+        assert conf['worker_class'] == 'sync'
+        assert conf['preload_app'] is True
+        assert conf['workers'] >= 3
+        assert conf['max_requests_jitter'] == 200
+
+    def test_gunicorn_socketio_profile(self, monkeypatch):
+        conf = load_gunicorn_conf(monkeypatch, SOCKETIO_ENABLED='true')
+
+        assert conf['worker_class'] == 'eventlet'
+        assert conf['workers'] == 1
+        assert conf['preload_app'] is False
@@ -1,11 +1,14 @@
 """
 WSGI entry point for production deployment
+
+Defaults to the production config; set FLASK_ENV=development to override.
+Serve with: gunicorn -c deploy/gunicorn.conf.py wsgi:app
 """
 import os
 from app import create_app
 
 # Create application instance
-app = create_app(os.environ.get('FLASK_ENV', 'development'))
+app = create_app(os.environ.get('FLASK_ENV', 'production'))
 
 # Export app for WSGI servers
 application = app